@@ -3,6 +3,9 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from channels.db import database_sync_to_async
+from http.cookies import SimpleCookie
 
 User = get_user_model()
 
@@ -33,4 +36,35 @@ class CookieJWTAuthentication(BaseAuthentication):
     
     def authenticate_header(self, request):
         # Return a string for the WWW-Authenticate header (optional)
-        return "Bearer"
\ No newline at end of file
+        return "Bearer"
+
+class CookieJWTWebSocketMiddleware:
+    """
+    Channels middleware that authenticates WebSocket connections with the same
+    JWT access token, read from the "access_token" cookie. Tokens are not
+    accepted in the query string, where they would end up in access logs.
+    Unauthenticated connections get an AnonymousUser.
+    """
+    def __init__(self, inner):
+        self.inner = inner
+
+    async def __call__(self, scope, receive, send):
+        access_token = None
+        for name, value in scope.get("headers", []):
+            if name == b"cookie":
+                cookie = SimpleCookie()
+                cookie.load(value.decode("latin-1"))
+                if "access_token" in cookie:
+                    access_token = cookie["access_token"].value
+
+        scope = dict(scope)
+        scope["user"] = await self._get_user(access_token) if access_token else AnonymousUser()
+        return await self.inner(scope, receive, send)
+
+    async def _get_user(self, access_token):
+        try:
+            user_id = AccessToken(access_token)["user_id"]
+            user = await database_sync_to_async(User.objects.get)(id=user_id)
+        except Exception:
+            return AnonymousUser()
+        return user if user.is_active else AnonymousUser()
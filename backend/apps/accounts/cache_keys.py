@@ -0,0 +1,29 @@
+from apps.caching.keys import versioned_key
+from apps.caching.registry import invalidates
+from .models import CustomUser, DoctorProfile, UserRoles
+
+DIRECTORY_CACHE = 'directory'
+DOCTORS_NAMESPACE = 'doctors'
+
+
+def doctor_directory_cache_key(*parts):
+    """Cache key for public doctor listings (parts identify the listing, e.g. its filters)"""
+    return versioned_key(DIRECTORY_CACHE, DOCTORS_NAMESPACE, *parts)
+
+
+# User fields shown in, or used to filter and order, the doctor listings
+DIRECTORY_USER_FIELDS = ('role', 'email', 'first_name', 'last_name', 'date_joined')
+
+
+@invalidates(CustomUser, alias=DIRECTORY_CACHE, namespaces=True, fields=DIRECTORY_USER_FIELDS)
+def doctor_accounts(instance):
+    """Doctor accounts are listed publicly (role changes also replace the DoctorProfile)"""
+    if instance.role == UserRoles.DOCTOR:
+        return [DOCTORS_NAMESPACE]
+    return []
+
+
+@invalidates(DoctorProfile, alias=DIRECTORY_CACHE, namespaces=True)
+def doctor_profiles(instance):
+    """Specialties and license numbers come from doctor profiles"""
+    return [DOCTORS_NAMESPACE]
@@ -1,3 +1,31 @@
 from django.test import TestCase
+from django.utils import timezone
+from .cache_keys import doctor_directory_cache_key
+from .models import CustomUser, UserRoles
 
-# Create your tests here.
+
+class DoctorDirectoryCacheTests(TestCase):
+    """Invalidation of the cached public doctor listings"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = CustomUser.objects.create_user('doctor@example.com', role=UserRoles.DOCTOR, is_verified=True)
+
+    def save(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doctor.save(**kwargs)
+        return doctor_directory_cache_key('list', '')
+
+    def test_login_keeps_the_listings(self):
+        key = doctor_directory_cache_key('list', '')
+        self.doctor.last_login = timezone.now()
+        self.assertEqual(self.save(update_fields=['last_login']), key)
+
+    def test_listed_field_change_invalidates(self):
+        key = doctor_directory_cache_key('list', '')
+        self.doctor.first_name = 'Grace'
+        self.assertNotEqual(self.save(update_fields=['first_name']), key)
+
+    def test_full_save_invalidates(self):
+        key = doctor_directory_cache_key('list', '')
+        self.assertNotEqual(self.save(), key)
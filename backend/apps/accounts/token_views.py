@@ -34,7 +34,7 @@ class CookieTokenRefreshView(APIView):
         refresh_cookie = request.COOKIES.get("refresh_token")
         
         # Log the request headers and cookies for debugging
-        logger.info(f"Token refresh request received. Cookies present: {bool(request.COOKIES)}")
+        logger.debug("Token refresh request received. Cookies present: %s", bool(request.COOKIES))
         
         if not refresh_cookie:
             logger.warning("Refresh token missing from cookies")
@@ -67,7 +67,7 @@ class CookieTokenRefreshView(APIView):
             if hasattr(old_refresh, 'blacklist'):
                 try:
                     old_refresh.blacklist()
-                    logger.info(f"Refresh token blacklisted for user {user.email}")
+                    logger.info("Refresh token blacklisted for user %s", user.email)
                 except Exception as e:
                     logger.error(f"Token blacklisting failed: {str(e)}")
             
@@ -102,7 +102,7 @@ class CookieTokenRefreshView(APIView):
                 samesite=settings.CSRF_COOKIE_SAMESITE or 'Lax',
             )
             
-            logger.info(f"Token refreshed successfully for user {user.email}")
+            logger.info("Token refreshed successfully for user %s", user.email)
             
             return response
         
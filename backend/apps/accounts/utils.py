@@ -15,7 +15,7 @@ def set_auth_cookies(response, access_token, refresh_token):
         refresh_token: JWT refresh token object (or string)
     """
     # Debug info
-    logger.info(f"Setting auth cookies. Access token type: {type(access_token)}, Refresh token type: {type(refresh_token)}")
+    logger.debug("Setting auth cookies. Access token type: %s, Refresh token type: %s", type(access_token), type(refresh_token))
     
     # Convert tokens to strings if they're not already
     access_token_str = str(access_token)
@@ -57,6 +57,6 @@ def set_auth_cookies(response, access_token, refresh_token):
     response["X-Refresh-Token-Set"] = "True"
     response["X-Access-Token-Set"] = "True"
     
-    logger.info("Auth cookies set successfully")
+    logger.debug("Auth cookies set successfully")
     
     return response
\ No newline at end of file
@@ -15,6 +15,8 @@ from apps.accounts.serializers import CustomUserSerializer, StaffUserSerializer,
 from apps.accounts.models import UserRoles, DoctorProfile
 from apps.accounts.utils import set_auth_cookies
 from apps.accounts.permissions import IsAdminOrSuperuser, IsOwnerOrAdmin, IsVerified, IsStaff
+from apps.accounts.cache_keys import DIRECTORY_CACHE, doctor_directory_cache_key
+from apps.caching.keys import get_or_compute
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -134,7 +136,7 @@ def google_login(request):
             samesite=settings.CSRF_COOKIE_SAMESITE or 'Lax',
         )
         
-        logger.info(f"Google login successful for: {email}")
+        logger.info("Google login successful for: %s", email)
         return response
     except requests.exceptions.RequestException as e:
         logger.error(f"Google API request failed: {str(e)}")
@@ -193,7 +195,7 @@ class CustomLoginView(APIView):
             samesite=settings.CSRF_COOKIE_SAMESITE or 'Lax',
         )
         
-        logger.info(f"Login successful for: {email}")
+        logger.info("Login successful for: %s", email)
         return response
 
 @api_view(["POST"])
@@ -273,7 +275,7 @@ class VerifyStaffView(APIView):
             user = User.objects.get(id=staff_id, role__in=[UserRoles.DOCTOR, UserRoles.RECEPTIONIST, UserRoles.PHARMACIST])
             user.is_verified = True
             user.save()
-            logger.info(f"Staff verified: {user.email} (Role: {user.role})")
+            logger.info("Staff verified: %s (Role: %s)", user.email, user.role)
             return Response({"message": "Staff account verified successfully."}, status=status.HTTP_200_OK)
         except User.DoesNotExist:
             logger.warning(f"Staff verification failed: ID {staff_id} not found")
@@ -307,11 +309,24 @@ class DoctorListView(generics.ListAPIView):
             doctors = doctors.filter(doctor_profile__specialty__iexact=specialty)
         return doctors
 
+    def list(self, request, *args, **kwargs):
+        # Cached until a doctor account or profile changes (see apps.accounts.cache_keys)
+        specialty = (request.query_params.get('specialty') or '').lower()
+        data = get_or_compute(
+            DIRECTORY_CACHE,
+            doctor_directory_cache_key('list', specialty),
+            lambda: super(DoctorListView, self).list(request, *args, **kwargs).data,
+        )
+        return Response(data)
+
 class SpecialtyListView(APIView):
     permission_classes = [AllowAny]
     def get(self, request):
-        specialties = DoctorProfile.objects.values_list('specialty', flat=True).distinct()
-        return Response({'specialties': [s for s in specialties if s]})
+        def build():
+            specialties = DoctorProfile.objects.values_list('specialty', flat=True).distinct()
+            return [s for s in specialties if s]
+        specialties = get_or_compute(DIRECTORY_CACHE, doctor_directory_cache_key('specialties'), build)
+        return Response({'specialties': specialties})
 
 class DoctorDetailView(generics.RetrieveAPIView):
     permission_classes = [AllowAny]
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AppointmentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.appointment'
+
+    def ready(self):
+        # Register cache invalidation rules
+        import apps.appointment.cache_keys
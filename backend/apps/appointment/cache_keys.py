@@ -0,0 +1,44 @@
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+from apps.caching.keys import make_key, versioned_key
+from apps.caching.registry import invalidates
+from .models import Appointment, AvailableTimeSlot, TimeOff
+
+AVAILABILITY_CACHE = 'availability'
+
+
+def availability_namespace(doctor_id):
+    """Namespace holding everything cached about a doctor's bookable slots"""
+    return make_key('doctor', doctor_id)
+
+
+def available_slots_cache_key(doctor_id, target_date):
+    """Cache key for a doctor's bookable slots on a date"""
+    return versioned_key(AVAILABILITY_CACHE, availability_namespace(doctor_id), 'slots', target_date.isoformat())
+
+
+@receiver(post_init, sender=Appointment)
+@receiver(post_init, sender=AvailableTimeSlot)
+@receiver(post_init, sender=TimeOff)
+def remember_loaded_doctor(sender, instance, **kwargs):
+    """Keep the doctor the row was loaded with, so a reassignment frees the old doctor's slots too"""
+    # Read without triggering a query when the field is deferred
+    instance._loaded_doctor_id = instance.__dict__.get('doctor_id')
+
+
+@invalidates(Appointment, AvailableTimeSlot, TimeOff, alias=AVAILABILITY_CACHE, namespaces=True)
+def doctor_availability(instance):
+    """Bookings, schedule slots and time off all change which slots a doctor has free"""
+    doctor_ids = {instance.doctor_id, getattr(instance, '_loaded_doctor_id', None)}
+    return [availability_namespace(doctor_id) for doctor_id in doctor_ids if doctor_id is not None]
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_save, sender=AvailableTimeSlot)
+@receiver(post_save, sender=TimeOff)
+def update_loaded_doctor(sender, instance, **kwargs):
+    """
+    The saved doctor is the one to compare against on the next save (connected
+    after the invalidation rule, so it runs once the keys have been taken)
+    """
+    instance._loaded_doctor_id = instance.doctor_id
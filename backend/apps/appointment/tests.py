@@ -1,3 +1,44 @@
+from datetime import timedelta
 from django.test import TestCase
+from django.utils import timezone
+from apps.accounts.models import CustomUser, UserRoles
+from .cache_keys import available_slots_cache_key
+from .models import Appointment
 
-# Create your tests here.
+
+class AvailabilityCacheTests(TestCase):
+    """Invalidation of cached bookable slots"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = CustomUser.objects.create_user('patient@example.com', role=UserRoles.PATIENT, is_verified=True)
+        cls.doctors = [
+            CustomUser.objects.create_user(f'doctor{index}@example.com', role=UserRoles.DOCTOR, is_verified=True)
+            for index in range(2)
+        ]
+        cls.start = timezone.now() + timedelta(days=1)
+
+    def slot_keys(self):
+        return [available_slots_cache_key(doctor.id, self.start.date()) for doctor in self.doctors]
+
+    def test_reassignment_invalidates_both_doctors(self):
+        appointment = Appointment.objects.create(
+            doctor=self.doctors[0], patient=self.patient,
+            appointment_time=self.start, end_time=self.start + timedelta(minutes=30),
+        )
+        appointment = Appointment.objects.get(pk=appointment.pk)
+        keys = self.slot_keys()
+
+        appointment.doctor = self.doctors[1]
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment.save()
+
+        new_keys = self.slot_keys()
+        self.assertNotEqual(new_keys[0], keys[0])
+        self.assertNotEqual(new_keys[1], keys[1])
+
+        # The next save only concerns the doctor it was saved with
+        appointment.notes = 'Moved'
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment.save()
+        self.assertEqual(self.slot_keys()[0], new_keys[0])
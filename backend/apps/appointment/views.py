@@ -15,6 +15,10 @@ from .serializers import (
 )
 from apps.accounts.models import UserRoles
 from apps.accounts.permissions import IsAdminOrSuperuser, IsVerified, IsStaff
+from apps.caching.conditional import ConditionalGetMixin
+from apps.caching.keys import get_or_compute
+from apps.replicas.mixins import ReplicaReadMixin
+from .cache_keys import AVAILABILITY_CACHE, available_slots_cache_key
 from datetime import datetime, timedelta, date, time
 import logging
 
@@ -51,9 +55,17 @@ class IsDoctorOrAdminOrReceptionist(IsAuthenticated):
             request.user.role in [UserRoles.DOCTOR, UserRoles.ADMIN, UserRoles.RECEPTIONIST]
         )
 
+class AppointmentConditionalGetMixin(ConditionalGetMixin):
+    """
+    Conditional GET for appointment views, whose serialized can_modify depends
+    on the time left before each appointment: an ETag stays current for at
+    most a minute, even if no appointment changed.
+    """
+    etag_time_bucket = 60
+
 # === Admin Views ===
 
-class AdminAppointmentListView(generics.ListAPIView):
+class AdminAppointmentListView(AppointmentConditionalGetMixin, generics.ListAPIView):
     """Admin view to list all appointments with filtering options"""
     permission_classes = [IsAuthenticated, IsVerified, IsAdminOrSuperuser]
     serializer_class = AppointmentSerializer
@@ -92,7 +104,7 @@ class AdminAppointmentListView(generics.ListAPIView):
         
         return queryset.order_by('-appointment_time')
 
-class AdminDoctorAppointmentStatsView(generics.ListAPIView):
+class AdminDoctorAppointmentStatsView(ReplicaReadMixin, generics.ListAPIView):
     """Admin view to get appointment stats by doctor"""
     permission_classes = [IsAuthenticated, IsVerified, IsAdminOrSuperuser]
     
@@ -426,7 +438,13 @@ class GetAvailableSlotsView(generics.GenericAPIView):
                 timezone.get_current_timezone()
             )
             
-            available_slots = self._get_available_time_slots(doctor, target_datetime)
+            # Cached per doctor and date until a booking, slot or time off of the
+            # doctor changes (see apps.appointment.cache_keys)
+            available_slots = get_or_compute(
+                AVAILABILITY_CACHE,
+                available_slots_cache_key(doctor.id, target_date),
+                lambda: self._get_available_time_slots(doctor, target_datetime),
+            )
             
             return Response({
                 "slots": available_slots,
@@ -542,7 +560,7 @@ class GetAvailableSlotsView(generics.GenericAPIView):
 
 # === Appointment Management ===
 
-class AppointmentViewSet(viewsets.ModelViewSet):
+class AppointmentViewSet(AppointmentConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for managing appointments"""
     permission_classes = [IsAuthenticated, IsVerified]
     
@@ -676,7 +694,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 "detail": "Cannot confirm this appointment due to its current status"
             }, status=status.HTTP_400_BAD_REQUEST)
 
-class PatientAppointmentListView(generics.ListAPIView):
+class PatientAppointmentListView(AppointmentConditionalGetMixin, generics.ListAPIView):
     """API to get a patient's upcoming and past appointments"""
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated, IsVerified, IsPatient]
@@ -696,7 +714,7 @@ class PatientAppointmentListView(generics.ListAPIView):
                 appointment_time__lte=timezone.now()
             ).order_by('-appointment_time')
 
-class DoctorAppointmentListView(generics.ListAPIView):
+class DoctorAppointmentListView(AppointmentConditionalGetMixin, generics.ListAPIView):
     """API to get a doctor's upcoming and past appointments"""
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated, IsVerified, IsDoctor]
@@ -720,7 +738,7 @@ class DoctorAppointmentListView(generics.ListAPIView):
                 appointment_time__lte=timezone.now()
             ).order_by('-appointment_time')
 
-class PatientAppointmentHistoryView(generics.ListAPIView):
+class PatientAppointmentHistoryView(AppointmentConditionalGetMixin, generics.ListAPIView):
     """API to get appointment history for a specific patient (for doctors)"""
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated, IsVerified, IsDoctor]
@@ -733,7 +751,7 @@ class PatientAppointmentHistoryView(generics.ListAPIView):
         ).order_by('-appointment_time')
 
 # === NEW: RECEPTIONIST APPOINTMENTS VIEW ===
-class ReceptionistAppointmentListView(generics.ListAPIView):
+class ReceptionistAppointmentListView(AppointmentConditionalGetMixin, generics.ListAPIView):
     """
     Receptionist view to list all appointments with filtering options.
     Similar to AdminAppointmentListView, but permission is for Receptionist.
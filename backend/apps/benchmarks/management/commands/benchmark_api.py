@@ -0,0 +1,90 @@
+import json
+import subprocess
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from rest_framework.status import is_success
+from apps.appointment.models import Appointment
+from apps.benchmarks.runner import BenchmarkContext, SCENARIOS, run_scenario, compare_results
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the key API endpoints against generated clinic data (see seed_clinic_data), "
+        "recording latency and query counts to JSON and optionally comparing with a previous run"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help="Timed requests per endpoint")
+        parser.add_argument('--warmup', type=int, default=2, help="Untimed requests per endpoint first")
+        parser.add_argument('--only', action='append', help="Run only this scenario (repeatable)")
+        parser.add_argument('--output', help="Write the results to this JSON file")
+        parser.add_argument('--compare', help="Previous results JSON file to compare against")
+        parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative p50 slowdown when comparing")
+        parser.add_argument('--fail-on-regression', action='store_true', help="Exit with an error if a regression is found")
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError("--iterations must be at least 1")
+        try:
+            context = BenchmarkContext()
+        except LookupError as e:
+            raise CommandError(str(e))
+
+        scenarios = SCENARIOS
+        if options['only']:
+            scenarios = [scenario for scenario in SCENARIOS if scenario.name in options['only']]
+            if not scenarios:
+                raise CommandError(f"No scenarios named {', '.join(options['only'])}")
+
+        results = []
+        self.stdout.write(f"{'scenario':<28} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'bytes':>10}")
+        for scenario in scenarios:
+            result = run_scenario(scenario, context, iterations=options['iterations'], warmup=options['warmup'])
+            results.append(result)
+            self.stdout.write(
+                f"{result['name']:<28} {result['status']:>6} {result['p50_ms']:>9} {result['p95_ms']:>9} "
+                f"{result['queries']:>8} {result['response_bytes']:>10}"
+            )
+
+        failed = [result for result in results if not is_success(result['status'])]
+        for result in failed:
+            self.stdout.write(self.style.WARNING(
+                f"{result['name']} answered {result['status']}: its numbers measure an error response"
+            ))
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'commit': current_commit(),
+            'database': connection.vendor,
+            'appointments': Appointment.objects.count(),
+            'iterations': options['iterations'],
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(report, output_file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['compare']:
+            with open(options['compare']) as previous_file:
+                previous = json.load(previous_file)
+            regressions = compare_results(previous['results'], results, tolerance=options['tolerance'])
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}"))
+            else:
+                for regression in regressions:
+                    self.stdout.write(self.style.WARNING(f"Regression: {regression}"))
+                if options['fail_on_regression']:
+                    raise CommandError(f"{len(regressions)} regression(s) found")
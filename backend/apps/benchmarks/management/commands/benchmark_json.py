@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from apps.benchmarks.runner import BenchmarkContext, SCENARIOS, time_json_codecs
+from sajilocms_backend.parsers import ORJSONParser
+from sajilocms_backend.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare JSON rendering and parsing time of DRF's json-based classes and the "
+        "orjson ones on the API responses of the generated clinic (see seed_clinic_data)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help="Renders and parses timed per response")
+        parser.add_argument('--only', action='append', help="Run only this scenario (repeatable)")
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError("--iterations must be at least 1")
+        try:
+            context = BenchmarkContext()
+        except LookupError as e:
+            raise CommandError(str(e))
+
+        scenarios = SCENARIOS
+        if options['only']:
+            scenarios = [scenario for scenario in SCENARIOS if scenario.name in options['only']]
+            if not scenarios:
+                raise CommandError(f"No scenarios named {', '.join(options['only'])}")
+
+        self.stdout.write(
+            f"{'scenario':<28} {'bytes':>10} {'json ms':>9} {'orjson ms':>10} {'speedup':>8} "
+            f"{'parse json':>11} {'parse orjson':>13}"
+        )
+        results = []
+        for scenario in scenarios:
+            result = time_json_codecs(
+                scenario, context, [JSONRenderer, ORJSONRenderer], [JSONParser, ORJSONParser],
+                iterations=options['iterations'],
+            )
+            if not result['render_ms']:
+                self.stdout.write(f"{result['name']:<28} skipped (status {result['status']})")
+                continue
+            results.append(result)
+            render, parse = result['render_ms'], result['parse_ms']
+            speedup = render['JSONRenderer'] / render['ORJSONRenderer'] if render['ORJSONRenderer'] else 0
+            self.stdout.write(
+                f"{result['name']:<28} {result['response_bytes']:>10} {render['JSONRenderer']:>9} "
+                f"{render['ORJSONRenderer']:>10} {speedup:>7.1f}x {parse['JSONParser']:>11} {parse['ORJSONParser']:>13}"
+            )
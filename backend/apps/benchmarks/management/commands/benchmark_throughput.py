@@ -0,0 +1,71 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from apps.benchmarks.runner import BenchmarkContext, SCENARIOS, run_load
+from .benchmark_api import current_commit
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure requests per second of the key API endpoints on a running server "
+        "(started separately against the same database), e.g. to compare database "
+        "connection settings"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Base URL of the running server")
+        parser.add_argument('--concurrency', type=int, default=8, help="Concurrent client threads")
+        parser.add_argument('--duration', type=float, default=10.0, help="Seconds per scenario")
+        parser.add_argument('--only', action='append', help="Run only this scenario (repeatable)")
+        parser.add_argument('--label', help="Free-form label stored with the results, e.g. the settings tested")
+        parser.add_argument('--output', help="Write the results to this JSON file")
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError("--concurrency must be at least 1")
+        try:
+            context = BenchmarkContext()
+        except LookupError as e:
+            raise CommandError(str(e))
+
+        scenarios = SCENARIOS
+        if options['only']:
+            scenarios = [scenario for scenario in SCENARIOS if scenario.name in options['only']]
+            if not scenarios:
+                raise CommandError(f"No scenarios named {', '.join(options['only'])}")
+
+        results = []
+        self.stdout.write(f"{'scenario':<28} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        for scenario in scenarios:
+            result = run_load(
+                options['url'], scenario, context,
+                concurrency=options['concurrency'], duration=options['duration'],
+            )
+            results.append(result)
+            self.stdout.write(
+                f"{result['name']:<28} {result['requests']:>9} {result['errors']:>7} {result['rps']:>9} "
+                f"{result['p50_ms']:>9} {result['p95_ms']:>9}"
+            )
+
+        if options['output']:
+            report = {
+                'generated_at': timezone.now().isoformat(),
+                'commit': current_commit(),
+                'label': options['label'],
+                'url': options['url'],
+                'database': connection.vendor,
+                'databases': {
+                    alias: {
+                        'CONN_MAX_AGE': config.get('CONN_MAX_AGE'),
+                        'CONN_HEALTH_CHECKS': config.get('CONN_HEALTH_CHECKS'),
+                        'pool': config.get('OPTIONS', {}).get('pool'),
+                    }
+                    for alias, config in settings.DATABASES.items()
+                },
+                'results': results,
+            }
+            with open(options['output'], 'w') as output_file:
+                json.dump(report, output_file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.benchmarks.seed import ClinicDataGenerator
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic clinic (doctors, patients, appointment history, records, pharmacy, chat) for benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--doctors', type=int, default=10, help="Number of doctors")
+        parser.add_argument('--patients', type=int, default=200, help="Number of patients")
+        parser.add_argument('--years', type=int, default=2, help="Years of appointment history")
+        parser.add_argument('--appointments-per-week', type=int, default=10, help="Appointments per doctor per week")
+        parser.add_argument('--upcoming-weeks', type=int, default=4, help="Weeks of upcoming appointments after today")
+        parser.add_argument('--medicines', type=int, default=50, help="Number of medicines")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed (same seed, same data)")
+        parser.add_argument('--clear', action='store_true', help="Delete previously generated data first")
+
+    def handle(self, *args, **options):
+        if options['doctors'] < 1 or options['patients'] < 1 or options['medicines'] < 1:
+            raise CommandError("--doctors, --patients and --medicines must be at least 1")
+        if options['upcoming_weeks'] < 0:
+            raise CommandError("--upcoming-weeks can't be negative")
+
+        if options['clear']:
+            deleted = ClinicDataGenerator.clear()
+            self.stdout.write(f"Deleted {deleted} generated users and their data")
+
+        generator = ClinicDataGenerator(
+            doctors=options['doctors'],
+            patients=options['patients'],
+            years=options['years'],
+            appointments_per_week=options['appointments_per_week'],
+            upcoming_weeks=options['upcoming_weeks'],
+            medicines=options['medicines'],
+            seed=options['seed'],
+        )
+        counts = generator.generate()
+        for model_name, count in counts.items():
+            self.stdout.write(f"  {model_name}: {count}")
+        self.stdout.write(self.style.SUCCESS("Clinic data generated"))
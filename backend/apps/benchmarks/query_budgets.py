@@ -0,0 +1,260 @@
+import json
+from dataclasses import dataclass, field
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.urls import URLResolver, get_resolver, reverse
+from apps.accounts.models import UserRoles
+from apps.appointment.models import Appointment, AppointmentStatus, AvailableTimeSlot, TimeOff
+from apps.ehr.models import MedicalRecord
+from apps.pharmacy.models import Medicine, Order, Billing
+from .runner import BenchmarkContext, QueryCounter, api_client_for
+from .seed import ClinicDataGenerator
+
+# URL namespaces that are not part of the API
+SKIPPED_NAMESPACES = {'admin'}
+
+# Roles tried, in order, until one is allowed to use an endpoint
+ROLE_ORDER = [UserRoles.ADMIN, UserRoles.DOCTOR, 'chat_patient', UserRoles.PHARMACIST, UserRoles.RECEPTIONIST]
+
+# Endpoints that only return data for a particular role (the role is otherwise
+# picked automatically, which could measure them on an empty result)
+ENDPOINT_ROLES = {
+    'get_chat_partners': 'chat_patient',
+    'get_conversations': UserRoles.DOCTOR,
+    'get_messages': 'chat_patient',
+    'search_messages': 'chat_patient',
+    'appointments:appointment-list': UserRoles.DOCTOR,
+    'appointments:time-off-list': UserRoles.DOCTOR,
+    'appointments:available-slot-list': UserRoles.DOCTOR,
+    'ehr:medical-record-list': UserRoles.DOCTOR,
+    'pharmacy:order-list-create': UserRoles.PHARMACIST,
+}
+
+# Query parameters needed for an endpoint to do its real work
+QUERY_PARAMS = {
+    'appointments:get-available-slots': {'doctor_id': '{doctor_id}', 'date': '{date}'},
+    'appointments:available-slots-by-date': {'doctor_id': '{doctor_id}', 'date': '{date}'},
+    'get_messages': {'target_user_id': '{doctor_id}'},
+    'get_chat_channel': {'target_user_id': '{patient_id}'},
+    'search_messages': {'q': 'visit'},
+    'chatbot:search': {'q': 'healthcare'},
+}
+
+# Request headers an endpoint needs, formatted like QUERY_PARAMS
+REQUEST_HEADERS = {
+    'monitoring:metrics': {'HTTP_AUTHORIZATION': 'Bearer {metrics_token}'},
+}
+
+# Data sizes compared: the second has several times more rows per user
+SMALL_DATA = {'doctors': 2, 'patients': 6, 'years': 1, 'appointments_per_week': 3, 'medicines': 10}
+LARGE_DATA = {'doctors': 3, 'patients': 12, 'years': 2, 'appointments_per_week': 6, 'medicines': 30}
+
+
+@dataclass
+class Endpoint:
+    """A URL pattern from the project URLconf"""
+    route: str
+    name: str
+    kwargs: list = field(default_factory=list)
+
+
+def iter_endpoints(patterns=None, prefix='', namespace=None):
+    """
+    Yield every named URL pattern in the URLconf (format-suffix variants skipped)
+    """
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            child_namespace = namespace
+            if pattern.namespace:
+                if pattern.namespace in SKIPPED_NAMESPACES:
+                    continue
+                child_namespace = f"{namespace}:{pattern.namespace}" if namespace else pattern.namespace
+            yield from iter_endpoints(pattern.url_patterns, prefix + str(pattern.pattern), child_namespace)
+        elif pattern.name:
+            kwargs = list(pattern.pattern.regex.groupindex)
+            if 'format' in kwargs:
+                continue
+            name = f"{namespace}:{pattern.name}" if namespace else pattern.name
+            yield Endpoint(route=prefix + str(pattern.pattern), name=name, kwargs=kwargs)
+
+
+def sample_objects(context):
+    """
+    Objects from the generated data used to fill URL path parameters, keyed by
+    URL name (or, for router routes, by the router basename)
+    """
+    doctor = context.users[UserRoles.DOCTOR]
+    appointment = Appointment.objects.filter(
+        doctor=doctor, patient_id=context.history_patient_id, status=AppointmentStatus.COMPLETED,
+    ).order_by('appointment_time').first()
+    record = MedicalRecord.objects.filter(appointment=appointment).first()
+    order = Order.objects.filter(status='PENDING').order_by('id').first() or Order.objects.order_by('id').first()
+    chat_session = context.chat_patient.chat_sessions.order_by('id').first()
+
+    objects = {
+        'accounts:user_detail': {'pk': context.history_patient_id},
+        'accounts:doctor_detail': {'pk': doctor.id},
+        'appointments:patient-history': {'patient_id': context.history_patient_id},
+        'ehr:get-or-create-record': {'appointment_id': appointment.pk if appointment else None},
+        'ehr:patient-medical-history': {'patient_id': context.history_patient_id},
+        'chatbot:session-detail': {'pk': chat_session.pk if chat_session else None},
+        'pharmacy:medicine-detail': {'pk': Medicine.objects.order_by('id').values_list('id', flat=True).first()},
+        'pharmacy:order-detail': {'pk': order.pk if order else None},
+        'pharmacy:fulfill-order': {'order_id': order.pk if order else None},
+        'pharmacy:billing-detail': {'pk': Billing.objects.order_by('id').values_list('id', flat=True).first()},
+        # Router basenames (detail routes and their actions)
+        'appointments:appointment': {'pk': appointment.pk if appointment else None},
+        'appointments:time-off': {'pk': TimeOff.objects.filter(doctor=doctor).values_list('id', flat=True).first()},
+        'appointments:available-slot': {'pk': AvailableTimeSlot.objects.filter(doctor=doctor).values_list('id', flat=True).first()},
+        'ehr:medical-record': {'pk': record.pk if record else None},
+    }
+    return objects
+
+
+def path_kwargs(endpoint, objects):
+    """
+    Return the path parameters for an endpoint, or None if there is no sample object
+    """
+    if not endpoint.kwargs:
+        return {}
+    candidates = [endpoint.name]
+    # Router routes are named "<basename>-<action>"
+    namespace, _, name = endpoint.name.rpartition(':')
+    parts = name.split('-')
+    for end in range(len(parts) - 1, 0, -1):
+        candidates.append(f"{namespace}:{'-'.join(parts[:end])}" if namespace else '-'.join(parts[:end]))
+    for candidate in candidates:
+        kwargs = objects.get(candidate)
+        if kwargs is not None:
+            if any(kwargs.get(key) is None for key in endpoint.kwargs):
+                return None
+            return {key: kwargs[key] for key in endpoint.kwargs}
+    return None
+
+
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+def measure(endpoint, context, objects, role):
+    """
+    GET an endpoint as a user with the given role (after one warm-up request) and
+    count its queries
+
+    Returns:
+        Tuple of (status code, query count), or None if the endpoint can't be resolved
+    """
+    kwargs = path_kwargs(endpoint, objects)
+    if kwargs is None:
+        return None
+    values = {
+        'doctor_id': context.users[UserRoles.DOCTOR].id,
+        'patient_id': context.history_patient_id,
+        'date': context.next_weekday.isoformat(),
+        'metrics_token': getattr(settings, 'METRICS_AUTH_TOKEN', ''),
+    }
+    params = {key: value.format(**values) for key, value in QUERY_PARAMS.get(endpoint.name, {}).items()}
+    headers = {key: value.format(**values) for key, value in REQUEST_HEADERS.get(endpoint.name, {}).items()}
+    path = reverse(endpoint.name, kwargs=kwargs)
+
+    client = api_client_for(context.user(role))
+    # Record server errors as 500 responses instead of aborting the whole run
+    client.raise_request_exception = False
+    clear_caches()
+    client.get(path, params, **headers)
+    with QueryCounter() as counter:
+        response = client.get(path, params, **headers)
+    return response.status_code, len(counter)
+
+
+def pick_role(endpoint, context, objects):
+    """First role in ROLE_ORDER allowed to GET the endpoint (or the first role if none is)"""
+    for role in ROLE_ORDER:
+        result = measure(endpoint, context, objects, role)
+        if result is None:
+            return None
+        if result[0] not in (401, 403):
+            return role
+    return ROLE_ORDER[0]
+
+
+def _measure_dataset(data_options, endpoints, roles=None):
+    """
+    Seed a dataset, measure every endpoint and roll the data back
+
+    Returns:
+        Tuple of ({endpoint name: (status, queries)}, {endpoint name: role})
+    """
+    results = {}
+    roles = dict(roles or {})
+    with transaction.atomic():
+        ClinicDataGenerator(**data_options).generate()
+        context = BenchmarkContext()
+        objects = sample_objects(context)
+        for endpoint in endpoints:
+            if endpoint.name not in roles:
+                roles[endpoint.name] = ENDPOINT_ROLES.get(endpoint.name) or pick_role(endpoint, context, objects)
+            role = roles[endpoint.name]
+            if role is None:
+                continue
+            result = measure(endpoint, context, objects, role)
+            if result is not None:
+                results[endpoint.name] = result
+        transaction.set_rollback(True)
+    return results, roles
+
+
+def build_query_budget_report(small=SMALL_DATA, large=LARGE_DATA):
+    """
+    Measure the queries each endpoint runs against a small and a large dataset
+
+    Must run in a database that can be written to and rolled back (e.g. a test database).
+
+    Returns:
+        List of dicts per endpoint: route, URL name, role, statuses and query
+        counts at both sizes, the budget (the larger count), and whether the
+        query count grew with the data. Endpoints that can't be measured (no
+        sample object, or write-only) have a `skipped` reason instead.
+    """
+    endpoints = list(iter_endpoints())
+    small_results, roles = _measure_dataset(small, endpoints)
+    large_results, _ = _measure_dataset(large, endpoints, roles)
+
+    report = []
+    for endpoint in endpoints:
+        if endpoint.name in small_results and endpoint.name in large_results:
+            small_status, small_queries = small_results[endpoint.name]
+            large_status, large_queries = large_results[endpoint.name]
+            if small_status == large_status == 405:
+                report.append({
+                    'route': endpoint.route,
+                    'name': endpoint.name,
+                    'skipped': "GET not allowed",
+                })
+                continue
+            report.append({
+                'route': endpoint.route,
+                'name': endpoint.name,
+                'role': str(roles[endpoint.name]),
+                'status': [small_status, large_status],
+                'queries_small': small_queries,
+                'queries_large': large_queries,
+                'budget': max(small_queries, large_queries),
+                'grows_with_data': large_queries > small_queries,
+            })
+        else:
+            report.append({
+                'route': endpoint.route,
+                'name': endpoint.name,
+                'skipped': "no sample object for the path parameters",
+            })
+    return report
+
+
+def write_report(report, path):
+    with open(path, 'w') as report_file:
+        json.dump(report, report_file, indent=2)
@@ -0,0 +1,333 @@
+import io
+import math
+import time
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+import requests
+from rest_framework.status import is_success
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.accounts.models import CustomUser, UserRoles
+from apps.chatbot.models import ChatSession
+from apps.communication.models import Conversation
+from .seed import EMAIL_DOMAIN
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def api_client_for(user):
+    """
+    API client authenticated the way the frontend is: with a JWT access token
+    cookie, so authentication runs (and is counted) on every request
+    """
+    hosts = [host for host in settings.ALLOWED_HOSTS if host not in ('*', '')]
+    client = APIClient(SERVER_NAME=hosts[0].lstrip('.') if hosts else 'testserver')
+    if user is not None:
+        client.cookies['access_token'] = str(AccessToken.for_user(user))
+    return client
+
+
+class BenchmarkContext:
+    """
+    Users and objects from the generated clinic that requests are made as and about
+
+    Raises:
+        LookupError: If no generated data is found (run seed_clinic_data first)
+    """
+
+    def __init__(self):
+        users = CustomUser.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+        self.users = {
+            role: users.filter(role=role).order_by('id').first()
+            for role in (UserRoles.ADMIN, UserRoles.DOCTOR, UserRoles.PATIENT, UserRoles.RECEPTIONIST, UserRoles.PHARMACIST)
+        }
+        if any(user is None for user in self.users.values()):
+            raise LookupError("No generated clinic data found; run the seed_clinic_data command first")
+
+        doctor = self.users[UserRoles.DOCTOR]
+        # A patient of the doctor who has messaged them (and, if possible, used the
+        # chatbot), so history and chat endpoints return real data
+        partner_ids = set()
+        for low_id, high_id in Conversation.objects.filter(Q(user_low=doctor) | Q(user_high=doctor)).values_list('user_low_id', 'user_high_id'):
+            partner_ids.update((low_id, high_id))
+        partner_ids.discard(doctor.id)
+        chatbot_users = set(ChatSession.objects.filter(user_id__in=partner_ids).values_list('user_id', flat=True))
+        patient_id = min(chatbot_users or partner_ids or {self.users[UserRoles.PATIENT].id})
+        self.chat_patient = CustomUser.objects.get(id=patient_id)
+        self.history_patient_id = patient_id
+
+        next_weekday = timezone.localdate() + timedelta(days=1)
+        while next_weekday.weekday() >= 5:
+            next_weekday += timedelta(days=1)
+        self.next_weekday = next_weekday
+
+    def user(self, role):
+        if role == 'chat_patient':
+            return self.chat_patient
+        return self.users[role]
+
+
+@dataclass
+class Scenario:
+    """A GET request made as a user with the given role (or 'chat_patient')"""
+    name: str
+    role: str
+    path: str
+    params: object = None
+
+    def resolve(self, context):
+        """Return (path, query params) with placeholders filled in from the context"""
+        values = {
+            'doctor_id': context.users[UserRoles.DOCTOR].id,
+            'patient_id': context.history_patient_id,
+            'date': context.next_weekday.isoformat(),
+        }
+        path = self.path.format(**values)
+        params = {key: str(value).format(**values) for key, value in (self.params or {}).items()}
+        return path, params
+
+
+SCENARIOS = [
+    Scenario('availability', 'PATIENT', '/appointment/get-available-slots/', {'doctor_id': '{doctor_id}', 'date': '{date}'}),
+    Scenario('doctor_list', 'PATIENT', '/auth/doctors/'),
+    Scenario('admin_user_list', 'ADMIN', '/auth/admin/users/'),
+    Scenario('patient_appointments', 'chat_patient', '/appointment/patient/appointments/', {'filter': 'past'}),
+    Scenario('doctor_appointments', 'DOCTOR', '/appointment/doctor/appointments/', {'filter': 'upcoming'}),
+    Scenario('receptionist_appointments', 'RECEPTIONIST', '/appointment/appointments/', {'filter': 'upcoming'}),
+    Scenario('admin_appointments', 'ADMIN', '/appointment/admin/appointments/', {'doctor_id': '{doctor_id}'}),
+    Scenario('admin_doctor_stats', 'ADMIN', '/appointment/admin/doctor-stats/'),
+    Scenario('doctor_patient_history', 'DOCTOR', '/appointment/doctor/patient-history/{patient_id}/'),
+    Scenario('ehr_records', 'DOCTOR', '/ehr/records/'),
+    Scenario('ehr_patient_history', 'DOCTOR', '/ehr/patient-history/{patient_id}/'),
+    Scenario('pharmacy_medicines', 'PHARMACIST', '/api/pharmacy/medicines/'),
+    Scenario('pharmacy_orders', 'PHARMACIST', '/api/pharmacy/orders/'),
+    Scenario('pharmacy_billings', 'PHARMACIST', '/api/pharmacy/billings/'),
+    Scenario('pharmacy_stock_report', 'ADMIN', '/api/pharmacy/reports/stock/'),
+    Scenario('pharmacy_expired_report', 'ADMIN', '/api/pharmacy/reports/expired/'),
+    Scenario('pharmacy_most_used_report', 'ADMIN', '/api/pharmacy/reports/most-used/'),
+    Scenario('chat_partners', 'chat_patient', '/communication/get_chat_partners/'),
+    Scenario('chat_conversations', 'DOCTOR', '/communication/get_conversations/'),
+    Scenario('chat_messages', 'chat_patient', '/communication/get_messages/', {'target_user_id': '{doctor_id}', 'limit': '50'}),
+    Scenario('chatbot_sessions', 'chat_patient', '/chatbot/sessions/'),
+]
+
+
+class QueryCounter:
+    """Capture queries on every configured database connection"""
+
+    def __enter__(self):
+        self.contexts = [CaptureQueriesContext(connection) for connection in connections.all()]
+        for context in self.contexts:
+            context.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        for context in self.contexts:
+            context.__exit__(*exc_info)
+
+    @property
+    def queries(self):
+        return [query for context in self.contexts for query in context.captured_queries]
+
+    def __len__(self):
+        return sum(len(context) for context in self.contexts)
+
+
+def run_scenario(scenario, context, iterations=20, warmup=2):
+    """
+    Time a scenario's request and count its queries
+
+    Returns:
+        Dict with the request, its status, latency percentiles (ms), queries
+        per request and response size. The status is the first non-2xx one
+        seen, if any, so a scenario that fails only sometimes isn't reported
+        as succeeding.
+    """
+    path, params = scenario.resolve(context)
+    client = api_client_for(context.user(scenario.role))
+
+    for _ in range(warmup):
+        client.get(path, params)
+
+    durations = []
+    query_counts = []
+    response = None
+    status_code = None
+    for _ in range(iterations):
+        with QueryCounter() as counter:
+            start = time.perf_counter()
+            response = client.get(path, params)
+            durations.append((time.perf_counter() - start) * 1000)
+        query_counts.append(len(counter))
+        if status_code is None or is_success(status_code):
+            status_code = response.status_code
+
+    durations.sort()
+    return {
+        'name': scenario.name,
+        'role': scenario.role,
+        'path': path,
+        'params': params,
+        'status': status_code,
+        'iterations': iterations,
+        'p50_ms': round(percentile(durations, 50), 2),
+        'p95_ms': round(percentile(durations, 95), 2),
+        'max_ms': round(durations[-1], 2),
+        'mean_ms': round(sum(durations) / len(durations), 2),
+        'queries': max(query_counts),
+        'response_bytes': len(response.content),
+    }
+
+
+def run_load(base_url, scenario, context, concurrency=8, duration=10.0):
+    """
+    Send a scenario's request over HTTP from several threads for a fixed time
+
+    Unlike run_scenario this goes through a running server (runserver, daphne or
+    gunicorn), so connection handling between requests is part of what is measured.
+
+    Args:
+        base_url: Server URL, e.g. http://127.0.0.1:8000
+        scenario: Scenario to request
+        context: BenchmarkContext of the database the server uses
+        concurrency: Number of client threads, each with its own keep-alive session
+        duration: Seconds to keep sending requests
+
+    Returns:
+        Dict with the request, completed requests, errors, requests per second
+        and latency percentiles (ms)
+    """
+    path, params = scenario.resolve(context)
+    url = base_url.rstrip('/') + path
+    user = context.user(scenario.role)
+    token = str(AccessToken.for_user(user)) if user is not None else None
+
+    durations = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        session = requests.Session()
+        if token:
+            session.cookies.set('access_token', token)
+        local_durations = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = session.get(url, params=params, timeout=30)
+                ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            local_durations.append((time.perf_counter() - start) * 1000)
+            if not ok:
+                local_errors += 1
+        with lock:
+            durations.extend(local_durations)
+            errors.append(local_errors)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    durations.sort()
+    return {
+        'name': scenario.name,
+        'role': scenario.role,
+        'path': path,
+        'params': params,
+        'concurrency': concurrency,
+        'requests': len(durations),
+        'errors': sum(errors),
+        'rps': round(len(durations) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(durations, 50), 2),
+        'p95_ms': round(percentile(durations, 95), 2),
+    }
+
+
+def time_json_codecs(scenario, context, renderers, parsers, iterations=50):
+    """
+    Time rendering a scenario's response data, and parsing it back, with each of
+    the given DRF renderer and parser classes
+
+    Returns:
+        Dict with the request, response size and mean milliseconds per render and
+        per parse, keyed by class name
+    """
+    path, params = scenario.resolve(context)
+    client = api_client_for(context.user(scenario.role))
+    response = client.get(path, params, HTTP_ACCEPT='application/json')
+    data = getattr(response, 'data', None)
+
+    result = {
+        'name': scenario.name,
+        'path': path,
+        'status': response.status_code,
+        'response_bytes': len(response.content),
+        'render_ms': {},
+        'parse_ms': {},
+    }
+    if data is None:
+        return result
+
+    body = None
+    for renderer_class in renderers:
+        renderer = renderer_class()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            body = renderer.render(data, 'application/json', {})
+        result['render_ms'][renderer_class.__name__] = round((time.perf_counter() - start) * 1000 / iterations, 3)
+
+    for parser_class in parsers:
+        parser = parser_class()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            parser.parse(io.BytesIO(body), 'application/json', {})
+        result['parse_ms'][parser_class.__name__] = round((time.perf_counter() - start) * 1000 / iterations, 3)
+    return result
+
+
+def compare_results(previous, current, tolerance=0.25):
+    """
+    Compare two benchmark runs
+
+    Args:
+        previous / current: Lists of result dicts from run_scenario
+        tolerance: Allowed relative p50 latency increase
+
+    Returns:
+        List of human-readable regressions (a different status, more queries, or
+        slower beyond tolerance)
+    """
+    previous_by_name = {result['name']: result for result in previous}
+    regressions = []
+    for result in current:
+        before = previous_by_name.get(result['name'])
+        if before is None:
+            continue
+        if result['status'] != before['status']:
+            # An error response is usually faster; its timings are not comparable
+            regressions.append(f"{result['name']}: status {before['status']} -> {result['status']}")
+            continue
+        if result['queries'] > before['queries']:
+            regressions.append(f"{result['name']}: queries {before['queries']} -> {result['queries']}")
+        if before['p50_ms'] and result['p50_ms'] > before['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{result['name']}: p50 {before['p50_ms']} ms -> {result['p50_ms']} ms")
+    return regressions
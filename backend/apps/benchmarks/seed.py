@@ -0,0 +1,377 @@
+import random
+import logging
+from datetime import datetime, date, time, timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from apps.accounts.models import CustomUser, DoctorProfile, UserRoles
+from apps.appointment.models import Appointment, AppointmentStatus, AvailableTimeSlot, TimeOff
+from apps.chatbot.models import ChatSession, ChatMessage
+from apps.communication.models import Message, Conversation, conversation_key_for
+from apps.ehr.models import MedicalRecord, Prescription
+from apps.pharmacy.models import Medicine, Order, OrderMedicine, Billing, StockTransaction
+
+logger = logging.getLogger(__name__)
+
+# Every generated user has an email in this domain, and every generated medicine
+# a name with this prefix, so generated data can be told apart and removed
+EMAIL_DOMAIN = "bench.sajilocms.test"
+MEDICINE_PREFIX = "Bench "
+PASSWORD = "benchmark-password"
+
+SPECIALTIES = [
+    "Cardiology", "Dermatology", "General Medicine", "Neurology", "Orthopedics",
+    "Pediatrics", "Psychiatry", "Gynecology", "ENT", "Ophthalmology",
+]
+FIRST_NAMES = [
+    "Aarav", "Anita", "Bikash", "Deepa", "Gita", "Hari", "Kabita", "Manish", "Nisha", "Prakash",
+    "Rajesh", "Sabina", "Sanjay", "Sita", "Suman", "Sunita", "Ramesh", "Pooja", "Arjun", "Maya",
+]
+LAST_NAMES = [
+    "Adhikari", "Bhandari", "Gurung", "Karki", "KC", "Lama", "Maharjan", "Pandey", "Rai", "Shrestha",
+    "Tamang", "Thapa", "Sharma", "Poudel", "Khadka",
+]
+COMPLAINTS = [
+    "Persistent headache", "Lower back pain", "Seasonal allergies", "Chest tightness",
+    "Skin rash", "Knee pain after running", "Trouble sleeping", "Follow-up visit", "Fever and cough",
+]
+DIAGNOSES = [
+    "Tension headache", "Muscle strain", "Allergic rhinitis", "Gastritis", "Contact dermatitis",
+    "Upper respiratory infection", "Mild hypertension", "Insomnia",
+]
+MEDICINE_CATEGORIES = ["Analgesic", "Antibiotic", "Antihistamine", "Antacid", "Antihypertensive", "Supplement"]
+CHAT_PROMPTS = [
+    "What are the symptoms of flu?", "How can I book an appointment?", "Which doctors are available on Monday?",
+    "How much water should I drink daily?", "What helps with knee pain?",
+]
+
+# Weekly availability for every doctor: weekdays, morning and afternoon blocks
+WEEKLY_BLOCKS = [(time(9, 0), time(12, 0)), (time(13, 0), time(17, 0))]
+APPOINTMENT_MINUTES = 30
+
+
+def bench_email(role, index):
+    return f"{role.lower()}{index}@{EMAIL_DOMAIN}"
+
+
+def _slot_starts():
+    """Start times of all 30-minute appointment slots within a day's availability"""
+    starts = []
+    for block_start, block_end in WEEKLY_BLOCKS:
+        current = datetime.combine(date.min, block_start)
+        end = datetime.combine(date.min, block_end)
+        while current + timedelta(minutes=APPOINTMENT_MINUTES) <= end:
+            starts.append(current.time())
+            current += timedelta(minutes=APPOINTMENT_MINUTES)
+    return starts
+
+
+class ClinicDataGenerator:
+    """
+    Seed a realistic clinic for benchmarks and query-count checks
+
+    Creates doctors (with profiles and weekly availability), patients, staff,
+    years of appointment history plus upcoming appointments, medical records with
+    prescriptions for completed visits, a medicine catalogue with stock movements,
+    pharmacy orders with billing, doctor-patient messages and chatbot sessions.
+
+    Rows are written with bulk_create, so model save() methods and signals are
+    skipped; derived rows they would create (billing, conversations, session
+    counters) are created explicitly. The same arguments and seed always produce
+    the same data.
+    """
+
+    def __init__(self, doctors=10, patients=200, years=2, appointments_per_week=10,
+                 medicines=50, upcoming_weeks=4, seed=0):
+        self.doctors = doctors
+        self.patients = patients
+        self.years = years
+        self.appointments_per_week = appointments_per_week
+        self.medicines = medicines
+        self.upcoming_weeks = upcoming_weeks
+        self.random = random.Random(seed)
+        self.counts = {}
+
+    @staticmethod
+    def clear():
+        """
+        Delete all generated data
+
+        Returns:
+            Number of generated users deleted (their appointments, records,
+            orders and messages are deleted with them)
+        """
+        with transaction.atomic():
+            users = CustomUser.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+            count = users.count()
+            # Prescriptions protect medicines, so remove the users (and with them
+            # their records and prescriptions) before the medicines
+            users.delete()
+            Medicine.objects.filter(name__startswith=MEDICINE_PREFIX).delete()
+        return count
+
+    def generate(self):
+        """
+        Create the data set in one transaction
+
+        Returns:
+            Dict of model name to number of rows created
+        """
+        with transaction.atomic():
+            password = make_password(PASSWORD)
+            doctors = self._create_users(UserRoles.DOCTOR, self.doctors, password)
+            patients = self._create_users(UserRoles.PATIENT, self.patients, password)
+            staff = [
+                self._create_users(role, 1, password)[0]
+                for role in (UserRoles.ADMIN, UserRoles.RECEPTIONIST, UserRoles.PHARMACIST)
+            ]
+            self._create_doctor_profiles(doctors)
+            self._create_availability(doctors)
+            self._create_time_off(doctors)
+            medicines = self._create_medicines(staff[2])
+            appointments = self._create_appointments(doctors, patients, staff[1])
+            prescriptions = self._create_medical_records(appointments, medicines)
+            self._create_orders(prescriptions)
+            self._create_messages(appointments)
+            self._create_chat_sessions(patients)
+        logger.info("Generated clinic data: %s", self.counts)
+        return self.counts
+
+    def _bulk_create(self, model, objects):
+        created = model.objects.bulk_create(objects, batch_size=1000)
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(created)
+        return created
+
+    def _create_users(self, role, count, password):
+        offset = CustomUser.objects.filter(role=role, email__endswith=f"@{EMAIL_DOMAIN}").count()
+        users = [
+            CustomUser(
+                email=bench_email(role, offset + index),
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                role=role,
+                password=password,
+                is_verified=True,
+                is_staff=role == UserRoles.ADMIN,
+                is_superuser=role == UserRoles.ADMIN,
+            )
+            for index in range(count)
+        ]
+        return self._bulk_create(CustomUser, users)
+
+    def _create_doctor_profiles(self, doctors):
+        self._bulk_create(DoctorProfile, [
+            DoctorProfile(
+                user=doctor,
+                license_number=f"BENCH-{doctor.id}",
+                specialty=SPECIALTIES[index % len(SPECIALTIES)],
+            )
+            for index, doctor in enumerate(doctors)
+        ])
+
+    def _create_availability(self, doctors):
+        self._bulk_create(AvailableTimeSlot, [
+            AvailableTimeSlot(doctor=doctor, day_of_week=day, start_time=start, end_time=end)
+            for doctor in doctors
+            for day in range(5)
+            for start, end in WEEKLY_BLOCKS
+        ])
+
+    def _create_time_off(self, doctors):
+        now = timezone.now()
+        time_offs = []
+        for doctor in doctors:
+            start = now + timedelta(days=self.random.randint(7, 60))
+            time_offs.append(TimeOff(
+                doctor=doctor,
+                start_time=start,
+                end_time=start + timedelta(days=self.random.randint(1, 5)),
+                reason="Conference",
+                is_approved=self.random.random() < 0.5,
+            ))
+        self._bulk_create(TimeOff, time_offs)
+
+    def _create_medicines(self, pharmacist):
+        today = timezone.localdate()
+        medicines = []
+        for index in range(self.medicines):
+            manufactured = today - timedelta(days=self.random.randint(30, 700))
+            medicines.append(Medicine(
+                name=f"{MEDICINE_PREFIX}Medicine {index:04d}",
+                generic_name=f"Generic {index:04d}",
+                manufacturer=self.random.choice(["Nepal Pharma", "Himalaya Labs", "Everest Meds"]),
+                manufacture_date=manufactured,
+                # A few are already expired, for the expired-medicines report
+                expiration_date=manufactured + timedelta(days=self.random.randint(365, 1100)),
+                price=Decimal(self.random.randint(50, 5000)) / 10,
+                stock_quantity=self.random.choice([0, 5, 8, 25, 100, 250, 500]),
+                low_stock_threshold=10,
+                category=self.random.choice(MEDICINE_CATEGORIES),
+                barcode=f"BENCH{index:08d}",
+            ))
+        medicines = self._bulk_create(Medicine, medicines)
+        self._bulk_create(StockTransaction, [
+            StockTransaction(
+                medicine=medicine,
+                transaction_type='ADD',
+                quantity=self.random.randint(50, 500),
+                reason="Initial stock",
+                performed_by=pharmacist,
+            )
+            for medicine in medicines
+        ])
+        return medicines
+
+    def _create_appointments(self, doctors, patients, receptionist):
+        """Weekly appointments over the last `years` years and the next `upcoming_weeks` weeks"""
+        now = timezone.now()
+        today = timezone.localdate()
+        monday = today - timedelta(days=today.weekday())
+        slot_starts = _slot_starts()
+        weekday_slots = [(day, start) for day in range(5) for start in slot_starts]
+        per_week = min(self.appointments_per_week, len(weekday_slots))
+
+        appointments = []
+        for week in range(-52 * self.years, self.upcoming_weeks):
+            week_start = monday + timedelta(weeks=week)
+            for doctor in doctors:
+                for day, start in self.random.sample(weekday_slots, per_week):
+                    start_at = timezone.make_aware(datetime.combine(week_start + timedelta(days=day), start))
+                    patient = self.random.choice(patients)
+                    if start_at < now:
+                        status = self.random.choices(
+                            [AppointmentStatus.COMPLETED, AppointmentStatus.CANCELLED, AppointmentStatus.MISSED],
+                            weights=[80, 12, 8],
+                        )[0]
+                    else:
+                        status = self.random.choice([AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED])
+                    appointments.append(Appointment(
+                        doctor=doctor,
+                        patient=patient,
+                        patient_name=patient.get_full_name(),
+                        patient_email=patient.email,
+                        appointment_time=start_at,
+                        end_time=start_at + timedelta(minutes=APPOINTMENT_MINUTES),
+                        reason=self.random.choice(COMPLAINTS),
+                        status=status,
+                        created_by=receptionist if self.random.random() < 0.3 else patient,
+                    ))
+        return self._bulk_create(Appointment, appointments)
+
+    def _create_medical_records(self, appointments, medicines):
+        completed = [a for a in appointments if a.status == AppointmentStatus.COMPLETED]
+        records = self._bulk_create(MedicalRecord, [
+            MedicalRecord(
+                appointment=appointment,
+                chief_complaint=appointment.reason,
+                observations="Vitals within normal range.",
+                diagnosis=self.random.choice(DIAGNOSES),
+                treatment_plan="Rest, hydration and prescribed medication.",
+                is_locked=True,
+                created_by=appointment.doctor,
+            )
+            for appointment in completed
+        ])
+        prescriptions = []
+        for record in records:
+            for medicine in self.random.sample(medicines, self.random.randint(0, min(3, len(medicines)))):
+                prescriptions.append(Prescription(
+                    medical_record=record,
+                    medicine=medicine,
+                    quantity=self.random.randint(1, 30),
+                    dosage="500mg",
+                    frequency=self.random.choice(["Once daily", "Twice daily", "Every 8 hours"]),
+                    duration=self.random.choice(["5 days", "7 days", "14 days"]),
+                ))
+        return self._bulk_create(Prescription, prescriptions)
+
+    def _create_orders(self, prescriptions):
+        """Pharmacy orders for about a third of prescriptions, with their line items and billing"""
+        patient_by_record = dict(
+            MedicalRecord.objects.filter(id__in={p.medical_record_id for p in prescriptions})
+            .values_list('id', 'appointment__patient_id')
+        )
+        ordered = [p for p in prescriptions if self.random.random() < 0.33]
+        orders = self._bulk_create(Order, [
+            Order(
+                patient_id=patient_by_record[prescription.medical_record_id],
+                status=self.random.choice(['PENDING', 'FULFILLED', 'FULFILLED', 'CANCELLED']),
+            )
+            for prescription in ordered
+        ])
+        prices = dict(Medicine.objects.filter(id__in={p.medicine_id for p in ordered}).values_list('id', 'price'))
+        self._bulk_create(OrderMedicine, [
+            OrderMedicine(order=order, medicine_id=prescription.medicine_id,
+                          quantity=prescription.quantity, prescription=prescription)
+            for order, prescription in zip(orders, ordered)
+        ])
+        self._bulk_create(Billing, [
+            Billing(
+                order=order,
+                total_amount=prices[prescription.medicine_id] * prescription.quantity,
+                payment_status='PAID' if order.status == 'FULFILLED' else 'UNPAID',
+            )
+            for order, prescription in zip(orders, ordered)
+        ])
+
+    def _create_messages(self, appointments):
+        """A short exchange between each doctor and up to 20 of their recent patients"""
+        pairs = {}
+        for appointment in reversed(appointments):
+            if appointment.status == AppointmentStatus.COMPLETED:
+                doctor_pairs = pairs.setdefault(appointment.doctor_id, set())
+                if len(doctor_pairs) < 20:
+                    doctor_pairs.add(appointment.patient_id)
+
+        messages = []
+        for doctor_id, patient_ids in pairs.items():
+            for patient_id in patient_ids:
+                key = conversation_key_for(doctor_id, patient_id)
+                for index in range(self.random.randint(2, 8)):
+                    sender, recipient = (patient_id, doctor_id) if index % 2 == 0 else (doctor_id, patient_id)
+                    messages.append(Message(
+                        sender_id=sender,
+                        recipient_id=recipient,
+                        content=f"Message {index} about my recent visit",
+                        conversation_key=key,
+                    ))
+        messages = self._bulk_create(Message, messages)
+
+        latest = {}
+        for message in messages:
+            latest[message.conversation_key] = message
+        conversations = []
+        for key, message in latest.items():
+            low_id, high_id = sorted((message.sender_id, message.recipient_id))
+            conversations.append(Conversation(
+                key=key,
+                user_low_id=low_id,
+                user_high_id=high_id,
+                last_message=message,
+                last_message_at=message.timestamp,
+            ))
+        self._bulk_create(Conversation, conversations)
+
+    def _create_chat_sessions(self, patients):
+        """One to three chatbot sessions for every patient"""
+        sessions = self._bulk_create(ChatSession, [
+            ChatSession(user=patient, title=self.random.choice(CHAT_PROMPTS))
+            for patient in patients
+            for _ in range(self.random.randint(1, 3))
+        ])
+        messages = []
+        for session in sessions:
+            for index in range(self.random.randint(1, 5)):
+                messages.append(ChatMessage(session=session, role='user', content=self.random.choice(CHAT_PROMPTS)))
+                messages.append(ChatMessage(session=session, role='assistant', content="This is general healthcare information."))
+        messages = self._bulk_create(ChatMessage, messages)
+
+        # Denormalized session counters, normally kept by ChatSession.add_message
+        per_session = {}
+        for message in messages:
+            per_session[message.session_id] = per_session.get(message.session_id, 0) + 1
+        for session in sessions:
+            session.message_count = per_session.get(session.id, 0)
+            session.last_message_preview = "This is general healthcare information."
+        ChatSession.objects.bulk_update(sessions, ['message_count', 'last_message_preview'], batch_size=1000)
@@ -0,0 +1,93 @@
+"""
+Conditional GET for DRF list and detail views
+
+ETags are computed from the data instead of by hashing the rendered body: for a
+list, one aggregate query returns the row count and latest modification time of
+the filtered queryset; for a detail view, the object's own modification time is
+used. A matching If-None-Match is answered with 304 before anything is
+serialized.
+
+The ETag also covers the view, the requesting user (responses are per user), the
+full path with its query string (filters, page) and CACHE_VERSION (bump it when
+serializers change shape). Changes to related rows that don't touch the listed
+rows' timestamps are not seen; add their timestamp fields to
+`etag_timestamp_fields` (e.g. 'order__updated_at') where that matters, and count
+related rows that have no timestamp (e.g. order line items) with
+`etag_count_fields`. Views whose
+output also depends on the clock (e.g. "can still cancel") set
+`etag_time_bucket` to the number of seconds a response may stay current.
+"""
+import time
+import hashlib
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    """Strong ETag from the given parts"""
+    digest = hashlib.md5("|".join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+class ConditionalGetMixin:
+    """
+    Mixin for DRF generic views adding ETags to list and retrieve responses and
+    answering unchanged requests with 304 Not Modified
+
+    Responses are marked `Cache-Control: private, no-cache`, so browsers keep
+    them but revalidate on every use.
+    """
+    etag_timestamp_fields = ('updated_at',)
+    etag_count_fields = ()
+    etag_time_bucket = None
+
+    def _etag_scope(self, request):
+        scope = [
+            type(self).__qualname__,
+            getattr(request.user, 'pk', None),
+            request.get_full_path(),
+            getattr(settings, 'CACHE_VERSION', 1),
+        ]
+        if self.etag_time_bucket:
+            scope.append(int(time.time() // self.etag_time_bucket))
+        return scope
+
+    def _aggregate_etag_values(self, queryset):
+        aggregates = {'etag_count': Count('pk', distinct=True)}
+        for index, field in enumerate(self.etag_timestamp_fields):
+            aggregates[f'etag_max_{index}'] = Max(field)
+        for index, field in enumerate(self.etag_count_fields):
+            aggregates[f'etag_count_{index}'] = Count(field, distinct=True)
+        values = queryset.order_by().aggregate(**aggregates)
+        return [values[key] for key in sorted(values)]
+
+    def get_list_etag(self, request, queryset):
+        return make_etag(*self._etag_scope(request), *self._aggregate_etag_values(queryset))
+
+    def get_object_etag(self, request, instance):
+        if self.etag_count_fields or any('__' in field for field in self.etag_timestamp_fields):
+            # Related rows need a query
+            values = self._aggregate_etag_values(type(instance)._default_manager.filter(pk=instance.pk))
+        else:
+            values = [getattr(instance, field, None) for field in self.etag_timestamp_fields]
+        return make_etag(*self._etag_scope(request), instance.pk, *values)
+
+    def _conditional_response(self, request, etag, build_response):
+        not_modified = get_conditional_response(request, etag=etag)
+        response = not_modified if not_modified is not None else build_response()
+        if response.status_code in (200, 304):
+            response.headers['ETag'] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = self.get_list_etag(request, queryset)
+        return self._conditional_response(request, etag, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = self.get_object_etag(request, instance)
+        return self._conditional_response(request, etag, lambda: Response(self.get_serializer(instance).data))
@@ -0,0 +1,90 @@
+"""
+Cache key helpers
+
+Keys are plain strings built from their parts. Keys that belong to a namespace
+(e.g. everything about one doctor's availability) embed the namespace's current
+version, so a whole namespace is invalidated at once by bumping its version
+instead of finding and deleting every key in it. Entries under an old version
+are never read again and expire on their own.
+
+The per-alias VERSION in settings.CACHES (CACHE_VERSION) is applied by Django on
+top of this, to invalidate everything after an incompatible deploy.
+"""
+import uuid
+import logging
+from django.core.cache import caches
+from apps.replicas.routing import replica_for_read
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE_VERSION_PREFIX = "ns"
+
+# Distinguishes a cached None from a miss
+_MISSING = object()
+
+
+def make_key(*parts):
+    """Build a cache key from its parts, e.g. make_key('chat_partners', 42)"""
+    return ":".join(str(part) for part in parts)
+
+
+def _namespace_version_key(namespace):
+    return make_key(NAMESPACE_VERSION_PREFIX, namespace)
+
+
+def get_namespace_version(alias, namespace):
+    """
+    Return the current version of a namespace in the given cache alias
+
+    A namespace seen for the first time (or whose version was evicted) gets a
+    new random version, so it can't collide with entries of an earlier one.
+    """
+    cache = caches[alias]
+    version_key = _namespace_version_key(namespace)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, uuid.uuid4().hex[:12], None)
+        version = cache.get(version_key)
+    return version
+
+
+def bump_namespace(alias, namespace):
+    """Invalidate every key in a namespace by giving it a new version"""
+    caches[alias].set(_namespace_version_key(namespace), uuid.uuid4().hex[:12], None)
+    logger.debug("Cache namespace %s bumped in %s", namespace, alias)
+
+
+def versioned_key(alias, namespace, *parts):
+    """Build a key inside a namespace, e.g. versioned_key('availability', 'doctor:7', '2025-03-01')"""
+    return make_key(namespace, get_namespace_version(alias, namespace), *parts)
+
+
+def get_or_compute(alias, key, compute, timeout=None):
+    """
+    Return a cached value, or compute and cache it
+
+    Unlike cache.get_or_set this caches None results too. A value computed
+    while reads go to the replica is returned but not cached: it may predate a
+    write whose invalidation already ran, and would then be served as current
+    for the whole timeout instead of for the replica's lag.
+
+    Args:
+        alias: Cache alias from settings.CACHES
+        key: Cache key
+        compute: Callable returning the value on a miss
+        timeout: Seconds to keep the value (the alias's TIMEOUT if None)
+
+    Returns:
+        The cached or computed value
+    """
+    cache = caches[alias]
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        if replica_for_read() is not None:
+            return value
+        if timeout is None:
+            cache.set(key, value)
+        else:
+            cache.set(key, value, timeout)
+    return value
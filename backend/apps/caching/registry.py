@@ -0,0 +1,108 @@
+"""
+Signal-driven cache invalidation registry
+
+Apps declare, next to their other signal handlers, which cache keys (or key
+namespaces, see apps.caching.keys) a model's saves and deletes invalidate:
+
+    @invalidates(Appointment, TimeOff, alias='availability', namespaces=True)
+    def doctor_availability(instance):
+        return [availability_namespace(instance.doctor_id)]
+
+The function gets the saved or deleted instance and returns the keys to delete
+(or, with namespaces=True, the namespaces to bump) in the given cache alias.
+With `fields`, saves whose update_fields touch none of the listed fields (e.g.
+the last_login update on every login) are ignored.
+Invalidation runs once the surrounding transaction commits, so another request
+can't re-cache the old rows in between. QuerySet.update() and bulk_create() send
+no signals; code using them must invalidate explicitly.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Callable, Optional
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from .keys import bump_namespace
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class InvalidationRule:
+    """Keys (or namespaces) of one cache alias invalidated by changes to a model"""
+    alias: str
+    keys: Callable
+    namespaces: bool = False
+    fields: Optional[frozenset] = None
+
+    def applies_to(self, update_fields):
+        """Whether a save limited to update_fields (None: all fields) can affect the keys"""
+        return update_fields is None or self.fields is None or not self.fields.isdisjoint(update_fields)
+
+    def keys_for(self, instance):
+        return [key for key in self.keys(instance) if key is not None]
+
+    def apply(self, instance, keys):
+        if not keys:
+            return
+        if self.namespaces:
+            for namespace in keys:
+                bump_namespace(self.alias, namespace)
+        else:
+            caches[self.alias].delete_many(keys)
+        logger.debug("Invalidated %s in cache %s after a %s change", keys, self.alias, type(instance).__name__)
+
+
+class InvalidationRegistry:
+    """Invalidation rules by model, applied from post_save and post_delete"""
+
+    def __init__(self):
+        self._rules = {}
+
+    def register(self, model, rule):
+        if model not in self._rules:
+            self._rules[model] = []
+            dispatch_uid = f"cache_invalidation:{model._meta.label}"
+            post_save.connect(self._invalidate, sender=model, weak=False, dispatch_uid=dispatch_uid)
+            post_delete.connect(self._invalidate, sender=model, weak=False, dispatch_uid=dispatch_uid)
+        self._rules[model].append(rule)
+
+    def rules_for(self, model):
+        return list(self._rules.get(model, []))
+
+    def _invalidate(self, sender, instance, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        for rule in self._rules.get(sender, []):
+            if rule.applies_to(update_fields):
+                # Keys are taken now: the instance may change again before the commit
+                keys = rule.keys_for(instance)
+                transaction.on_commit(lambda rule=rule, keys=keys: rule.apply(instance, keys))
+
+
+invalidation_registry = InvalidationRegistry()
+
+
+def invalidates(*models, alias, namespaces=False, fields=None):
+    """
+    Decorator registering a function that returns the cache keys invalidated
+    when an instance of any of the models is saved or deleted
+
+    Args:
+        models: Model classes whose saves and deletes invalidate the keys
+        alias: Cache alias the keys live in
+        namespaces: Whether the function returns namespaces to bump rather than keys
+        fields: Model fields the cached data depends on; saves with update_fields
+            outside of them are ignored (default: every save invalidates)
+
+    Returns:
+        The decorated function, unchanged
+    """
+    def decorator(func):
+        rule = InvalidationRule(
+            alias=alias, keys=func, namespaces=namespaces,
+            fields=frozenset(fields) if fields is not None else None,
+        )
+        for model in models:
+            invalidation_registry.register(model, rule)
+        return func
+    return decorator
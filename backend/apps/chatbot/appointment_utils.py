@@ -1,6 +1,7 @@
 from django.utils import timezone
 from apps.appointment.models import Appointment, AppointmentStatus
 from datetime import timedelta
+from .intent_router import match_keyword_groups, appointment_query_type
 
 def get_patient_appointments(patient, filter_type='upcoming'):
     """
@@ -117,34 +118,5 @@ def check_for_appointment_keywords(message):
     Returns:
         Tuple of (is_appointment_query, query_type)
     """
-    message = message.lower()
-    
-    # Common appointment-related keywords
-    appointment_keywords = ['appointment', 'appointments', 'schedule', 'scheduled', 
-                           'booking', 'booked', 'doctor', 'visit', 'meeting',
-                           'checkup', 'check-up', 'consultation']
-    
-    # Specific query types
-    upcoming_keywords = ['upcoming', 'next', 'future', 'scheduled', 'coming', 'soon']
-    past_keywords = ['past', 'previous', 'last', 'history', 'before', 'completed']
-    cancel_keywords = ['cancel', 'reschedule', 'change', 'move', 'remove']
-    
-    # Check if message contains appointment keywords
-    has_appointment_keywords = any(keyword in message for keyword in appointment_keywords)
-    
-    if not has_appointment_keywords:
-        return False, None
-    
-    # Determine query type
-    query_type = 'upcoming'  # Default
-    
-    if any(keyword in message for keyword in cancel_keywords):
-        query_type = 'cancel'
-    elif any(keyword in message for keyword in past_keywords):
-        query_type = 'past'
-    elif any(keyword in message for keyword in upcoming_keywords) or 'when' in message:
-        query_type = 'upcoming'
-    elif 'all' in message:
-        query_type = 'all'
-    
-    return True, query_type
\ No newline at end of file
+    query_type = appointment_query_type(match_keyword_groups(message))
+    return query_type is not None, query_type
\ No newline at end of file
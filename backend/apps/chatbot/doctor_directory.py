@@ -0,0 +1,161 @@
+import time
+import threading
+import logging
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef
+from apps.accounts.models import UserRoles, DoctorProfile
+from apps.appointment.models import AvailableTimeSlot
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+DEFAULT_SPECIALTY = "General Medicine"
+
+
+class DoctorDirectory:
+    """
+    Process-local snapshot of the doctor list used by chatbot doctor queries
+
+    The snapshot is built with a single annotated query and kept until a doctor,
+    doctor profile or time slot changes (see apps.chatbot.signals) or the TTL
+    expires. The TTL bounds staleness in other worker processes, which do not
+    receive this process's signals.
+    """
+
+    def __init__(self, ttl_seconds=300):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._expires_at = 0
+        self._slots_by_doctor = {}
+        # Bumped whenever the slot cache is reset, so slots loaded before a
+        # reset are not stored into the new cache
+        self._generation = 0
+
+    def invalidate(self):
+        """Drop the cached snapshot so the next lookup reloads it"""
+        with self._lock:
+            self._snapshot = None
+            self._slots_by_doctor = {}
+            self._generation += 1
+        logger.debug("Doctor directory invalidated")
+
+    def _load(self):
+        """Build the directory snapshot from one query"""
+        doctors = User.objects.filter(role=UserRoles.DOCTOR).select_related('doctor_profile').annotate(
+            has_available_slots=Exists(AvailableTimeSlot.objects.filter(doctor=OuterRef('pk')))
+        ).order_by('id')
+
+        entries = []
+        for doctor in doctors:
+            try:
+                profile_specialty = doctor.doctor_profile.specialty or None
+            except DoctorProfile.DoesNotExist:
+                profile_specialty = None
+
+            entries.append({
+                'id': doctor.id,
+                'name': f"Dr. {doctor.first_name} {doctor.last_name}".strip(),
+                'specialty': profile_specialty or DEFAULT_SPECIALTY,
+                'profile_specialty': profile_specialty,
+                'has_available_slots': doctor.has_available_slots,
+                'is_active': doctor.is_active,
+                'is_verified': doctor.is_verified,
+            })
+
+        return {
+            'doctors': entries,
+            'by_id': {entry['id']: entry for entry in entries},
+            'by_name': {entry['name'].lower(): entry for entry in entries if entry['is_active'] and entry['is_verified']},
+            'specialties': sorted({entry['profile_specialty'] for entry in entries if entry['profile_specialty']}),
+        }
+
+    def _get_snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._expires_at:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or time.monotonic() >= self._expires_at:
+                self._snapshot = self._load()
+                self._slots_by_doctor = {}
+                self._generation += 1
+                self._expires_at = time.monotonic() + self.ttl_seconds
+                logger.debug("Doctor directory loaded with %s doctors", len(self._snapshot['doctors']))
+            return self._snapshot
+
+    def contains(self, doctor_id):
+        """Check if a user is part of the cached snapshot (without loading it)"""
+        snapshot = self._snapshot
+        return snapshot is not None and doctor_id in snapshot['by_id']
+
+    def list_doctors(self, specialty=None):
+        """
+        Get active, verified doctors, optionally filtered by specialty (case-insensitive substring)
+
+        Returns:
+            List of doctor information dictionaries
+        """
+        doctors = [entry for entry in self._get_snapshot()['doctors'] if entry['is_active'] and entry['is_verified']]
+        if specialty:
+            specialty = specialty.lower()
+            doctors = [
+                entry for entry in doctors
+                if entry['profile_specialty'] and specialty in entry['profile_specialty'].lower()
+            ]
+        return [
+            {
+                'id': entry['id'],
+                'name': entry['name'],
+                'specialty': entry['specialty'],
+                'has_available_slots': entry['has_available_slots'],
+            }
+            for entry in doctors
+        ]
+
+    def specialties(self):
+        """Get the sorted list of specialties of all doctors"""
+        return list(self._get_snapshot()['specialties'])
+
+    def get_doctor(self, doctor_id):
+        """Get an active doctor's directory entry by ID, or None"""
+        entry = self._get_snapshot()['by_id'].get(doctor_id)
+        if entry is None or not entry['is_active']:
+            return None
+        return entry
+
+    def find_in_message(self, message):
+        """
+        Find the first doctor whose full name ("Dr. First Last") appears in a message
+
+        Returns:
+            The doctor's directory entry or None
+        """
+        message = message.lower()
+        for name, entry in self._get_snapshot()['by_name'].items():
+            if name in message:
+                return entry
+        return None
+
+    def get_slots(self, doctor_id):
+        """Get a doctor's weekly time slots, cached per doctor until the next invalidation"""
+        self._get_snapshot()
+        with self._lock:
+            generation = self._generation
+            slots = self._slots_by_doctor.get(doctor_id)
+        if slots is None:
+            slots = list(
+                AvailableTimeSlot.objects.filter(doctor_id=doctor_id)
+                .order_by('day_of_week', 'start_time')
+                .values('day_of_week', 'start_time', 'end_time')
+            )
+            with self._lock:
+                if self._generation == generation:
+                    self._slots_by_doctor[doctor_id] = slots
+        return slots
+
+
+doctor_directory = DoctorDirectory(
+    ttl_seconds=getattr(settings, 'CHATBOT_DOCTOR_DIRECTORY_TTL', 300),
+)
@@ -1,13 +1,11 @@
 from django.utils import timezone
-from django.contrib.auth import get_user_model
-from apps.accounts.models import UserRoles
-from apps.appointment.models import AvailableTimeSlot, Appointment
-from datetime import datetime, timedelta, time
+from datetime import timedelta
+from .intent_router import match_keyword_groups, doctor_query_type
+from .doctor_directory import doctor_directory
 import calendar
 import logging
 
 logger = logging.getLogger(__name__)
-User = get_user_model()
 
 def check_for_doctor_keywords(message):
     """
@@ -19,57 +17,15 @@ def check_for_doctor_keywords(message):
     Returns:
         Tuple of (is_doctor_query, query_type)
     """
-    message = message.lower()
-    
-    # Extra preprocessing - remove common filler words that might interfere with detection
-    message = ' ' + message + ' '  # Add spaces to help with word boundary matching
-    
-    # IMPROVED: Make the doctor keyword detection much more sensitive
-    # Doctor list keywords - very basic phrases that should trigger
-    doctor_list_keywords = [
-        ' list of doctor', ' doctor list', ' doctors', 
-        ' show doctor', ' find doctor', ' which doctor', 
-        ' available doctor', ' all doctor'
-    ]
-    
-    # Specialty keywords
-    specialty_keywords = [
-        ' special', ' specialist', ' specialt', 
-        ' specialist in', ' speciali', ' specializ'
-    ]
-    
-    # Doctor availability keywords
-    availability_keywords = [
-        ' availab', ' schedule', ' slot', ' booking',
-        ' when is doctor', ' doctor hour', ' doctor time', 
-        ' see doctor', ' meet doctor', ' visit doctor'
-    ]
-    
-    # First check for doctor_list keywords
-    is_doctor_list_query = any(keyword in message for keyword in doctor_list_keywords)
-    
-    # Then check for specialty keywords
-    is_specialty_query = any(keyword in message for keyword in specialty_keywords)
-    
-    # Finally check for availability keywords
-    is_availability_query = any(keyword in message for keyword in availability_keywords)
-    
-    # Log the detection results for debugging
-    logger.debug(f"Doctor keyword check: list={is_doctor_list_query}, specialty={is_specialty_query}, availability={is_availability_query}, message='{message}'")
-    
-    if is_doctor_list_query:
-        return True, 'doctor_list'
-    elif is_specialty_query:
-        return True, 'specialties'
-    elif is_availability_query:
-        return True, 'availability'
-    
-    return False, None
+    query_type = doctor_query_type(match_keyword_groups(message))
+    return query_type is not None, query_type
 
 def get_doctor_list(specialty=None):
     """
     Get a list of doctors, optionally filtered by specialty
     
+    Served from the cached doctor directory, so no query is run once it is warm.
+    
     Args:
         specialty: Optional specialty to filter doctors
         
@@ -77,63 +33,7 @@ def get_doctor_list(specialty=None):
         List of doctor information dictionaries
     """
     try:
-        # Start with all active doctors
-        doctors_query = User.objects.filter(
-            role=UserRoles.DOCTOR,
-            is_active=True,
-            is_verified=True
-        )
-        
-        # Log the initial doctor count for debugging
-        logger.debug(f"Initial doctor count: {doctors_query.count()}")
-        
-        # Apply specialty filter if provided
-        if specialty:
-            try:
-                # Check if we need to join with doctor_profile
-                if hasattr(User, 'doctor_profile'):
-                    doctors_query = doctors_query.filter(
-                        doctor_profile__specialty__icontains=specialty
-                    )
-                    logger.debug(f"Filtered by specialty '{specialty}', count: {doctors_query.count()}")
-                else:
-                    logger.warning("Doctor profile relationship not found, skipping specialty filter")
-            except Exception as e:
-                logger.error(f"Error filtering by specialty: {str(e)}")
-        
-        # Convert query to list with needed information
-        doctor_list = []
-        for doctor in doctors_query:
-            # Get specialty if available
-            specialty_name = "General Medicine"
-            
-            try:
-                if hasattr(doctor, 'doctor_profile') and doctor.doctor_profile:
-                    if hasattr(doctor.doctor_profile, 'specialty') and doctor.doctor_profile.specialty:
-                        specialty_name = doctor.doctor_profile.specialty
-            except Exception as e:
-                logger.error(f"Error getting doctor specialty: {str(e)}")
-            
-            # Check if doctor has any available slots
-            has_slots = False
-            try:
-                has_slots = AvailableTimeSlot.objects.filter(doctor=doctor).exists()
-            except Exception as e:
-                logger.error(f"Error checking available slots: {str(e)}")
-            
-            # Create doctor info dict
-            doctor_data = {
-                'id': doctor.id,
-                'name': f"Dr. {doctor.first_name} {doctor.last_name}".strip(),
-                'specialty': specialty_name,
-                'has_available_slots': has_slots
-            }
-            
-            doctor_list.append(doctor_data)
-        
-        logger.debug(f"Returning {len(doctor_list)} doctors")
-        return doctor_list
-        
+        return doctor_directory.list_doctors(specialty)
     except Exception as e:
         logger.error(f"Error in get_doctor_list: {str(e)}")
         return []  # Return empty list on error
@@ -146,39 +46,28 @@ def get_available_specialties():
         List of specialty names
     """
     try:
-        specialties = []
-        
-        # First try using DoctorProfile model if it exists
-        try:
-            from apps.accounts.models import DoctorProfile
-            if DoctorProfile:
-                specialties = DoctorProfile.objects.values_list('specialty', flat=True).distinct()
-                specialties = [s for s in specialties if s]
-                logger.debug(f"Found {len(specialties)} specialties from DoctorProfile")
-        except (ImportError, AttributeError) as e:
-            logger.warning(f"Couldn't import DoctorProfile: {str(e)}")
-        
-        # If no specialties found, try getting them from User model directly
-        if not specialties:
-            doctors = User.objects.filter(role=UserRoles.DOCTOR, is_active=True)
-            
-            for doctor in doctors:
-                try:
-                    if hasattr(doctor, 'doctor_profile') and doctor.doctor_profile:
-                        if hasattr(doctor.doctor_profile, 'specialty') and doctor.doctor_profile.specialty:
-                            specialty = doctor.doctor_profile.specialty
-                            if specialty and specialty not in specialties:
-                                specialties.append(specialty)
-                except Exception as e:
-                    logger.error(f"Error extracting specialty: {str(e)}")
-        
-        # Return the list of specialties
-        return sorted(specialties)
-    
+        return doctor_directory.specialties()
     except Exception as e:
         logger.error(f"Error in get_available_specialties: {str(e)}")
         return ['General Medicine']  # Return default on error
 
+def find_doctor_in_message(message):
+    """
+    Find a doctor mentioned by full name in a user message
+    
+    Args:
+        message: User message text
+        
+    Returns:
+        Doctor ID or None
+    """
+    try:
+        doctor = doctor_directory.find_in_message(message)
+    except Exception as e:
+        logger.error(f"Error in find_doctor_in_message: {str(e)}")
+        return None
+    return doctor['id'] if doctor else None
+
 def format_doctor_list(doctors, include_specialties=True):
     """
     Format doctor list into readable text
@@ -235,31 +124,22 @@ def get_doctor_availability(doctor_id, days_ahead=7):
         Dictionary with doctor and availability information
     """
     try:
-        doctor = User.objects.get(id=doctor_id, role=UserRoles.DOCTOR, is_active=True)
-    except User.DoesNotExist:
-        return {'error': 'Doctor not found'}
-    
-    try:
-        # Get specialty
-        specialty = "General Medicine"
-        if hasattr(doctor, 'doctor_profile') and doctor.doctor_profile:
-            if hasattr(doctor.doctor_profile, 'specialty') and doctor.doctor_profile.specialty:
-                specialty = doctor.doctor_profile.specialty
+        doctor = doctor_directory.get_doctor(doctor_id)
+        if doctor is None:
+            return {'error': 'Doctor not found'}
+        
+        doctor_info = {
+            'id': doctor['id'],
+            'name': doctor['name'],
+            'specialty': doctor['specialty']
+        }
         
         # Get the doctor's available time slots
-        try:
-            available_slots = AvailableTimeSlot.objects.filter(doctor=doctor)
-        except Exception as e:
-            logger.error(f"Error getting available slots: {str(e)}")
-            available_slots = []
+        available_slots = doctor_directory.get_slots(doctor['id'])
         
         if not available_slots:
             return {
-                'doctor': {
-                    'id': doctor.id,
-                    'name': f"Dr. {doctor.first_name} {doctor.last_name}".strip(),
-                    'specialty': specialty
-                },
+                'doctor': doctor_info,
                 'has_slots': False,
                 'message': "This doctor doesn't have any regular hours set in our system."
             }
@@ -268,13 +148,13 @@ def get_doctor_availability(doctor_id, days_ahead=7):
         slots_by_day = {}
         for slot in available_slots:
             try:
-                day_name = calendar.day_name[slot.day_of_week]
+                day_name = calendar.day_name[slot['day_of_week']]
                 if day_name not in slots_by_day:
                     slots_by_day[day_name] = []
                 
                 slots_by_day[day_name].append({
-                    'start': slot.start_time.strftime('%I:%M %p'),
-                    'end': slot.end_time.strftime('%I:%M %p')
+                    'start': slot['start_time'].strftime('%I:%M %p'),
+                    'end': slot['end_time'].strftime('%I:%M %p')
                 })
             except Exception as e:
                 logger.error(f"Error processing slot: {str(e)}")
@@ -295,11 +175,7 @@ def get_doctor_availability(doctor_id, days_ahead=7):
                 })
         
         return {
-            'doctor': {
-                'id': doctor.id,
-                'name': f"Dr. {doctor.first_name} {doctor.last_name}".strip(),
-                'specialty': specialty
-            },
+            'doctor': doctor_info,
             'has_slots': True,
             'slots_by_day': slots_by_day,
             'upcoming_available_days': upcoming_days[:5]  # Limit to next 5 available days
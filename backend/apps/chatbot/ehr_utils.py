@@ -2,6 +2,7 @@ from django.utils import timezone
 from apps.ehr.models import MedicalRecord
 from apps.appointment.models import AppointmentStatus
 from datetime import timedelta
+from .intent_router import match_keyword_groups, ehr_query_type
 import logging
 
 logger = logging.getLogger(__name__)
@@ -113,57 +114,16 @@ def check_for_ehr_keywords(message):
     """
     Check if a message is asking about health records or prescriptions
     
+    Comparison phrases ("better than my...", "alternative") are left to the AI.
+    
     Args:
         message: User message text
         
     Returns:
         Tuple of (is_ehr_query, query_type)
     """
-    message = message.lower()
-    
-    # EHR-related keywords - these should be specific phrases
-    ehr_keywords = [
-        'my medical record', 'my health record', 'my ehr', 'my medical history', 
-        'my doctor visit', 'visit history', 'my consultation history', 
-        'my previous visit', 'my past visit', 'my diagnosis', 'my previous diagnosis',
-        'show me my record', 'show my record', 'my medical files'
-    ]
-    
-    # More specific prescription-related keywords
-    prescription_keywords = [
-        'my prescription', 'my medicine', 'my medication', 'my drugs', 'my pills', 
-        'my tablets', 'my dose', 'my dosage', 'my refill', 'my pharmacy', 
-        'what am i taking', 'what medicine am i taking',
-        'show me my prescriptions', 'what medications do i have'
-    ]
-    
-    # Skip specific comparison phrases - these should go to the AI
-    comparison_phrases = [
-        'than my', 'better than', 'instead of', 'alternative', 'natural', 'homemade',
-        'home remedy', 'other than', 'different from', 'compare', 'vs', 'versus',
-        'other option', 'what about', 'what else', 'something else'
-    ]
-    
-    # If message contains comparison phrases, don't treat as EHR query
-    if any(phrase in message for phrase in comparison_phrases):
-        logger.debug(f"Message contains comparison phrase, skipping EHR detection: {message}")
-        return False, None
-    
-    # Check for very specific EHR keywords
-    is_ehr_query = any(keyword in message for keyword in ehr_keywords)
-    
-    # Check for very specific prescription keywords
-    is_prescription_query = any(keyword in message for keyword in prescription_keywords)
-    
-    # Log detection for debugging
-    logger.debug(f"EHR keyword check: ehr={is_ehr_query}, prescription={is_prescription_query}, message='{message}'")
-    
-    if is_prescription_query:
-        return True, 'prescription'
-    elif is_ehr_query:
-        return True, 'ehr'
-    
-    return False, None
+    query_type = ehr_query_type(match_keyword_groups(message))
+    return query_type is not None, query_type
 
 def format_ehr_summary(ehr_summary):
     """
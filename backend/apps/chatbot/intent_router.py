@@ -0,0 +1,230 @@
+import re
+
+# Keyword groups used to route chatbot messages. Doctor keywords carry a leading
+# space and are matched against the message padded with spaces, which gives them
+# a cheap word-boundary check at the start.
+KEYWORD_GROUPS = {
+    'doctor_list': [
+        ' list of doctor', ' doctor list', ' doctors',
+        ' show doctor', ' find doctor', ' which doctor',
+        ' available doctor', ' all doctor'
+    ],
+    'doctor_specialty': [
+        ' special', ' specialist', ' specialt',
+        ' specialist in', ' speciali', ' specializ'
+    ],
+    'doctor_availability': [
+        ' availab', ' schedule', ' slot', ' booking',
+        ' when is doctor', ' doctor hour', ' doctor time',
+        ' see doctor', ' meet doctor', ' visit doctor'
+    ],
+    'general': [
+        "what is", "how do", "can you explain", "tell me about",
+        "why is", "how does", "what are", "do you know",
+        "than my", "alternative", "natural", "homemade", "home remedy",
+        "compare", "difference between", "better than", "worse than"
+    ],
+    'appointment': [
+        'appointment', 'appointments', 'schedule', 'scheduled',
+        'booking', 'booked', 'doctor', 'visit', 'meeting',
+        'checkup', 'check-up', 'consultation'
+    ],
+    'appointment_upcoming': ['upcoming', 'next', 'future', 'scheduled', 'coming', 'soon', 'when'],
+    'appointment_past': ['past', 'previous', 'last', 'history', 'before', 'completed'],
+    'appointment_cancel': ['cancel', 'reschedule', 'change', 'move', 'remove'],
+    'appointment_all': ['all'],
+    'ehr': [
+        'my medical record', 'my health record', 'my ehr', 'my medical history',
+        'my doctor visit', 'visit history', 'my consultation history',
+        'my previous visit', 'my past visit', 'my diagnosis', 'my previous diagnosis',
+        'show me my record', 'show my record', 'my medical files'
+    ],
+    'prescription': [
+        'my prescription', 'my medicine', 'my medication', 'my drugs', 'my pills',
+        'my tablets', 'my dose', 'my dosage', 'my refill', 'my pharmacy',
+        'what am i taking', 'what medicine am i taking',
+        'show me my prescriptions', 'what medications do i have'
+    ],
+    # Comparison phrases send a message to the AI instead of the EHR handlers
+    'comparison': [
+        'than my', 'better than', 'instead of', 'alternative', 'natural', 'homemade',
+        'home remedy', 'other than', 'different from', 'compare', 'vs', 'versus',
+        'other option', 'what about', 'what else', 'something else'
+    ],
+}
+
+DATE_PATTERNS = [
+    re.compile(r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'),  # 01/30/2025, 1-30-25
+    re.compile(r'(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|jun(?:e)?|jul(?:y)?|aug(?:ust)?|sep(?:tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\s+\d{1,2}(?:st|nd|rd|th)?(?:[,]\s*\d{4})?'),  # January 30th, 2025
+    re.compile(r'(tomorrow|today|yesterday|next week|next month)'),  # Relative dates
+]
+DOCTOR_NAME_PATTERN = re.compile(r'dr\.?\s+([a-z]+)')
+NUMBER_PATTERN = re.compile(r'\b(\d+)\b')
+
+
+def _build_keyword_index(keyword_groups):
+    """
+    Map every keyword to the groups of all keywords that are a prefix of it
+
+    The scanner only reports the longest keyword starting at each position, and
+    every other keyword starting there is necessarily a prefix of it, so this
+    closure recovers the full set of (possibly overlapping) substring matches.
+    """
+    groups_by_keyword = {}
+    for group, keywords in keyword_groups.items():
+        for keyword in keywords:
+            groups_by_keyword.setdefault(keyword, set()).add(group)
+
+    index = {}
+    for keyword in groups_by_keyword:
+        groups = set()
+        for other, other_groups in groups_by_keyword.items():
+            if keyword.startswith(other):
+                groups |= other_groups
+        index[keyword] = frozenset(groups)
+    return index
+
+
+def _trie_regex(keywords):
+    """Build a regex from a keyword trie so each position is checked with one branch per character"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        is_end = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        pattern = '(?:' + '|'.join(branches) + ')'
+        # Greedy optional group: prefer the longest keyword at this position
+        return pattern + '?' if is_end else pattern
+
+    return build(trie)
+
+
+KEYWORD_INDEX = _build_keyword_index(KEYWORD_GROUPS)
+
+# Zero-width lookahead so that a match is attempted at every position of the message
+KEYWORD_SCANNER = re.compile('(?=(' + _trie_regex(KEYWORD_INDEX) + '))')
+
+
+def match_keyword_groups(message):
+    """
+    Find every keyword group present in a message in a single scan
+
+    Args:
+        message: User message text
+
+    Returns:
+        Set of matched keyword group names
+    """
+    text = ' ' + message.lower() + ' '
+    matched = set()
+    for keyword in set(KEYWORD_SCANNER.findall(text)):
+        matched |= KEYWORD_INDEX[keyword]
+    return matched
+
+
+def extract_entities(message):
+    """
+    Extract entities like dates, numbers, and names from user messages
+    Returns a dictionary of extracted entities
+    """
+    entities = {}
+    message_lower = message.lower()
+
+    for pattern in DATE_PATTERNS:
+        matches = pattern.findall(message_lower)
+        if matches:
+            entities['dates'] = matches
+
+    doctor_matches = DOCTOR_NAME_PATTERN.findall(message_lower)
+    if doctor_matches:
+        entities['doctor_names'] = doctor_matches
+
+    number_matches = NUMBER_PATTERN.findall(message)
+    if number_matches:
+        entities['numbers'] = number_matches
+
+    return entities
+
+
+def doctor_query_type(matched):
+    """Return the doctor query type for a set of matched groups, or None"""
+    if 'doctor_list' in matched:
+        return 'doctor_list'
+    elif 'doctor_specialty' in matched:
+        return 'specialties'
+    elif 'doctor_availability' in matched:
+        return 'availability'
+    return None
+
+
+def appointment_query_type(matched):
+    """Return the appointment query type for a set of matched groups, or None"""
+    if 'appointment' not in matched:
+        return None
+    if 'appointment_cancel' in matched:
+        return 'cancel'
+    elif 'appointment_past' in matched:
+        return 'past'
+    elif 'appointment_upcoming' in matched:
+        return 'upcoming'
+    elif 'appointment_all' in matched:
+        return 'all'
+    return 'upcoming'
+
+
+def ehr_query_type(matched):
+    """Return the EHR query type for a set of matched groups, or None"""
+    if 'comparison' in matched:
+        return None
+    if 'prescription' in matched:
+        return 'prescription'
+    elif 'ehr' in matched:
+        return 'ehr'
+    return None
+
+
+def route_message(message):
+    """
+    Route a user message to an intent and extract its entities
+
+    Intents follow the chatbot's handler priority: doctor, general question,
+    appointment, EHR. Messages matching none of them get the intent None.
+
+    Args:
+        message: User message text
+
+    Returns:
+        Dictionary with 'intent', 'query_type', 'matched' groups and 'entities'
+    """
+    matched = match_keyword_groups(message)
+
+    intent, query_type = None, None
+    doctor_type = doctor_query_type(matched)
+    if doctor_type:
+        intent, query_type = 'doctor', doctor_type
+    elif 'general' in matched:
+        intent = 'general'
+    else:
+        appointment_type = appointment_query_type(matched)
+        if appointment_type:
+            intent, query_type = 'appointment', appointment_type
+        else:
+            ehr_type = ehr_query_type(matched)
+            if ehr_type:
+                intent, query_type = 'ehr', ehr_type
+
+    return {
+        'intent': intent,
+        'query_type': query_type,
+        'matched': matched,
+        'entities': extract_entities(message),
+    }
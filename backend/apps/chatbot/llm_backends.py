@@ -0,0 +1,221 @@
+import time
+import random
+import hashlib
+import threading
+import logging
+from django.conf import settings
+from django.utils.module_loading import import_string
+from apps.monitoring.metrics import time_llm_call
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackendError(Exception):
+    """Raised when an LLM backend fails to produce a response"""
+
+
+class BaseLLMBackend:
+    """
+    Interface used by the chatbot to talk to a language model
+
+    Backends receive plain strings and return plain strings, so the chatbot's
+    context building, history handling and persistence run the same way
+    whichever model (or fake) is behind them.
+    """
+
+    def generate(self, prompt, system_instruction=None, model=None, temperature=0.3, max_output_tokens=500):
+        """
+        Generate a single response for a prompt
+
+        Returns:
+            Response text
+        """
+        raise NotImplementedError
+
+    def chat(self, messages, system_instruction=None, model=None):
+        """
+        Send a sequence of user messages as one conversation
+
+        Args:
+            messages: User message texts, oldest first; the last one is answered
+
+        Returns:
+            Response text to the last message
+        """
+        raise NotImplementedError
+
+    def stream(self, prompt, system_instruction=None, model=None, temperature=0.3, max_output_tokens=500):
+        """Generate a response as a sequence of text chunks (defaults to a single chunk)"""
+        yield self.generate(prompt, system_instruction, model, temperature, max_output_tokens)
+
+
+class GeminiBackend(BaseLLMBackend):
+    """Backend calling Google's Gemini API through the google-genai client"""
+
+    default_model = "gemini-2.0-flash"
+
+    def __init__(self, api_key=None):
+        api_key = api_key or getattr(settings, 'GEMINI_API_KEY', '')
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY is not set in settings")
+
+        from google import genai
+        self.client = genai.Client(api_key=api_key)
+
+    def _config(self, system_instruction, temperature, max_output_tokens):
+        from google.genai import types
+
+        return types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens
+        )
+
+    def generate(self, prompt, system_instruction=None, model=None, temperature=0.3, max_output_tokens=500):
+        response = self.client.models.generate_content(
+            model=model or self.default_model,
+            contents=prompt,
+            config=self._config(system_instruction, temperature, max_output_tokens)
+        )
+        return response.text
+
+    def chat(self, messages, system_instruction=None, model=None):
+        from google.genai import types
+
+        chat = self.client.chats.create(
+            model=model or self.default_model,
+            config=types.GenerateContentConfig(system_instruction=system_instruction)
+        )
+        response = None
+        for message in messages:
+            response = chat.send_message(message)
+        return response.text if response is not None else ""
+
+    def stream(self, prompt, system_instruction=None, model=None, temperature=0.3, max_output_tokens=500):
+        for chunk in self.client.models.generate_content_stream(
+            model=model or self.default_model,
+            contents=prompt,
+            config=self._config(system_instruction, temperature, max_output_tokens)
+        ):
+            if chunk.text:
+                yield chunk.text
+
+
+class FakeLLMBackend(BaseLLMBackend):
+    """
+    Local stand-in for a language model, used for development and load testing
+
+    Responses are derived from a hash of the prompt, so the same prompt always
+    gets the same answer. Latency (base plus random jitter), streaming chunk delay
+    and failures are simulated; randomness comes from a seeded generator so runs
+    can be reproduced.
+    """
+
+    def __init__(self, latency_ms=200, jitter_ms=50, error_rate=0.0, chunk_size=16, chunk_delay_ms=20, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.chunk_size = chunk_size
+        self.chunk_delay_ms = chunk_delay_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.call_count = 0
+
+    def _simulate_call(self):
+        """Sleep for the simulated latency and fail at the configured rate"""
+        with self._lock:
+            self.call_count += 1
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+
+        time.sleep((self.latency_ms + jitter) / 1000)
+        if fail:
+            raise LLMBackendError("Simulated LLM backend failure")
+
+    def _response_for(self, prompt, model):
+        digest = hashlib.sha256(f"{model}|{prompt}".encode('utf-8')).hexdigest()[:12]
+        return (
+            f"[fake-llm {digest}] Thank you for your question. This is general healthcare "
+            "information only; for advice about your situation, please schedule an "
+            "appointment with one of our doctors."
+        )
+
+    def generate(self, prompt, system_instruction=None, model=None, temperature=0.3, max_output_tokens=500):
+        self._simulate_call()
+        return self._response_for(prompt, model)
+
+    def chat(self, messages, system_instruction=None, model=None):
+        self._simulate_call()
+        return self._response_for(messages[-1] if messages else "", model)
+
+    def stream(self, prompt, system_instruction=None, model=None, temperature=0.3, max_output_tokens=500):
+        text = self.generate(prompt, system_instruction, model, temperature, max_output_tokens)
+        for start in range(0, len(text), self.chunk_size):
+            if start and self.chunk_delay_ms:
+                time.sleep(self.chunk_delay_ms / 1000)
+            yield text[start:start + self.chunk_size]
+
+
+class MeteredLLMBackend(BaseLLMBackend):
+    """
+    Wraps a backend to record call latency and failures in the Prometheus metrics
+
+    Other attributes (e.g. FakeLLMBackend.call_count) are read from the wrapped backend.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.backend_name = type(backend).__name__
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def generate(self, prompt, system_instruction=None, model=None, temperature=0.3, max_output_tokens=500):
+        with time_llm_call(self.backend_name, 'generate'):
+            return self.backend.generate(prompt, system_instruction, model, temperature, max_output_tokens)
+
+    def chat(self, messages, system_instruction=None, model=None):
+        with time_llm_call(self.backend_name, 'chat'):
+            return self.backend.chat(messages, system_instruction, model)
+
+    def stream(self, prompt, system_instruction=None, model=None, temperature=0.3, max_output_tokens=500):
+        with time_llm_call(self.backend_name, 'stream'):
+            yield from self.backend.stream(prompt, system_instruction, model, temperature, max_output_tokens)
+
+
+BACKEND_ALIASES = {
+    'gemini': 'apps.chatbot.llm_backends.GeminiBackend',
+    'fake': 'apps.chatbot.llm_backends.FakeLLMBackend',
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_llm_backend():
+    """
+    Get the configured LLM backend instance
+
+    CHATBOT_LLM_BACKEND is either an alias ('gemini', 'fake') or a dotted path to
+    a BaseLLMBackend subclass; CHATBOT_LLM_BACKEND_OPTIONS are passed to it.
+
+    Raises:
+        ValueError: If the backend is not configured correctly (e.g. no API key)
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = getattr(settings, 'CHATBOT_LLM_BACKEND', 'gemini')
+                options = getattr(settings, 'CHATBOT_LLM_BACKEND_OPTIONS', {})
+                backend_class = import_string(BACKEND_ALIASES.get(name, name))
+                _backend = MeteredLLMBackend(backend_class(**options))
+                logger.info(f"Using chatbot LLM backend {backend_class.__name__}")
+    return _backend
+
+
+def set_llm_backend(backend):
+    """Replace the LLM backend instance (None reloads it from settings on next use)"""
+    global _backend
+    with _backend_lock:
+        _backend = MeteredLLMBackend(backend) if backend is not None else None
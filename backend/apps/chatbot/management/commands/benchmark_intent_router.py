@@ -0,0 +1,189 @@
+import re
+import timeit
+from django.core.management.base import BaseCommand
+from apps.chatbot.intent_router import route_message
+
+SAMPLE_MESSAGES = [
+    "Can you show me the list of doctors?",
+    "Which doctor should I see for back pain?",
+    "What specialties do you have?",
+    "Is there a cardiology specialist available?",
+    "When is Dr. Sharma available next week?",
+    "Do you have any slots on Friday?",
+    "What is hypertension?",
+    "How does insulin work in the body?",
+    "Is there a natural alternative to ibuprofen?",
+    "home remedy for cold and cough",
+    "What's the difference between a cold and the flu?",
+    "When is my next appointment?",
+    "Show me all my appointments",
+    "I need to cancel my appointment on 04/12/2025",
+    "Can I reschedule my visit tomorrow?",
+    "What happened at my last checkup?",
+    "Show me my medical records",
+    "What was my diagnosis on March 3rd, 2025?",
+    "What medications do I have?",
+    "Do I need a refill on my prescription?",
+    "Is paracetamol better than my current medicine?",
+    "yes",
+    "thanks",
+    "I have had a headache for 3 days",
+    "My child has a fever of 102, what should I do?",
+    "Hello there!",
+    "Can I book a consultation with Dr. Karki on 12/05/25?",
+    "What about something else for my pills?",
+    "Tell me about diabetes type 2",
+    "I feel dizzy after taking my tablets",
+]
+
+
+# Keyword lists as they were inline in the check_for_* helpers and
+# process_user_message before the intent router, so the comparison is against
+# the original behaviour rather than the router's own KEYWORD_GROUPS
+LEGACY_DOCTOR_LIST_KEYWORDS = [
+    ' list of doctor', ' doctor list', ' doctors',
+    ' show doctor', ' find doctor', ' which doctor',
+    ' available doctor', ' all doctor'
+]
+LEGACY_SPECIALTY_KEYWORDS = [
+    ' special', ' specialist', ' specialt',
+    ' specialist in', ' speciali', ' specializ'
+]
+LEGACY_AVAILABILITY_KEYWORDS = [
+    ' availab', ' schedule', ' slot', ' booking',
+    ' when is doctor', ' doctor hour', ' doctor time',
+    ' see doctor', ' meet doctor', ' visit doctor'
+]
+LEGACY_GENERAL_QUESTION_INDICATORS = [
+    "what is", "how do", "can you explain", "tell me about",
+    "why is", "how does", "what are", "do you know",
+    "than my", "alternative", "natural", "homemade", "home remedy",
+    "compare", "difference between", "better than", "worse than"
+]
+LEGACY_APPOINTMENT_KEYWORDS = ['appointment', 'appointments', 'schedule', 'scheduled',
+                               'booking', 'booked', 'doctor', 'visit', 'meeting',
+                               'checkup', 'check-up', 'consultation']
+LEGACY_UPCOMING_KEYWORDS = ['upcoming', 'next', 'future', 'scheduled', 'coming', 'soon']
+LEGACY_PAST_KEYWORDS = ['past', 'previous', 'last', 'history', 'before', 'completed']
+LEGACY_CANCEL_KEYWORDS = ['cancel', 'reschedule', 'change', 'move', 'remove']
+LEGACY_EHR_KEYWORDS = [
+    'my medical record', 'my health record', 'my ehr', 'my medical history',
+    'my doctor visit', 'visit history', 'my consultation history',
+    'my previous visit', 'my past visit', 'my diagnosis', 'my previous diagnosis',
+    'show me my record', 'show my record', 'my medical files'
+]
+LEGACY_PRESCRIPTION_KEYWORDS = [
+    'my prescription', 'my medicine', 'my medication', 'my drugs', 'my pills',
+    'my tablets', 'my dose', 'my dosage', 'my refill', 'my pharmacy',
+    'what am i taking', 'what medicine am i taking',
+    'show me my prescriptions', 'what medications do i have'
+]
+LEGACY_COMPARISON_PHRASES = [
+    'than my', 'better than', 'instead of', 'alternative', 'natural', 'homemade',
+    'home remedy', 'other than', 'different from', 'compare', 'vs', 'versus',
+    'other option', 'what about', 'what else', 'something else'
+]
+
+
+def legacy_route(message):
+    """The chained substring scans the intent router replaced, kept for comparison"""
+    lowered = message.lower()
+    padded = ' ' + lowered + ' '
+
+    doctor_type = None
+    if any(k in padded for k in LEGACY_DOCTOR_LIST_KEYWORDS):
+        doctor_type = 'doctor_list'
+    elif any(k in padded for k in LEGACY_SPECIALTY_KEYWORDS):
+        doctor_type = 'specialties'
+    elif any(k in padded for k in LEGACY_AVAILABILITY_KEYWORDS):
+        doctor_type = 'availability'
+    if doctor_type:
+        return 'doctor', doctor_type
+
+    if any(k in lowered for k in LEGACY_GENERAL_QUESTION_INDICATORS):
+        return 'general', None
+
+    if any(k in lowered for k in LEGACY_APPOINTMENT_KEYWORDS):
+        if any(k in lowered for k in LEGACY_CANCEL_KEYWORDS):
+            return 'appointment', 'cancel'
+        elif any(k in lowered for k in LEGACY_PAST_KEYWORDS):
+            return 'appointment', 'past'
+        elif any(k in lowered for k in LEGACY_UPCOMING_KEYWORDS) or 'when' in lowered:
+            return 'appointment', 'upcoming'
+        elif 'all' in lowered:
+            return 'appointment', 'all'
+        return 'appointment', 'upcoming'
+
+    if not any(k in lowered for k in LEGACY_COMPARISON_PHRASES):
+        if any(k in lowered for k in LEGACY_PRESCRIPTION_KEYWORDS):
+            return 'ehr', 'prescription'
+        elif any(k in lowered for k in LEGACY_EHR_KEYWORDS):
+            return 'ehr', 'ehr'
+
+    return None, None
+
+
+def legacy_extract_entities(message):
+    """Entity extraction with per-call regex compilation, as it was before the router"""
+    entities = {}
+    date_patterns = [
+        r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
+        r'(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|jun(?:e)?|jul(?:y)?|aug(?:ust)?|sep(?:tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\s+\d{1,2}(?:st|nd|rd|th)?(?:[,]\s*\d{4})?',
+        r'(tomorrow|today|yesterday|next week|next month)',
+    ]
+    for pattern in date_patterns:
+        matches = re.findall(pattern, message.lower())
+        if matches:
+            entities['dates'] = matches
+    doctor_matches = re.findall(r'dr\.?\s+([a-z]+)', message.lower())
+    if doctor_matches:
+        entities['doctor_names'] = doctor_matches
+    number_matches = re.findall(r'\b(\d+)\b', message)
+    if number_matches:
+        entities['numbers'] = number_matches
+    return entities
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark the compiled chatbot intent router against the legacy chained keyword scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=2000, help="Passes over the sample corpus")
+
+    def handle(self, *args, **options):
+        rounds = options['rounds']
+
+        mismatches = []
+        for message in SAMPLE_MESSAGES:
+            routed = route_message(message)
+            expected = legacy_route(message)
+            if (routed['intent'], routed['query_type']) != expected:
+                mismatches.append((message, expected, (routed['intent'], routed['query_type'])))
+            if routed['entities'] != legacy_extract_entities(message):
+                mismatches.append((message, 'entities', routed['entities']))
+
+        for mismatch in mismatches:
+            self.stdout.write(self.style.ERROR(f"Mismatch: {mismatch}"))
+
+        def run_legacy():
+            for message in SAMPLE_MESSAGES:
+                legacy_route(message)
+                legacy_extract_entities(message)
+
+        def run_router():
+            for message in SAMPLE_MESSAGES:
+                route_message(message)
+
+        legacy_time = min(timeit.repeat(run_legacy, number=rounds, repeat=3))
+        router_time = min(timeit.repeat(run_router, number=rounds, repeat=3))
+        messages = rounds * len(SAMPLE_MESSAGES)
+
+        self.stdout.write(f"Corpus: {len(SAMPLE_MESSAGES)} messages x {rounds} rounds")
+        self.stdout.write(f"Legacy chained scans: {legacy_time / messages * 1e6:.2f} us/message")
+        self.stdout.write(f"Compiled router:      {router_time / messages * 1e6:.2f} us/message")
+        self.stdout.write(f"Speedup: {legacy_time / router_time:.2f}x")
+
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f"{len(mismatches)} routing mismatches"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Router agrees with legacy routing on the whole corpus"))
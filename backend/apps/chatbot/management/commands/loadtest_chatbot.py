@@ -0,0 +1,147 @@
+import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from apps.accounts.models import CustomUser, UserRoles
+from apps.chatbot.models import ChatSession
+from apps.chatbot.llm_backends import FakeLLMBackend, set_llm_backend
+from .benchmark_intent_router import SAMPLE_MESSAGES
+
+LOADTEST_EMAIL_TEMPLATE = "chatbot-loadtest-{}@example.com"
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test ChatMessageView through the full request path (routing, context, history, "
+        "persistence) against the fake LLM backend, reporting latency percentiles and queries per message"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help="Number of concurrent clients")
+        parser.add_argument('--messages', type=int, default=25, help="Messages sent by each client")
+        parser.add_argument('--latency-ms', type=int, default=200, help="Simulated LLM latency")
+        parser.add_argument('--jitter-ms', type=int, default=50, help="Random extra simulated LLM latency")
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of LLM calls that fail")
+        parser.add_argument('--seed', type=int, default=0, help="Seed for the fake backend")
+        parser.add_argument(
+            '--use-configured-backend', action='store_true',
+            help="Use CHATBOT_LLM_BACKEND instead of the fake backend (calls the real model)"
+        )
+        parser.add_argument('--keep-data', action='store_true', help="Keep the load-test users and sessions")
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        messages_per_client = options['messages']
+        if concurrency < 1 or messages_per_client < 1:
+            raise CommandError("--concurrency and --messages must be at least 1")
+
+        fake_backend = None
+        if not options['use_configured_backend']:
+            fake_backend = FakeLLMBackend(
+                latency_ms=options['latency_ms'],
+                jitter_ms=options['jitter_ms'],
+                error_rate=options['error_rate'],
+                seed=options['seed'],
+            )
+            set_llm_backend(fake_backend)
+
+        users = [self._get_user(index) for index in range(concurrency)]
+        url = reverse('chatbot:send-message')
+        host = next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+        results = []
+        results_lock = threading.Lock()
+
+        def run_client(user):
+            client = APIClient(SERVER_NAME=host)
+            client.force_authenticate(user=user)
+            session_id = None
+            try:
+                for index in range(messages_per_client):
+                    payload = {'message': SAMPLE_MESSAGES[index % len(SAMPLE_MESSAGES)]}
+                    if session_id:
+                        payload['session_id'] = session_id
+
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        response = client.post(url, payload, format='json')
+                        elapsed = time.perf_counter() - start
+
+                    if response.status_code == 200:
+                        session_id = response.data['session_id']
+                    with results_lock:
+                        results.append((elapsed, len(queries.captured_queries), response.status_code))
+            finally:
+                connection.close()
+
+        self.stdout.write(
+            f"Sending {concurrency * messages_per_client} messages from {concurrency} concurrent clients..."
+        )
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(executor.map(run_client, users))
+        finally:
+            wall_time = time.perf_counter() - started
+            if fake_backend is not None:
+                # Reload the configured backend on next use
+                set_llm_backend(None)
+            if not options['keep_data']:
+                ChatSession.objects.filter(user__in=users).delete()
+                CustomUser.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+        self._report(results, wall_time)
+        if fake_backend is not None:
+            self.stdout.write(f"Fake LLM calls: {fake_backend.call_count}")
+
+    def _get_user(self, index):
+        user, created = CustomUser.objects.get_or_create(
+            email=LOADTEST_EMAIL_TEMPLATE.format(index),
+            defaults={
+                'first_name': 'Load',
+                'last_name': f'Test {index}',
+                'role': UserRoles.PATIENT,
+                'is_active': True,
+                'is_verified': True,
+            }
+        )
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+        return user
+
+    def _report(self, results, wall_time):
+        if not results:
+            self.stdout.write(self.style.WARNING("No messages were sent"))
+            return
+
+        latencies = sorted(elapsed * 1000 for elapsed, _, _ in results)
+        query_counts = [count for _, count, _ in results]
+        failures = sum(1 for _, _, status_code in results if status_code != 200)
+
+        self.stdout.write(f"Messages: {len(results)} in {wall_time:.2f}s ({len(results) / wall_time:.1f} msg/s)")
+        self.stdout.write(
+            f"Latency ms: p50={percentile(latencies, 50):.1f} p95={percentile(latencies, 95):.1f} "
+            f"p99={percentile(latencies, 99):.1f} max={latencies[-1]:.1f}"
+        )
+        self.stdout.write(
+            f"Queries per message: avg={sum(query_counts) / len(query_counts):.1f} "
+            f"min={min(query_counts)} max={max(query_counts)}"
+        )
+        if failures:
+            self.stdout.write(self.style.ERROR(f"Failed requests: {failures}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("All requests succeeded"))
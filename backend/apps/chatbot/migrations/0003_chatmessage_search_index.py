@@ -0,0 +1,21 @@
+from django.db import migrations
+from apps.communication.search import install_search_index, remove_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor, 'chatbot_chatmessage')
+
+
+def remove(apps, schema_editor):
+    remove_search_index(schema_editor, 'chatbot_chatmessage')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0002_chatmessage_session_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, remove),
+    ]
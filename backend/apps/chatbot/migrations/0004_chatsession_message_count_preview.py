@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-19 02:09
+
+from django.db import migrations, models
+
+
+def backfill_session_stats(apps, schema_editor):
+    ChatSession = apps.get_model('chatbot', 'ChatSession')
+    ChatMessage = apps.get_model('chatbot', 'ChatMessage')
+    counts = dict(ChatMessage.objects.values('session_id').annotate(count=models.Count('id')).values_list('session_id', 'count'))
+    latest_ids = ChatMessage.objects.values('session_id').annotate(latest_id=models.Max('id')).values_list('latest_id', flat=True)
+    previews = dict(ChatMessage.objects.filter(id__in=list(latest_ids)).values_list('session_id', 'content'))
+    sessions = list(ChatSession.objects.filter(id__in=counts.keys()))
+    for session in sessions:
+        session.message_count = counts[session.id]
+        session.last_message_preview = previews.get(session.id, '')[:255]
+    ChatSession.objects.bulk_update(sessions, ['message_count', 'last_message_preview'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0003_chatmessage_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='last_message_preview',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='chatsession',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_session_stats, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.conf import settings
+from django.utils import timezone
+
+# Length of the last-message preview stored on each session
+PREVIEW_LENGTH = 255
 
 class ChatSession(models.Model):
     """Model to store chat sessions between users and the AI"""
@@ -7,9 +12,68 @@ class ChatSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     title = models.CharField(max_length=255, blank=True, null=True)
+    # Denormalized from the session's messages so session lists need no per-session queries
+    message_count = models.PositiveIntegerField(default=0)
+    last_message_preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True, default='')
     
     def __str__(self):
         return f"Chat session {self.id} - {self.user.email}"
+    
+    def add_message(self, role, content, title=None):
+        """
+        Add a message to the session and update its message count, preview and
+        timestamp (and optionally its title) with a single UPDATE in the same
+        transaction as the insert
+        
+        Args:
+            role: 'user' or 'assistant'
+            content: Message text
+            title: New session title, if it should change
+            
+        Returns:
+            The created ChatMessage
+        """
+        now = timezone.now()
+        preview = content[:PREVIEW_LENGTH]
+        changes = {
+            'message_count': F('message_count') + 1,
+            'last_message_preview': preview,
+            'updated_at': now,
+        }
+        if title is not None:
+            changes['title'] = title
+        
+        with transaction.atomic():
+            message = ChatMessage.objects.create(session=self, role=role, content=content)
+            ChatSession.objects.filter(pk=self.pk).update(**changes)
+        
+        # Keep this instance in step without reloading it
+        self.message_count += 1
+        self.last_message_preview = preview
+        self.updated_at = now
+        if title is not None:
+            self.title = title
+        return message
+    
+    def get_recent_messages(self, limit=None):
+        """
+        Get the last messages of the session in chronological order
+        
+        Runs a single reverse-ordered, sliced query (served by the session/timestamp
+        index) that only loads the fields needed to build conversation history.
+        
+        Args:
+            limit: Maximum number of messages, defaults to CHATBOT_HISTORY_LIMIT
+            
+        Returns:
+            List of ChatMessage instances, oldest first
+        """
+        if limit is None:
+            limit = getattr(settings, 'CHATBOT_HISTORY_LIMIT', 20)
+        # Query through the model manager: the related manager would attach the session
+        # to every row, which fetches the deferred session_id one row at a time
+        recent = ChatMessage.objects.filter(session_id=self.pk).order_by('-timestamp', '-id').only('role', 'content')[:limit]
+        return list(recent)[::-1]
 
 class ChatMessage(models.Model):
     """Model to store individual chat messages"""
@@ -25,6 +89,9 @@ class ChatMessage(models.Model):
     
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['session', 'timestamp']),
+        ]
     
     def __str__(self):
         return f"{self.role}: {self.content[:50]}..."
\ No newline at end of file
@@ -0,0 +1,121 @@
+import re
+import hashlib
+import threading
+import logging
+from django.conf import settings
+from django.core.cache import caches
+from apps.caching.keys import make_key
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the general (non-personalized) system prompt changes so that
+# answers generated with an older prompt are never served again
+GENERAL_SYSTEM_PROMPT_VERSION = 'general-v1'
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Phrases that only ever appear in answers built from a patient's own records
+PATIENT_CONTEXT_PHRASES = [
+    'your upcoming appointment', 'your next appointment', 'your last medical visit',
+    'your medical record', 'your prescription', 'your diagnosis',
+    'you currently have prescription', 'you have an upcoming appointment',
+]
+
+
+def normalize_message(message):
+    """
+    Normalize a user message so trivially different phrasings share a cache entry
+
+    Args:
+        message: User message text
+
+    Returns:
+        Lowercased message with punctuation removed and whitespace collapsed
+    """
+    message = _PUNCTUATION_RE.sub(' ', message.lower())
+    return _WHITESPACE_RE.sub(' ', message).strip()
+
+
+def contains_patient_context(response_text, user=None):
+    """
+    Check if an AI answer references patient-specific information
+
+    Args:
+        response_text: The generated answer
+        user: Optional user whose name/email must not appear in a cached answer
+
+    Returns:
+        True if the answer must not be shared between patients
+    """
+    text = response_text.lower()
+    if any(phrase in text for phrase in PATIENT_CONTEXT_PHRASES):
+        return True
+
+    if user is not None:
+        identifiers = [user.email, user.first_name, user.last_name]
+        for identifier in identifiers:
+            if identifier and len(identifier) > 2 and identifier.lower() in text:
+                return True
+
+    return False
+
+
+class ResponseCache:
+    """
+    Cache of chatbot answers to general questions, stored in a shared cache alias
+    so every worker process serves (and fills) the same entries
+
+    Hit and miss counters are kept per process for logging.
+    """
+
+    def __init__(self, alias='chatbot', ttl_seconds=3600):
+        self.alias = alias
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, message, model, prompt_version=GENERAL_SYSTEM_PROMPT_VERSION):
+        """Build a cache key from the normalized message, model and prompt version"""
+        digest = hashlib.sha256(normalize_message(message).encode()).hexdigest()
+        return make_key('general_response', model, prompt_version, digest)
+
+    def get(self, message, model, prompt_version=GENERAL_SYSTEM_PROMPT_VERSION):
+        """Return the cached answer or None on a miss or expired entry"""
+        response_text = caches[self.alias].get(self.make_key(message, model, prompt_version))
+        with self._lock:
+            if response_text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response_text
+
+    def set(self, message, model, response_text, prompt_version=GENERAL_SYSTEM_PROMPT_VERSION):
+        """Store an answer for ttl_seconds"""
+        if self.ttl_seconds <= 0:
+            return
+        caches[self.alias].set(self.make_key(message, model, prompt_version), response_text, self.ttl_seconds)
+
+    def clear(self):
+        """Drop all entries of the alias and reset counters"""
+        caches[self.alias].clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return this process's hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+general_response_cache = ResponseCache(
+    alias='chatbot',
+    ttl_seconds=getattr(settings, 'CHATBOT_RESPONSE_CACHE_TTL', 3600),
+)
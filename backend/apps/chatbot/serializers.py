@@ -14,10 +14,27 @@ class ChatSessionSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = ChatSession
-        fields = ['id', 'title', 'created_at', 'updated_at', 'messages']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'created_at', 'updated_at', 'message_count', 'last_message_preview', 'messages']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'message_count', 'last_message_preview']
+
+class ChatSessionListSerializer(serializers.ModelSerializer):
+    """Serializer for session lists, using the denormalized count and preview instead of nested messages"""
+    class Meta:
+        model = ChatSession
+        fields = ['id', 'title', 'created_at', 'updated_at', 'message_count', 'last_message_preview']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'message_count', 'last_message_preview']
 
 class ChatInputSerializer(serializers.Serializer):
     """Serializer for incoming chat messages"""
     message = serializers.CharField(required=True)
-    session_id = serializers.IntegerField(required=False, allow_null=True)
\ No newline at end of file
+    session_id = serializers.IntegerField(required=False, allow_null=True)
+
+class ChatMessageSearchResultSerializer(serializers.ModelSerializer):
+    """Serializer for chat messages matching a search, with their session and relevance rank"""
+    session_title = serializers.CharField(source='session.title', read_only=True)
+    rank = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = ChatMessage
+        fields = ['id', 'session', 'session_title', 'role', 'content', 'timestamp', 'rank']
+        read_only_fields = fields
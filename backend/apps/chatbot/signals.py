@@ -0,0 +1,33 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.contrib.auth import get_user_model
+from apps.accounts.models import UserRoles, DoctorProfile
+from apps.appointment.models import AvailableTimeSlot
+from .doctor_directory import doctor_directory
+
+User = get_user_model()
+
+# User fields the doctor directory is built from; saves that touch none of them
+# (e.g. the last_login update on every login) keep the snapshot
+DIRECTORY_USER_FIELDS = frozenset({'role', 'first_name', 'last_name', 'is_active', 'is_verified'})
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_doctor_directory_on_user_change(sender, instance, **kwargs):
+    """
+    Signal to refresh the chatbot doctor directory when a doctor account changes
+    (also covers users whose role changed away from DOCTOR)
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and DIRECTORY_USER_FIELDS.isdisjoint(update_fields):
+        return
+    if instance.role == UserRoles.DOCTOR or doctor_directory.contains(instance.pk):
+        doctor_directory.invalidate()
+
+@receiver(post_save, sender=DoctorProfile)
+@receiver(post_delete, sender=DoctorProfile)
+@receiver(post_save, sender=AvailableTimeSlot)
+@receiver(post_delete, sender=AvailableTimeSlot)
+def invalidate_doctor_directory(sender, instance, **kwargs):
+    """Signal to refresh the chatbot doctor directory when specialties or slots change"""
+    doctor_directory.invalidate()
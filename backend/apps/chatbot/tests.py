@@ -1,3 +1,307 @@
-from django.test import TestCase
+from datetime import time
+from unittest import mock, skipUnless
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+from apps.accounts.models import CustomUser, UserRoles
+from apps.appointment.models import AvailableTimeSlot
+from .management.commands import benchmark_intent_router as legacy
+from .doctor_directory import DoctorDirectory, doctor_directory
+from .intent_router import extract_entities, route_message
+from .llm_backends import GeminiBackend
+from .response_cache import ResponseCache, contains_patient_context, general_response_cache
+from .utils import GENERAL_MODEL, get_cached_general_response, get_gemini_response, is_cacheable_general_question
+from .models import ChatMessage, ChatSession
 
-# Create your tests here.
+SEARCH_URL = '/chatbot/search/'
+
+
+class ChatMessageSearchTests(TestCase):
+    """Full-text search over a patient's chat history (PostgreSQL or SQLite FTS5)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = CustomUser.objects.create_user('patient@example.com', role=UserRoles.PATIENT, is_verified=True)
+        cls.other_patient = CustomUser.objects.create_user('other@example.com', role=UserRoles.PATIENT, is_verified=True)
+
+        cls.session = ChatSession.objects.create(user=cls.patient, title='Headaches')
+        cls.other_session = ChatSession.objects.create(user=cls.patient, title='Sleep')
+        cls.strong_match = cls.session.add_message('user', 'Headache, headache, headache every morning')
+        cls.weak_match = cls.other_session.add_message(
+            'user', 'I sleep badly and sometimes wake up with a headache after a late dinner with friends'
+        )
+        cls.session.add_message('assistant', 'Try to drink more water')
+
+        foreign_session = ChatSession.objects.create(user=cls.other_patient)
+        foreign_session.add_message('user', 'My headache is gone')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.patient)
+
+    def search(self, **params):
+        return self.client.get(SEARCH_URL, params)
+
+    def result_ids(self, response):
+        self.assertEqual(response.status_code, 200, response.content)
+        return [result['id'] for result in response.json()['results']]
+
+    def test_results_are_ranked_and_scoped_to_the_user(self):
+        response = self.search(q='headache')
+        self.assertEqual(self.result_ids(response), [self.strong_match.id, self.weak_match.id])
+
+        ranks = [result['rank'] for result in response.json()['results']]
+        self.assertGreater(ranks[0], ranks[1])
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.result_ids(self.search(q='headache dinner')), [self.weak_match.id])
+
+    def test_session_filter(self):
+        response = self.search(q='headache', session_id=self.other_session.id)
+        self.assertEqual(self.result_ids(response), [self.weak_match.id])
+
+    def test_invalid_session_id(self):
+        response = self.search(q='headache', session_id='abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('session_id', response.json())
+
+    def test_query_is_required(self):
+        self.assertEqual(self.search(q='  ').status_code, 400)
+
+    def test_results_are_paginated(self):
+        response = self.search(q='headache', page_size=1)
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(self.result_ids(response), [self.strong_match.id])
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite FTS5 fallback')
+    def test_sqlite_index_follows_updates_and_deletes(self):
+        self.weak_match.content = 'I sleep badly'
+        self.weak_match.save()
+        self.assertEqual(self.result_ids(self.search(q='headache')), [self.strong_match.id])
+        self.assertEqual(self.result_ids(self.search(q='badly')), [self.weak_match.id])
+
+        self.strong_match.delete()
+        self.assertEqual(self.result_ids(self.search(q='headache')), [])
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite FTS5 fallback')
+    def test_sqlite_query_syntax_is_not_interpreted(self):
+        for query in ('headache OR water', 'headache*', '"headache', 'content:headache', 'NEAR(headache)'):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(q=query).status_code, 200)
+
+
+class DoctorDirectoryTests(TestCase):
+    """Invalidation of the process-local doctor directory"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = CustomUser.objects.create_user(
+            'doctor@example.com', role=UserRoles.DOCTOR, is_verified=True, first_name='Ada', last_name='Lovelace'
+        )
+        AvailableTimeSlot.objects.create(doctor=cls.doctor, day_of_week=0, start_time=time(9), end_time=time(12))
+
+    def setUp(self):
+        doctor_directory.invalidate()
+        self.addCleanup(doctor_directory.invalidate)
+
+    def test_login_keeps_the_snapshot(self):
+        doctor_directory.list_doctors()
+        self.doctor.save(update_fields=['last_login'])
+        self.assertTrue(doctor_directory.contains(self.doctor.id))
+
+    def test_directory_field_change_invalidates(self):
+        doctor_directory.list_doctors()
+        self.doctor.first_name = 'Grace'
+        self.doctor.save(update_fields=['first_name'])
+        self.assertFalse(doctor_directory.contains(self.doctor.id))
+        self.assertEqual(doctor_directory.list_doctors()[0]['name'], 'Dr. Grace Lovelace')
+
+    def test_slots_loaded_before_invalidation_are_not_stored(self):
+        directory = DoctorDirectory()
+        values = QuerySet.values
+
+        def invalidate_during_load(queryset, *fields):
+            # A slot change commits while the old slots are being read
+            directory.invalidate()
+            return values(queryset, *fields)
+
+        with mock.patch.object(QuerySet, 'values', autospec=True, side_effect=invalidate_during_load):
+            self.assertEqual(len(directory.get_slots(self.doctor.id)), 1)
+        self.assertEqual(directory._slots_by_doctor, {})
+
+        self.assertEqual(len(directory.get_slots(self.doctor.id)), 1)
+        self.assertIn(self.doctor.id, directory._slots_by_doctor)
+
+
+class GeminiBackendTests(TestCase):
+    """Calls into a google-genai client stubbed with the installed package's signatures"""
+
+    def setUp(self):
+        from google.genai import chats, models
+
+        self.backend = GeminiBackend(api_key='test-key')
+        self.backend.client = mock.Mock(
+            chats=mock.create_autospec(chats.Chats, instance=True),
+            models=mock.create_autospec(models.Models, instance=True),
+        )
+
+    def test_chat(self):
+        chat = self.backend.client.chats.create.return_value
+        chat.send_message.return_value.text = "Second answer"
+
+        response = self.backend.chat(["First", "Second"], system_instruction="Be brief", model='gemini-test')
+
+        self.assertEqual(response, "Second answer")
+        _, kwargs = self.backend.client.chats.create.call_args
+        self.assertEqual(kwargs['model'], 'gemini-test')
+        self.assertEqual(kwargs['config'].system_instruction, "Be brief")
+        self.assertEqual([call.args[0] for call in chat.send_message.call_args_list], ["First", "Second"])
+
+    def test_generate(self):
+        self.backend.client.models.generate_content.return_value.text = "Answer"
+
+        self.assertEqual(self.backend.generate("Question", system_instruction="Be brief", max_output_tokens=50), "Answer")
+        config = self.backend.client.models.generate_content.call_args.kwargs['config']
+        self.assertEqual(config.system_instruction, "Be brief")
+        self.assertEqual(config.max_output_tokens, 50)
+
+
+class GeneralResponseCacheTests(TestCase):
+    """Answers to general questions are shared between patients, personal ones never are"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = CustomUser.objects.create_user(
+            'patient@example.com', role=UserRoles.PATIENT, is_verified=True, first_name='Sita', last_name='Sharma'
+        )
+        cls.other_patient = CustomUser.objects.create_user('other@example.com', role=UserRoles.PATIENT, is_verified=True)
+
+    def setUp(self):
+        general_response_cache.clear()
+        self.addCleanup(general_response_cache.clear)
+
+    def test_key_covers_model_and_prompt_version(self):
+        cache = ResponseCache(alias='chatbot')
+        cache.set("What is the flu?", 'model-a', "Influenza is ...", prompt_version='v1')
+
+        self.assertEqual(cache.get("what is the   FLU", 'model-a', prompt_version='v1'), "Influenza is ...")
+        self.assertIsNone(cache.get("What is the flu?", 'model-b', prompt_version='v1'))
+        self.assertIsNone(cache.get("What is the flu?", 'model-a', prompt_version='v2'))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = ResponseCache(alias='chatbot', ttl_seconds=0)
+        cache.set("What is the flu?", 'model-a', "Influenza is ...")
+        self.assertIsNone(cache.get("What is the flu?", 'model-a'))
+
+    def test_only_first_impersonal_questions_are_cacheable(self):
+        self.assertTrue(is_cacheable_general_question("What is diabetes?"))
+        for message in ("What is my diagnosis?", "I'm wondering what is a migraine", "Tell me about mine", "what is IVE"):
+            with self.subTest(message=message):
+                self.assertFalse(is_cacheable_general_question(message))
+        history = [{'role': 'user', 'content': 'Hi'}, {'role': 'assistant', 'content': 'Hello'}]
+        self.assertFalse(is_cacheable_general_question("What is diabetes?", history))
+
+    def test_patient_context_detection(self):
+        self.assertTrue(contains_patient_context("Your next appointment is on Monday."))
+        self.assertTrue(contains_patient_context("Hello Sita, diabetes is ...", self.patient))
+        self.assertTrue(contains_patient_context("Sent to patient@example.com", self.patient))
+        self.assertFalse(contains_patient_context("Diabetes is a chronic condition.", self.patient))
+
+    @mock.patch('apps.chatbot.utils.get_general_ai_response', return_value="Diabetes is a chronic condition.")
+    def test_answer_is_shared_between_patients(self, generate):
+        self.assertEqual(get_cached_general_response("What is diabetes?", self.patient), "Diabetes is a chronic condition.")
+        self.assertEqual(get_cached_general_response("what is diabetes", self.other_patient), "Diabetes is a chronic condition.")
+        generate.assert_called_once()
+
+    @mock.patch('apps.chatbot.utils.get_general_ai_response', return_value="Sita, diabetes is a chronic condition.")
+    def test_answer_with_patient_context_is_not_cached(self, generate):
+        get_cached_general_response("What is diabetes?", self.patient)
+        self.assertEqual(get_cached_general_response("What is diabetes?", self.other_patient), generate.return_value)
+        self.assertEqual(generate.call_count, 2)
+
+    @mock.patch('apps.chatbot.utils.get_ai_response', return_value="Personal answer")
+    @mock.patch('apps.chatbot.utils.get_general_ai_response', return_value="Shared answer")
+    def test_personal_question_bypasses_the_cache(self, generate, personal):
+        general_response_cache.set("What is my blood pressure?", GENERAL_MODEL, "Shared answer")
+
+        self.assertEqual(get_gemini_response("What is my blood pressure?", self.patient), "Personal answer")
+        personal.assert_called_once()
+        generate.assert_not_called()
+
+        self.assertEqual(get_gemini_response("What is blood pressure?", self.patient), "Shared answer")
+        personal.assert_called_once()
+
+
+class IntentRouterTests(SimpleTestCase):
+    """The compiled intent router routes exactly like the keyword scans it replaced"""
+
+    LEGACY_KEYWORD_LISTS = (
+        'LEGACY_DOCTOR_LIST_KEYWORDS', 'LEGACY_SPECIALTY_KEYWORDS', 'LEGACY_AVAILABILITY_KEYWORDS',
+        'LEGACY_GENERAL_QUESTION_INDICATORS', 'LEGACY_APPOINTMENT_KEYWORDS', 'LEGACY_UPCOMING_KEYWORDS',
+        'LEGACY_PAST_KEYWORDS', 'LEGACY_CANCEL_KEYWORDS', 'LEGACY_EHR_KEYWORDS',
+        'LEGACY_PRESCRIPTION_KEYWORDS', 'LEGACY_COMPARISON_PHRASES',
+    )
+
+    def assertRoutesLikeLegacy(self, message):
+        routed = route_message(message)
+        self.assertEqual((routed['intent'], routed['query_type']), legacy.legacy_route(message))
+        self.assertEqual(routed['entities'], legacy.legacy_extract_entities(message))
+
+    def test_every_keyword_routes_like_legacy(self):
+        for name in self.LEGACY_KEYWORD_LISTS:
+            for keyword in getattr(legacy, name):
+                for message in (keyword, f'ok {keyword.strip()} ok', f'{keyword.upper()}?'):
+                    with self.subTest(keywords=name, message=message):
+                        self.assertRoutesLikeLegacy(message)
+
+    def test_keywords_combined_with_appointment_route_like_legacy(self):
+        names = ('LEGACY_UPCOMING_KEYWORDS', 'LEGACY_PAST_KEYWORDS', 'LEGACY_CANCEL_KEYWORDS', 'LEGACY_COMPARISON_PHRASES')
+        for name in names:
+            for keyword in getattr(legacy, name):
+                for message in (f'{keyword} appointment', f'all {keyword} appointments', f'{keyword} my medicine', f'{keyword} my medical records'):
+                    with self.subTest(keywords=name, message=message):
+                        self.assertRoutesLikeLegacy(message)
+
+    def test_sample_messages_route_like_legacy(self):
+        for message in legacy.SAMPLE_MESSAGES:
+            with self.subTest(message=message):
+                self.assertRoutesLikeLegacy(message)
+
+    def test_overlapping_phrases(self):
+        cases = [
+            ('Show me the list of doctors', ('doctor', 'doctor_list')),
+            # Doctor list keywords win over specialty and availability ones
+            ('Which doctor is a specialist in skin?', ('doctor', 'doctor_list')),
+            ('Is there a specialist available?', ('doctor', 'specialties')),
+            # "schedule" is both a doctor availability and an appointment keyword
+            ('Can I schedule with the doctor?', ('doctor', 'availability')),
+            # General questions win over prescription keywords
+            ('What is my prescription?', ('general', None)),
+            ('Refill my medicine please', ('ehr', 'prescription')),
+            # A comparison keeps prescription and record questions away from the EHR
+            ('Is there an alternative to my medicine?', ('general', None)),
+            ('my pills vs vitamins', (None, None)),
+            # Cancel wins over upcoming, past over upcoming, and "when" implies upcoming
+            ('Cancel my next appointment', ('appointment', 'cancel')),
+            ('What did the doctor say at my last visit?', ('appointment', 'past')),
+            ('When is my checkup?', ('appointment', 'upcoming')),
+            ('Show all my appointments', ('appointment', 'all')),
+            # "doctor" is an appointment keyword, checked before "doctor visit" for the EHR
+            ('My doctor visit notes', ('appointment', 'upcoming')),
+            ('Open my medical records', ('ehr', 'ehr')),
+            ('Hello', (None, None)),
+        ]
+        for message, expected in cases:
+            with self.subTest(message=message):
+                routed = route_message(message)
+                self.assertEqual((routed['intent'], routed['query_type']), expected)
+                self.assertEqual(legacy.legacy_route(message), expected)
+
+    def test_extract_entities(self):
+        entities = extract_entities('Book Dr. Sharma on March 3rd or 12/04/2025, slot 2, else tomorrow')
+        self.assertEqual(entities['doctor_names'], ['sharma'])
+        self.assertEqual(entities['dates'], ['tomorrow'])
+        self.assertEqual(entities['numbers'], ['12', '04', '2025', '2'])
+        self.assertEqual(extract_entities('Hello'), {})
@@ -13,6 +13,9 @@ urlpatterns = [
     # Retrieve or delete a specific chat session
     path('sessions/<int:pk>/', views.ChatSessionDetailView.as_view(), name='session-detail'),
     
+    # Search the user's chat history
+    path('search/', views.ChatMessageSearchView.as_view(), name='search'),
+    
     # Send a message to the AI
     path('message/', views.ChatMessageView.as_view(), name='send-message'),
 ]
\ No newline at end of file
@@ -1,10 +1,11 @@
 import logging
-from django.conf import settings
-from google import genai
 import re
-from .appointment_utils import get_patient_appointments, format_appointment_info, check_for_appointment_keywords
-from .ehr_utils import get_patient_ehr_summary, get_latest_prescription, check_for_ehr_keywords, format_ehr_summary, format_prescription_info
-from .doctor_utils import get_doctor_list, get_available_specialties, get_doctor_availability, check_for_doctor_keywords, format_doctor_list, format_specialties_list, format_doctor_availability
+from .appointment_utils import get_patient_appointments, format_appointment_info
+from .ehr_utils import get_patient_ehr_summary, get_latest_prescription, format_ehr_summary, format_prescription_info
+from .doctor_utils import get_doctor_list, get_available_specialties, get_doctor_availability, find_doctor_in_message, format_doctor_list, format_specialties_list, format_doctor_availability
+from .intent_router import route_message, extract_entities
+from .response_cache import general_response_cache, contains_patient_context, normalize_message, GENERAL_SYSTEM_PROMPT_VERSION
+from .llm_backends import get_llm_backend
 
 logger = logging.getLogger(__name__)
 
@@ -17,36 +18,21 @@ CONTEXT_TYPES = {
     'GENERAL': 'general'
 }
 
-def extract_entities(message):
-    """
-    Extract entities like dates, numbers, and names from user messages
-    Returns a dictionary of extracted entities
-    """
-    entities = {}
-    
-    # Try to extract dates using regex (simple pattern)
-    date_patterns = [
-        r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',  # 01/30/2025, 1-30-25
-        r'(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|jun(?:e)?|jul(?:y)?|aug(?:ust)?|sep(?:tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\s+\d{1,2}(?:st|nd|rd|th)?(?:[,]\s*\d{4})?',  # January 30th, 2025
-        r'(tomorrow|today|yesterday|next week|next month)',  # Relative dates
-    ]
-    
-    for pattern in date_patterns:
-        matches = re.findall(pattern, message.lower())
-        if matches:
-            entities['dates'] = matches
-    
-    # Try to extract doctor names (Dr. LastName)
-    doctor_matches = re.findall(r'dr\.?\s+([a-z]+)', message.lower())
-    if doctor_matches:
-        entities['doctor_names'] = doctor_matches
-    
-    # Extract numbers
-    number_matches = re.findall(r'\b(\d+)\b', message)
-    if number_matches:
-        entities['numbers'] = number_matches
-    
-    return entities
+GENERAL_MODEL = "gemini-2.0-flash"
+
+# Prompt used for general questions whose answers are shared between patients.
+# It must never include patient data; bump GENERAL_SYSTEM_PROMPT_VERSION when editing.
+GENERAL_SYSTEM_INSTRUCTION = """You are a helpful healthcare assistant for patients of our medical center.
+
+        Be friendly and supportive, but remember you're not a doctor and cannot provide medical diagnosis.
+        For serious concerns, always recommend the patient to schedule an appointment with a doctor.
+        Provide accurate general information while noting that individual situations may vary.
+        Do not refer to the patient's own appointments, records or prescriptions.
+
+        Keep your responses concise, friendly and compassionate."""
+
+# Words that make a question about the patient themselves rather than general knowledge
+PERSONAL_REFERENCE_RE = re.compile(r'\b(i|me|my|mine|myself|im|ive|id)\b')
 
 def analyze_session_context(session_history):
     """
@@ -114,13 +100,16 @@ def get_gemini_response(user_message, user, session_history=None):
     """
     try:
         # Log the message for debugging
-        logger.info(f"Processing message: '{user_message}' for user {user.id}")
+        logger.debug("Processing message: '%s' for user %s", user_message, user.id)
+        
+        # Route the message once; intents come back in handler priority order
+        # (doctor queries FIRST so phrases like "list of doctor" are correctly identified)
+        route = route_message(user_message)
+        intent, query_type = route['intent'], route['query_type']
         
-        # Check for doctor-related queries FIRST
-        # (This ensures phrases like "list of doctor" are correctly identified)
-        is_doctor_query, doctor_query_type = check_for_doctor_keywords(user_message)
-        if is_doctor_query:
-            logger.info(f"Detected doctor query: {doctor_query_type}")
+        if intent == 'doctor':
+            doctor_query_type = query_type
+            logger.debug("Detected doctor query: %s", doctor_query_type)
             if doctor_query_type == 'specialties':
                 # Get and format specialties list
                 specialties = get_available_specialties()
@@ -138,14 +127,8 @@ def get_gemini_response(user_message, user, session_history=None):
                 doctors = get_doctor_list(specialty)
                 return format_doctor_list(doctors)
             elif doctor_query_type == 'availability':
-                # Try to find doctor ID or name in the message
-                doctor_list = get_doctor_list()
-                doctor_id = None
-                
-                for doctor in doctor_list:
-                    if doctor['name'].lower() in user_message.lower():
-                        doctor_id = doctor['id']
-                        break
+                # Try to find the doctor's name in the message
+                doctor_id = find_doctor_in_message(user_message)
                 
                 if doctor_id:
                     # Get and format doctor availability
@@ -153,44 +136,35 @@ def get_gemini_response(user_message, user, session_history=None):
                     return format_doctor_availability(availability)
                 else:
                     # If no specific doctor found, return the list of doctors
-                    return "I'm not sure which doctor you're asking about. Here's a list of our doctors:\n\n" + format_doctor_list(doctor_list)
+                    return "I'm not sure which doctor you're asking about. Here's a list of our doctors:\n\n" + format_doctor_list(get_doctor_list())
         
         # Handle simple responses and context-dependent messages
         if session_history and len(session_history) > 1:
             # Analyze the conversation context
             context_type, context_entities = analyze_session_context(session_history)
-            logger.debug(f"Conversation context: {context_type}, entities: {context_entities}")
+            logger.debug("Conversation context: %s, entities: %s", context_type, context_entities)
             
             # If it's a simple yes/no response, we need to understand the context
             if is_simple_affirmation(user_message):
-                logger.info(f"Detected simple affirmation: '{user_message}' in context: {context_type}")
+                logger.debug("Detected simple affirmation: '%s' in context: %s", user_message, context_type)
                 
                 # For simple responses, we always use the AI to maintain a natural conversation
-                logger.info(f"Using AI for simple response in context {context_type}")
+                logger.debug("Using AI for simple response in context %s", context_type)
                 return get_ai_response(user_message, user, session_history)
         
-        # First, check if this is a general question vs specific healthcare query
-        message_lower = user_message.lower()
-        general_question_indicators = [
-            "what is", "how do", "can you explain", "tell me about", 
-            "why is", "how does", "what are", "do you know",
-            "than my", "alternative", "natural", "homemade", "home remedy",
-            "compare", "difference between", "better than", "worse than"
-        ]
-        
-        is_general_question = any(phrase in message_lower for phrase in general_question_indicators)
-        logger.debug(f"Message '{message_lower}' general question check: {is_general_question}")
-        
         # If it looks like a general question, skip specific handlers and go to AI
-        if is_general_question:
-            logger.info(f"Detected general question, using AI directly: '{user_message}'")
+        if intent == 'general':
+            if is_cacheable_general_question(user_message, session_history):
+                logger.debug("Detected non-personalized general question, using response cache: '%s'", user_message)
+                return get_cached_general_response(user_message, user)
+            logger.debug("Detected general question, using AI directly: '%s'", user_message)
             return get_ai_response(user_message, user, session_history)
         
         # Check for other specific healthcare queries
         # 1. Appointment queries
-        is_appointment_query, appointment_query_type = check_for_appointment_keywords(user_message)
-        if is_appointment_query:
-            logger.info(f"Detected appointment query: {appointment_query_type}")
+        if intent == 'appointment':
+            appointment_query_type = query_type
+            logger.debug("Detected appointment query: %s", appointment_query_type)
             if appointment_query_type == 'cancel':
                 return "If you need to cancel an appointment, please log in to your patient portal or call our reception. I can show you your upcoming appointments if that would help."
             
@@ -205,9 +179,9 @@ def get_gemini_response(user_message, user, session_history=None):
             return format_appointment_info(appointments, show_all)
         
         # 2. EHR and prescription queries
-        is_ehr_query, ehr_query_type = check_for_ehr_keywords(user_message)
-        if is_ehr_query:
-            logger.info(f"Detected EHR query: {ehr_query_type}")
+        if intent == 'ehr':
+            ehr_query_type = query_type
+            logger.debug("Detected EHR query: %s", ehr_query_type)
             if ehr_query_type == 'prescription':
                 # Get and format prescription info
                 prescription_data = get_latest_prescription(user)
@@ -218,26 +192,80 @@ def get_gemini_response(user_message, user, session_history=None):
                 return format_ehr_summary(ehr_summary)
         
         # If no specific healthcare query detected, use AI
-        logger.info(f"No specific healthcare query detected, using AI for: '{user_message}'")
+        logger.debug("No specific healthcare query detected, using AI for: '%s'", user_message)
         return get_ai_response(user_message, user, session_history)
     
     except Exception as e:
         logger.error(f"Error in get_gemini_response: {str(e)}")
         return "I apologize, but I'm having trouble processing your request. Please try again later."
 
+def is_cacheable_general_question(user_message, session_history=None):
+    """
+    Check if a general question can be answered from the shared response cache
+
+    Only the first message of a conversation qualifies, and only when it does not
+    refer to the patient themselves ("my", "I", ...), since follow-ups and personal
+    questions need the patient's context to be answered correctly.
+    """
+    if session_history and len(session_history) > 1:
+        return False
+    return not PERSONAL_REFERENCE_RE.search(normalize_message(user_message))
+
+def get_cached_general_response(user_message, user):
+    """
+    Answer a non-personalized general question, using the shared response cache
+    
+    Args:
+        user_message: The message from the user
+        user: The user object (only used to guard against caching personal data)
+        
+    Returns:
+        Text response from the cache or the AI
+    """
+    cached_response = general_response_cache.get(user_message, GENERAL_MODEL, GENERAL_SYSTEM_PROMPT_VERSION)
+    if cached_response is not None:
+        logger.debug("General response cache hit: %s", general_response_cache.stats())
+        return cached_response
+    
+    try:
+        response_text = get_general_ai_response(user_message)
+    except Exception as e:
+        logger.error(f"General question AI error: {str(e)}")
+        return "I apologize, but I'm having trouble processing your request. Please try again later."
+    
+    if response_text and not contains_patient_context(response_text, user):
+        general_response_cache.set(user_message, GENERAL_MODEL, response_text, GENERAL_SYSTEM_PROMPT_VERSION)
+    else:
+        logger.warning("Not caching general response: empty or contains patient-specific context")
+    
+    return response_text
+
+def get_general_ai_response(user_message):
+    """
+    Get a response from the AI for a general question without any patient context
+    
+    Raises:
+        ValueError: If the LLM backend is not configured (e.g. GEMINI_API_KEY is missing)
+    """
+    return get_llm_backend().generate(
+        user_message,
+        system_instruction=GENERAL_SYSTEM_INSTRUCTION,
+        model=GENERAL_MODEL,
+        temperature=0.3,
+        max_output_tokens=500
+    )
+
 def get_ai_response(user_message, user, session_history=None):
     """
     Get a response directly from the AI, with healthcare context included
     """
     try:
-        api_key = getattr(settings, 'GEMINI_API_KEY', '')
-        if not api_key:
-            logger.error("GEMINI_API_KEY is not set in settings")
+        try:
+            backend = get_llm_backend()
+        except ValueError as e:
+            logger.error(f"LLM backend is not configured: {str(e)}")
             return "I apologize, but I'm having trouble connecting to my knowledge base. Please try again later."
         
-        # Initialize the client
-        client = genai.Client(api_key=api_key)
-        
         # Get healthcare data for context
         upcoming_appointments = get_patient_appointments(user, 'upcoming')
         ehr_summary = get_patient_ehr_summary(user)
@@ -316,31 +344,22 @@ def get_ai_response(user_message, user, session_history=None):
         # Use chat if we have session history
         if session_history and len(session_history) > 1:
             try:
-                # Use the Gemini chat API for better context handling
-                chat = client.chats.create(
-                    model="gemini-2.0-flash", 
-                    system_instruction=system_instruction
-                )
-                
+                # Use the chat API for better context handling
                 # Add the most recent messages to preserve context (up to 5 messages)
                 recent_history = session_history[-10:] if len(session_history) > 10 else session_history
                 
-                for msg in recent_history:
-                    if msg['role'] == 'user':
-                        chat.send_message(msg['content'])
-                    # We skip assistant messages since they're generated by the model
+                # We skip assistant messages since they're generated by the model
+                chat_messages = [msg['content'] for msg in recent_history if msg['role'] == 'user']
                 
-                # Send the current message and get response
-                response = chat.send_message(user_message)
-                return response.text
+                # Send the current message last and get response
+                chat_messages.append(user_message)
+                return backend.chat(chat_messages, system_instruction=system_instruction, model="gemini-2.0-flash")
             except Exception as e:
                 logger.error(f"Chat API error: {str(e)}")
                 # Fall back to single message if chat fails
         
         # For first message or if chat failed, use single message approach
         try:
-            from google.genai import types
-            
             # For simple messages, include conversation context in the prompt
             if is_simple_affirmation(user_message) and session_history and len(session_history) > 1:
                 # Get the last messages
@@ -352,33 +371,26 @@ def get_ai_response(user_message, user, session_history=None):
             else:
                 combined_prompt = user_message
             
-            response = client.models.generate_content(
+            return backend.generate(
+                combined_prompt,
+                system_instruction=system_instruction,
                 model="gemini-2.0-flash",
-                contents=combined_prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    temperature=0.3,  # Slightly higher temperature for more varied responses
-                    max_output_tokens=500
-                )
+                temperature=0.3,  # Slightly higher temperature for more varied responses
+                max_output_tokens=500
             )
             
-            return response.text
-            
         except Exception as e:
-            logger.error(f"Gemini API error: {str(e)}")
+            logger.error(f"LLM API error: {str(e)}")
             
             # Try fallback model
             try:
-                response = client.models.generate_content(
+                return backend.generate(
+                    user_message,
+                    system_instruction=system_instruction,
                     model="gemini-1.5-flash",
-                    contents=user_message,
-                    config=types.GenerateContentConfig(
-                        system_instruction=system_instruction,
-                        temperature=0.2,
-                        max_output_tokens=500
-                    )
+                    temperature=0.2,
+                    max_output_tokens=500
                 )
-                return response.text
             except Exception as e:
                 logger.error(f"All models failed: {str(e)}")
                 return "I apologize, but I'm having trouble processing your request. Please try again later."
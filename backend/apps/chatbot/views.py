@@ -10,10 +10,13 @@ from django.conf import settings
 import random
 
 from .models import ChatSession, ChatMessage
-from .serializers import ChatSessionSerializer, ChatMessageSerializer, ChatInputSerializer
+from .serializers import ChatSessionSerializer, ChatSessionListSerializer, ChatMessageSerializer, ChatInputSerializer, ChatMessageSearchResultSerializer
 from .utils import get_gemini_response
 from apps.accounts.permissions import IsVerified
 from apps.accounts.models import UserRoles
+from apps.communication.search import full_text_search, SearchResultsSetPagination
+from apps.caching.conditional import ConditionalGetMixin
+from rest_framework.exceptions import ValidationError
 
 logger = logging.getLogger(__name__)
 
@@ -40,9 +43,9 @@ def test_chatbot_connection(request):
     })
 
 
-class ChatSessionListView(generics.ListCreateAPIView):
+class ChatSessionListView(ConditionalGetMixin, generics.ListCreateAPIView):
     """View to list all chat sessions for a user and create new ones"""
-    serializer_class = ChatSessionSerializer
+    serializer_class = ChatSessionListSerializer
     permission_classes = [IsAuthenticated, IsVerified, PatientOnlyPermission]
     
     def get_queryset(self):
@@ -64,6 +67,29 @@ class ChatSessionDetailView(generics.RetrieveDestroyAPIView):
         return ChatSession.objects.filter(user=self.request.user)
 
 
+class ChatMessageSearchView(generics.ListAPIView):
+    """View to search the user's chat history, best matches first"""
+    serializer_class = ChatMessageSearchResultSerializer
+    permission_classes = [IsAuthenticated, IsVerified, PatientOnlyPermission]
+    pagination_class = SearchResultsSetPagination
+    
+    def get_queryset(self):
+        """Return the user's chat messages matching the 'q' query parameter"""
+        query = self.request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'A search query is required'})
+        
+        messages = ChatMessage.objects.filter(session__user=self.request.user)
+        session_id = self.request.query_params.get('session_id')
+        if session_id:
+            try:
+                messages = messages.filter(session_id=int(session_id))
+            except ValueError:
+                raise ValidationError({'session_id': 'Must be a chat session ID'})
+        
+        return full_text_search(messages, query).select_related('session')
+
+
 class ChatMessageView(APIView):
     """View to send messages to the AI and get responses"""
     permission_classes = [IsAuthenticated, IsVerified, PatientOnlyPermission]
@@ -95,11 +121,7 @@ class ChatMessageView(APIView):
                 )
             
             # Save user message to database
-            ChatMessage.objects.create(
-                session=session,
-                role="user",
-                content=user_message
-            )
+            session.add_message("user", user_message)
             
             # Check if we should use mock mode
             MOCK_MODE = getattr(settings, 'MOCK_CHATBOT', False)
@@ -116,21 +138,12 @@ class ChatMessageView(APIView):
                 
                 response_text = random.choice(mock_responses)
             else:
-                # Get conversation history for context
-                # Get more messages for better context (up to 20)
-                session_history = []
-                if session.messages.count() > 1:  # More than just the message we just added
-                    previous_messages = session.messages.order_by('timestamp')
-                    
-                    # Get up to the last 19 messages plus the one just added (20 total)
-                    # This provides more context for follow-up questions
-                    for msg in previous_messages:
-                        if len(session_history) >= 20:
-                            break
-                        session_history.append({
-                            'role': msg.role,
-                            'content': msg.content
-                        })
+                # Get conversation history for context: the most recent messages,
+                # including the one just added, loaded with a single sliced query
+                session_history = [
+                    {'role': msg.role, 'content': msg.content}
+                    for msg in session.get_recent_messages()
+                ]
                 
                 # Get AI response with conversation history
                 response_text = get_gemini_response(
@@ -139,23 +152,12 @@ class ChatMessageView(APIView):
                     session_history=session_history
                 )
             
-            # Save AI response to database
-            ai_message = ChatMessage.objects.create(
-                session=session,
-                role="assistant",
-                content=response_text
-            )
-            
-            # Update session title for new conversations
+            # Save AI response to database, naming new conversations after the
+            # first user message (truncated) in the same session update
+            title = None
             if not session.title or session.title == "New Conversation":
-                # Use first user message as title (truncated)
                 title = user_message[:50] + ("..." if len(user_message) > 50 else "")
-                session.title = title
-                session.save()
-            
-            # Always update session timestamp to mark as recently used
-            session.updated_at = timezone.now()
-            session.save(update_fields=['updated_at'])
+            ai_message = session.add_message("assistant", response_text, title=title)
             
             return Response({
                 "session_id": session.id,
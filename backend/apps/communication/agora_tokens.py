@@ -0,0 +1,93 @@
+import time
+import logging
+from agora_token_builder import RtcTokenBuilder, RtmTokenBuilder
+from django.conf import settings
+from django.core.cache import caches
+from apps.caching.keys import make_key
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "agora_token"
+TOKEN_CACHE = "auth"
+
+RTM_ROLE = 1  # RTM user
+RTC_PUBLISHER_ROLE = 1
+
+
+def agora_token_cache_key(kind, user_id, channel_name, role):
+    """Cache key for a token of the given scope"""
+    return make_key(CACHE_KEY_PREFIX, kind, user_id, channel_name, role)
+
+
+def _get_or_build(key, lifetime, build):
+    """
+    Return a cached (token, expires_at) pair, or build and cache a new one
+
+    Cached tokens are reused until AGORA_TOKEN_REFRESH_MARGIN seconds before they
+    expire, so clients never receive a token that is about to stop working.
+    """
+    margin = getattr(settings, 'AGORA_TOKEN_REFRESH_MARGIN', 300)
+    now = int(time.time())
+
+    cached = caches[TOKEN_CACHE].get(key)
+    if cached is not None and cached[1] - now > margin:
+        return cached
+
+    expires_at = now + lifetime
+    token = build(expires_at)
+    caches[TOKEN_CACHE].set(key, (token, expires_at), max(lifetime - margin, 1))
+    return token, expires_at
+
+
+def get_rtm_token(user_id):
+    """
+    Get an Agora RTM token for a user, reusing a cached one until near expiry
+
+    Returns:
+        Tuple of (token, expires_at timestamp)
+    """
+    lifetime = getattr(settings, 'AGORA_RTM_TOKEN_LIFETIME', 3600)
+    user_account = str(user_id)
+
+    def build(expires_at):
+        logger.debug("Generating RTM token: userAccount=%s, role=%s, privilegeExpiredTs=%s",
+                     user_account, RTM_ROLE, expires_at)
+        return RtmTokenBuilder.buildToken(
+            appId=settings.AGORA_APP_ID,
+            appCertificate=settings.AGORA_APP_CERTIFICATE,
+            userAccount=user_account,
+            role=RTM_ROLE,
+            privilegeExpiredTs=expires_at
+        )
+
+    return _get_or_build(agora_token_cache_key('rtm', user_id, '', RTM_ROLE), lifetime, build)
+
+
+def get_rtc_token(user_id, channel_name, uid=0, role=RTC_PUBLISHER_ROLE):
+    """
+    Get an Agora RTC token for a user joining a channel, reusing a cached one until near expiry
+
+    Args:
+        user_id: The requesting user's ID (part of the cache scope)
+        channel_name: The video channel name
+        uid: Agora uid the token is bound to (0 allows any uid to join)
+        role: Agora RTC role
+
+    Returns:
+        Tuple of (token, expires_at timestamp)
+    """
+    lifetime = getattr(settings, 'AGORA_RTC_TOKEN_LIFETIME', 86400)
+
+    def build(expires_at):
+        logger.debug("Generating RTC token: channelName=%s, uid=%s, role=%s, privilegeExpiredTs=%s",
+                     channel_name, uid, role, expires_at)
+        return RtcTokenBuilder.buildTokenWithUid(
+            appId=settings.AGORA_APP_ID,
+            appCertificate=settings.AGORA_APP_CERTIFICATE,
+            channelName=channel_name,
+            uid=uid,
+            role=role,
+            privilegeExpiredTs=expires_at
+        )
+
+    return _get_or_build(agora_token_cache_key('rtc', user_id, f"{channel_name}:{uid}", role), lifetime, build)
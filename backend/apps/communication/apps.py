@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CommunicationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.communication'
+
+    def ready(self):
+        # Import signal handlers
+        import apps.communication.signals
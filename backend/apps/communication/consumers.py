@@ -0,0 +1,32 @@
+import logging
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from .events import user_group_name
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Per-user WebSocket for server push: new messages and appointment status changes.
+
+    Every connection of a user joins the user's group; events are sent as
+    {"event": "<name>", "data": {...}}. Clients only receive, they do not send.
+    """
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+
+        self.group_name = user_group_name(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        logger.debug("WebSocket connected for user %s", user.id)
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def notify(self, event):
+        await self.send_json({'event': event['event'], 'data': event['data']})
@@ -0,0 +1,52 @@
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def user_group_name(user_id):
+    """Channel layer group that all WebSocket connections of a user join"""
+    return f"user_{user_id}"
+
+
+def message_event_payload(message):
+    """Data of the "message.created" event for a message"""
+    return {
+        'id': message.id,
+        'sender_id': message.sender_id,
+        'recipient_id': message.recipient_id,
+        'content': message.content,
+        'timestamp': message.timestamp.isoformat(),
+    }
+
+
+def push_to_users(user_ids, event_type, data):
+    """
+    Push an event to the WebSocket connections of the given users
+
+    The event is sent once the current transaction commits, so clients never get
+    notified about rows they cannot read yet. Failures are logged and never
+    propagate to the request that triggered them.
+
+    Args:
+        user_ids: IDs of the users to notify
+        event_type: Event name, e.g. "message.created"
+        data: JSON-serializable event payload
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    def send():
+        for user_id in set(user_ids):
+            try:
+                async_to_sync(channel_layer.group_send)(
+                    user_group_name(user_id),
+                    {'type': 'notify', 'event': event_type, 'data': data}
+                )
+            except Exception as e:
+                logger.error(f"Error pushing {event_type} to user {user_id}: {str(e)}")
+
+    transaction.on_commit(send)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from apps.communication.search import SEARCHABLE_TABLES, install_search_index, remove_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Recreate the full-text search indexes for messages and chatbot history "
+        "(needed on SQLite after migrations that rebuild those tables)"
+    )
+
+    def handle(self, *args, **options):
+        with connection.schema_editor() as schema_editor:
+            for table in SEARCHABLE_TABLES:
+                remove_search_index(schema_editor, table)
+                install_search_index(schema_editor, table)
+                self.stdout.write(f"Rebuilt search index for {table}")
+        self.stdout.write(self.style.SUCCESS("Search indexes rebuilt"))
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+def backfill_conversation_keys(apps, schema_editor):
+    Message = apps.get_model('communication', 'Message')
+    pairs = Message.objects.values_list('sender_id', 'recipient_id').distinct()
+    for sender_id, recipient_id in pairs:
+        low, high = sorted((sender_id, recipient_id))
+        Message.objects.filter(sender_id=sender_id, recipient_id=recipient_id).update(
+            conversation_key=f"{low}_{high}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='conversation_key',
+            field=models.CharField(default='', editable=False, max_length=41),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_conversation_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation_key', 'id'], name='communicati_convers_42d9ec_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.7 on 2026-10-19 02:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_conversations(apps, schema_editor):
+    Message = apps.get_model('communication', 'Message')
+    Conversation = apps.get_model('communication', 'Conversation')
+    latest_ids = Message.objects.values('conversation_key').annotate(latest_id=models.Max('id')).values_list('latest_id', flat=True)
+    conversations = []
+    for message in Message.objects.filter(id__in=list(latest_ids)):
+        low_id, high_id = sorted((message.sender_id, message.recipient_id))
+        conversations.append(Conversation(
+            key=message.conversation_key,
+            user_low_id=low_id,
+            user_high_id=high_id,
+            last_message=message,
+            last_message_at=message.timestamp,
+        ))
+    Conversation.objects.bulk_create(conversations, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0002_message_conversation_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=41, unique=True)),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('unread_count_low', models.PositiveIntegerField(default=0)),
+                ('unread_count_high', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='communication.message')),
+                ('user_high', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user_low', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-last_message_at'],
+                'indexes': [models.Index(fields=['user_low', '-last_message_at'], name='communicati_user_lo_337f42_idx'), models.Index(fields=['user_high', '-last_message_at'], name='communicati_user_hi_375323_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+from apps.communication.search import install_search_index, remove_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor, 'communication_message')
+
+
+def remove(apps, schema_editor):
+    remove_search_index(schema_editor, 'communication_message')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0003_conversation'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, remove),
+    ]
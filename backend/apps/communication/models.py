@@ -1,6 +1,13 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.conf import settings
 
+
+def conversation_key_for(user_a_id, user_b_id):
+    """Canonical key shared by both directions of a two-user conversation"""
+    low, high = sorted((int(user_a_id), int(user_b_id)))
+    return f"{low}_{high}"
+
+
 class Message(models.Model):
     sender = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -14,9 +21,242 @@ class Message(models.Model):
     )
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
+    # "<lower user id>_<higher user id>", so a conversation is one index range scan
+    conversation_key = models.CharField(max_length=41, editable=False)
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['conversation_key', 'id']),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self.conversation_key:
+            self.conversation_key = conversation_key_for(self.sender_id, self.recipient_id)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.sender} to {self.recipient}: {self.content[:50]}"
+
+
+class Conversation(models.Model):
+    """
+    One row per pair of users who have exchanged messages, kept up to date by
+    SendMessageView so the inbox can be listed without scanning Message.
+
+    The pair is stored in canonical order (user_low has the lower id), matching
+    Message.conversation_key.
+    """
+    key = models.CharField(max_length=41, unique=True)
+    user_low = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    user_high = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    last_message = models.ForeignKey(
+        Message,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    unread_count_low = models.PositiveIntegerField(default=0)
+    unread_count_high = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-last_message_at']
+        indexes = [
+            models.Index(fields=['user_low', '-last_message_at']),
+            models.Index(fields=['user_high', '-last_message_at']),
+        ]
+
+    def partner_for(self, user):
+        """Return the other participant of the conversation"""
+        return self.user_high if user.id == self.user_low_id else self.user_low
+
+    def unread_count_for(self, user):
+        """Return the number of messages the given participant has not read yet"""
+        return self.unread_count_low if user.id == self.user_low_id else self.unread_count_high
+
+    @classmethod
+    def for_user(cls, user):
+        """Conversations the user takes part in, most recently active first"""
+        return cls.objects.filter(
+            models.Q(user_low=user) | models.Q(user_high=user)
+        ).select_related('user_low', 'user_high', 'last_message').order_by('-last_message_at')
+
+    @classmethod
+    def record_message(cls, message):
+        """
+        Update (or create) the conversation for a newly sent message: set it as the
+        last message and increment the recipient's unread counter in one UPDATE.
+        """
+        low_id, high_id = sorted((message.sender_id, message.recipient_id))
+        unread_field = 'unread_count_low' if message.recipient_id == low_id else 'unread_count_high'
+        updates = {
+            'last_message': message,
+            'last_message_at': message.timestamp,
+            unread_field: models.F(unread_field) + 1,
+        }
+        key = conversation_key_for(low_id, high_id)
+
+        if cls.objects.filter(key=key).update(**updates):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    key=key,
+                    user_low_id=low_id,
+                    user_high_id=high_id,
+                    last_message=message,
+                    last_message_at=message.timestamp,
+                    **{unread_field: 1}
+                )
+        except IntegrityError:
+            # Created concurrently by the other participant's first message
+            cls.objects.filter(key=key).update(**updates)
+
+    @classmethod
+    def record_messages(cls, messages):
+        """
+        Bulk version of record_message for messages to distinct conversations
+        (e.g. a broadcast): a constant number of queries regardless of how many
+        conversations are touched (plus one per conversation that another
+        request created at the same time).
+        """
+        messages_by_key = {message.conversation_key: message for message in messages}
+        existing = {
+            conversation.key: conversation
+            for conversation in cls.objects.filter(key__in=list(messages_by_key))
+        }
+
+        unread_for_low, unread_for_high, new_conversations = [], [], []
+        for key, message in messages_by_key.items():
+            low_id, high_id = sorted((message.sender_id, message.recipient_id))
+            conversation = existing.get(key)
+            if conversation is None:
+                unread_field = 'unread_count_low' if message.recipient_id == low_id else 'unread_count_high'
+                new_conversations.append(cls(
+                    key=key,
+                    user_low_id=low_id,
+                    user_high_id=high_id,
+                    last_message=message,
+                    last_message_at=message.timestamp,
+                    **{unread_field: 1}
+                ))
+            else:
+                conversation.last_message = message
+                conversation.last_message_at = message.timestamp
+                (unread_for_low if message.recipient_id == low_id else unread_for_high).append(key)
+
+        cls.objects.bulk_update(existing.values(), ['last_message', 'last_message_at'], batch_size=500)
+        if unread_for_low:
+            cls.objects.filter(key__in=unread_for_low).update(unread_count_low=models.F('unread_count_low') + 1)
+        if unread_for_high:
+            cls.objects.filter(key__in=unread_for_high).update(unread_count_high=models.F('unread_count_high') + 1)
+        if not new_conversations:
+            return
+        # A conversation created concurrently is skipped by the insert and then
+        # updated like an existing one, as in record_message
+        cls.objects.bulk_create(new_conversations, batch_size=500, ignore_conflicts=True)
+        created_with = dict(cls.objects.filter(
+            key__in=[conversation.key for conversation in new_conversations]
+        ).values_list('key', 'last_message_id'))
+        for conversation in new_conversations:
+            message = messages_by_key[conversation.key]
+            if created_with.get(conversation.key) == message.id:
+                continue
+            unread_field = 'unread_count_low' if message.recipient_id == conversation.user_low_id else 'unread_count_high'
+            cls.objects.filter(key=conversation.key).update(
+                last_message=message,
+                last_message_at=message.timestamp,
+                **{unread_field: models.F(unread_field) + 1}
+            )
+
+    @classmethod
+    def refresh_for_keys(cls, keys):
+        """
+        Recompute the conversations with the given keys from the Message table,
+        after messages were removed or put back outside of the send path (e.g. by
+        the retention job)
+
+        The last message is set to the latest remaining message (or cleared), and
+        a missing conversation is created for restored messages. Which messages
+        were read isn't recorded per message, so unread counters are only capped
+        at the number of messages each participant still has.
+        """
+        keys = set(keys)
+        if not keys:
+            return
+        messages = Message.objects.filter(conversation_key__in=keys).order_by()
+        last_ids = dict(
+            messages.values_list('conversation_key').annotate(last_id=models.Max('id'))
+        )
+        last_messages = Message.objects.in_bulk(list(last_ids.values()))
+        received = {
+            (key, recipient_id): count
+            for key, recipient_id, count in messages.values_list(
+                'conversation_key', 'recipient_id'
+            ).annotate(count=models.Count('id'))
+        }
+
+        conversations = list(cls.objects.filter(key__in=keys))
+        for conversation in conversations:
+            last_message = last_messages.get(last_ids.get(conversation.key))
+            conversation.last_message = last_message
+            conversation.last_message_at = last_message.timestamp if last_message else None
+            conversation.unread_count_low = min(
+                conversation.unread_count_low, received.get((conversation.key, conversation.user_low_id), 0)
+            )
+            conversation.unread_count_high = min(
+                conversation.unread_count_high, received.get((conversation.key, conversation.user_high_id), 0)
+            )
+        cls.objects.bulk_update(
+            conversations,
+            ['last_message', 'last_message_at', 'unread_count_low', 'unread_count_high'],
+            batch_size=500,
+        )
+
+        existing_keys = {conversation.key for conversation in conversations}
+        new_conversations = []
+        for key, last_id in last_ids.items():
+            if key in existing_keys:
+                continue
+            message = last_messages[last_id]
+            low_id, high_id = sorted((message.sender_id, message.recipient_id))
+            new_conversations.append(cls(
+                key=key,
+                user_low_id=low_id,
+                user_high_id=high_id,
+                last_message=message,
+                last_message_at=message.timestamp,
+            ))
+        cls.objects.bulk_create(new_conversations, batch_size=500, ignore_conflicts=True)
+
+    @classmethod
+    def mark_read(cls, user, partner):
+        """
+        Reset the user's unread counter for the conversation with partner
+
+        The counter is read first and only written when it isn't already zero,
+        so polling a read conversation runs no write (and its reads can stay on
+        a replica).
+
+        Returns:
+            Whether the counter was reset
+        """
+        unread_field = 'unread_count_low' if user.id < partner.id else 'unread_count_high'
+        conversation = cls.objects.filter(key=conversation_key_for(user.id, partner.id))
+        if not conversation.values_list(unread_field, flat=True).first():
+            return False
+        return bool(conversation.exclude(**{unread_field: 0}).update(**{unread_field: 0}))
 
     def __str__(self):
-        return f"{self.sender} to {self.recipient}: {self.content[:50]}"
\ No newline at end of file
+        return f"Conversation {self.key}"
@@ -0,0 +1,139 @@
+import logging
+from django.conf import settings
+from django.core.cache import caches
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+from apps.accounts.models import UserRoles
+from apps.appointment.models import Appointment, AppointmentStatus
+from apps.caching.keys import make_key
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+CACHE_KEY_PREFIX = "care_relationship"
+# Renamed when the cached format changed (user rows -> (id, last visit) pairs)
+PARTNERS_CACHE_KEY_PREFIX = "chat_partner_visits"
+
+# Care relationships gate messaging and calls; partner lists are directory data
+RELATIONSHIP_CACHE = "auth"
+PARTNERS_CACHE = "directory"
+
+
+def care_relationship_cache_key(patient_id, doctor_id):
+    """Cache key for the (patient, doctor) completed-appointment fact"""
+    return make_key(CACHE_KEY_PREFIX, patient_id, doctor_id)
+
+
+def _patient_doctor_ids(user, other):
+    """Return (patient_id, doctor_id) for a patient/doctor pair in either order, or None"""
+    if user.role == UserRoles.PATIENT and other.role == UserRoles.DOCTOR:
+        return user.id, other.id
+    elif user.role == UserRoles.DOCTOR and other.role == UserRoles.PATIENT:
+        return other.id, user.id
+    return None
+
+
+def has_completed_appointment(user, other):
+    """
+    Check if two users have a care relationship, i.e. a completed appointment
+    between a patient and a doctor, in either order
+
+    Answers are cached: positive ones for CARE_RELATIONSHIP_CACHE_TTL, negative
+    ones for the shorter CARE_RELATIONSHIP_NEGATIVE_CACHE_TTL. Appointment signals
+    (see apps.communication.signals) drop the cached answer whenever a pair's
+    appointment changes; this reaches every worker only if the "auth" cache
+    is a shared backend.
+
+    Args:
+        user: The requesting user
+        other: The other participant
+
+    Returns:
+        True if the users may communicate
+    """
+    pair = _patient_doctor_ids(user, other)
+    if pair is None:
+        return False
+
+    key = care_relationship_cache_key(*pair)
+    cached = caches[RELATIONSHIP_CACHE].get(key)
+    if cached is not None:
+        return cached
+
+    patient_id, doctor_id = pair
+    result = Appointment.objects.filter(
+        patient_id=patient_id,
+        doctor_id=doctor_id,
+        status=AppointmentStatus.COMPLETED
+    ).exists()
+    remember_care_relationship(patient_id, doctor_id, result)
+    return result
+
+
+def remember_care_relationship(patient_id, doctor_id, has_relationship=True):
+    """Store a known (patient, doctor) completed-appointment fact"""
+    if has_relationship:
+        timeout = getattr(settings, 'CARE_RELATIONSHIP_CACHE_TTL', 3600)
+    else:
+        timeout = getattr(settings, 'CARE_RELATIONSHIP_NEGATIVE_CACHE_TTL', 300)
+    caches[RELATIONSHIP_CACHE].set(care_relationship_cache_key(patient_id, doctor_id), has_relationship, timeout)
+
+
+def invalidate_care_relationship(patient_id, doctor_id):
+    """Forget the cached fact so the next check queries appointments again"""
+    caches[RELATIONSHIP_CACHE].delete(care_relationship_cache_key(patient_id, doctor_id))
+    logger.debug("Care relationship cache invalidated for patient %s and doctor %s", patient_id, doctor_id)
+
+
+def chat_partners_cache_key(user_id):
+    """Cache key for a user's list of chat partners"""
+    return make_key(PARTNERS_CACHE_KEY_PREFIX, user_id)
+
+
+def get_chat_partners(user):
+    """
+    Get the distinct users the given user has completed appointments with,
+    most recently visited first
+
+    The (partner id, last visit) pairs come from one aggregated query over
+    completed appointments and are cached per user for CHAT_PARTNERS_CACHE_TTL
+    (appointment signals drop the cache when the relationships change). The
+    users themselves are loaded on every call, so the cache never holds user
+    rows and profile changes show up at once.
+
+    Returns:
+        List of user instances, each with a `last_visit` attribute
+    """
+    if user.role == UserRoles.PATIENT:
+        own_field, partner_field = 'patient', 'doctor'
+    elif user.role == UserRoles.DOCTOR:
+        own_field, partner_field = 'doctor', 'patient'
+    else:
+        return []
+
+    key = chat_partners_cache_key(user.id)
+    last_visits = caches[PARTNERS_CACHE].get(key)
+    if last_visits is None:
+        last_visits = list(Appointment.objects.filter(
+            **{own_field: user},
+            status=AppointmentStatus.COMPLETED
+        ).values_list(partner_field).annotate(last_visit=Max('appointment_time')).order_by('-last_visit'))
+        caches[PARTNERS_CACHE].set(key, last_visits, getattr(settings, 'CHAT_PARTNERS_CACHE_TTL', 300))
+
+    if not last_visits:
+        return []
+    users_by_id = User.objects.in_bulk([partner_id for partner_id, _ in last_visits])
+
+    partners = []
+    for partner_id, last_visit in last_visits:
+        partner = users_by_id.get(partner_id)
+        if partner is not None:
+            partner.last_visit = last_visit
+            partners.append(partner)
+    return partners
+
+
+def invalidate_chat_partners(*user_ids):
+    """Drop the cached chat partner lists of the given users"""
+    caches[PARTNERS_CACHE].delete_many([chat_partners_cache_key(user_id) for user_id in user_ids])
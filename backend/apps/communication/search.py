@@ -0,0 +1,123 @@
+import re
+import logging
+from django.db import connection
+from django.db.models import FloatField, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.pagination import PageNumberPagination
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration used both by the PostgreSQL GIN indexes and by queries;
+# they must match for the indexes to be used
+SEARCH_CONFIG = "english"
+
+# Tables with full-text search over their "content" column
+SEARCHABLE_TABLES = ("communication_message", "chatbot_chatmessage")
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchResultsSetPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def _fts_table(table):
+    return f"{table}_fts"
+
+
+def install_search_index(schema_editor, table):
+    """
+    Create the full-text index for a table's "content" column
+
+    - PostgreSQL: a GIN index on to_tsvector(SEARCH_CONFIG, content)
+    - SQLite: an external-content FTS5 table kept in sync by triggers (note that
+      Django recreates SQLite tables on some schema changes, which drops the
+      triggers; run the rebuild_search_index command after such migrations)
+    Other databases fall back to unindexed substring search.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_content_search_idx ON {table} "
+            f"USING gin (to_tsvector('{SEARCH_CONFIG}'::regconfig, COALESCE(content, '')))"
+        )
+    elif vendor == "sqlite":
+        fts = _fts_table(table)
+        for statement in (
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(content, content='{table}', content_rowid='id')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, content) VALUES (new.id, new.content); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, content) VALUES ('delete', old.id, old.content); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF content ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, content) VALUES ('delete', old.id, old.content); "
+            f"INSERT INTO {fts}(rowid, content) VALUES (new.id, new.content); END",
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ):
+            schema_editor.execute(statement)
+
+
+def remove_search_index(schema_editor, table):
+    """Drop the full-text index created by install_search_index"""
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_content_search_idx")
+    elif vendor == "sqlite":
+        fts = _fts_table(table)
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def _fts5_query(query):
+    """Turn free text into an FTS5 query matching all words (quoted, so user input is never parsed as syntax)"""
+    return " ".join(f'"{word}"' for word in WORD_RE.findall(query))
+
+
+def full_text_search(queryset, query):
+    """
+    Filter a queryset of a model with a "content" column to rows matching a
+    free-text query, annotated with a relevance `rank` and ordered by it
+
+    Args:
+        queryset: Queryset over a model whose table is in SEARCHABLE_TABLES
+        query: Free-text search string
+
+    Returns:
+        Filtered, ranked queryset (best matches first, newest first on ties)
+    """
+    table = queryset.model._meta.db_table
+    vendor = connection.vendor
+
+    if vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        vector = SearchVector("content", config=SEARCH_CONFIG)
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        return queryset.annotate(
+            search=vector,
+            rank=SearchRank(vector, search_query),
+        ).filter(search=search_query).order_by("-rank", "-id")
+
+    if vendor == "sqlite":
+        fts_query = _fts5_query(query)
+        if not fts_query:
+            return queryset.none()
+        fts = _fts_table(table)
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", (fts_query,))
+        ).annotate(
+            # bm25() is lower for better matches; negate it so higher rank is better
+            rank=RawSQL(
+                f"SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND rowid = {table}.id",
+                (fts_query,),
+                output_field=FloatField(),
+            )
+        ).order_by("-rank", "-id")
+
+    logger.warning(f"No full-text index for database vendor {vendor}, using substring search")
+    return queryset.filter(content__icontains=query).annotate(
+        rank=Value(0.0, output_field=FloatField())
+    ).order_by("-id")
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Message
+from .models import Message, Conversation
 from apps.accounts.serializers import CustomUserSerializer
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -8,4 +8,65 @@ class MessageSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Message
-        fields = ['id', 'sender', 'recipient', 'content', 'timestamp']
\ No newline at end of file
+        fields = ['id', 'sender', 'recipient', 'content', 'timestamp']
+
+class ConversationSerializer(serializers.ModelSerializer):
+    """Inbox entry, as seen by the requesting user."""
+    partner = serializers.SerializerMethodField()
+    last_message = serializers.SerializerMethodField()
+    unread_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Conversation
+        fields = ['id', 'partner', 'last_message', 'last_message_at', 'unread_count']
+
+    def get_partner(self, obj):
+        partner = obj.partner_for(self.context['request'].user)
+        return CustomUserSerializer(partner, context=self.context).data
+
+    def get_last_message(self, obj):
+        if obj.last_message is None:
+            return None
+        return {
+            'id': obj.last_message.id,
+            'sender_id': obj.last_message.sender_id,
+            'content': obj.last_message.content,
+            'timestamp': serializers.DateTimeField().to_representation(obj.last_message.timestamp),
+        }
+
+    def get_unread_count(self, obj):
+        return obj.unread_count_for(self.context['request'].user)
+
+
+class ChatPartnerSerializer(CustomUserSerializer):
+    """A chat partner with the date of the last completed visit and a preview of the last message."""
+    last_visit = serializers.DateTimeField(read_only=True)
+    last_message = serializers.SerializerMethodField()
+
+    class Meta(CustomUserSerializer.Meta):
+        fields = CustomUserSerializer.Meta.fields + ['last_visit', 'last_message']
+
+    def get_last_message(self, obj):
+        conversation = self.context.get('conversations', {}).get(obj.id)
+        if conversation is None or conversation.last_message is None:
+            return None
+        return {
+            'sender_id': conversation.last_message.sender_id,
+            'preview': conversation.last_message.content[:100],
+            'timestamp': serializers.DateTimeField().to_representation(conversation.last_message_at),
+        }
+
+
+class MessageSearchResultSerializer(MessageSerializer):
+    """A message matching a search, with its relevance rank."""
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(MessageSerializer.Meta):
+        fields = MessageSerializer.Meta.fields + ['rank']
+
+
+class BroadcastMessageSerializer(serializers.Serializer):
+    """Input of a doctor's broadcast: the recipients, or how far back to look for patients."""
+    content = serializers.CharField()
+    recipient_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    days = serializers.IntegerField(min_value=1, max_value=3650, default=90)
@@ -0,0 +1,71 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from apps.appointment.models import Appointment, AppointmentStatus
+from apps.retention.signals import records_archived, records_restored
+from .models import Conversation, Message
+from .events import message_event_payload, push_to_users
+from .relationships import invalidate_care_relationship, invalidate_chat_partners
+
+# Appointment transitions pushed to the patient and doctor over WebSocket
+PUSHED_APPOINTMENT_STATUSES = (
+    AppointmentStatus.CONFIRMED,
+    AppointmentStatus.CANCELLED,
+    AppointmentStatus.COMPLETED,
+)
+
+@receiver(post_init, sender=Appointment)
+def remember_loaded_appointment_status(sender, instance, **kwargs):
+    """Keep the status the appointment was loaded with, to detect transitions on save"""
+    instance._loaded_status = instance.status
+
+@receiver(post_save, sender=Appointment)
+def update_care_relationship_on_appointment_save(sender, instance, **kwargs):
+    """
+    Signal to keep the cached care relationship in sync with appointment status
+
+    Completing an appointment can create the relationship and any other change
+    can end one, so the cached answer (possibly a negative one) is dropped and
+    the next check queries appointments again.
+    """
+    invalidate_care_relationship(instance.patient_id, instance.doctor_id)
+    invalidate_chat_partners(instance.patient_id, instance.doctor_id)
+
+@receiver(post_save, sender=Appointment)
+def push_appointment_status_change(sender, instance, created, **kwargs):
+    """Signal to notify the patient and doctor when an appointment is confirmed, cancelled or completed"""
+    previous_status = getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.status
+
+    # Fixture loads and archive restores (raw saves) are not live transitions
+    if kwargs.get('raw') or created or instance.status == previous_status or instance.status not in PUSHED_APPOINTMENT_STATUSES:
+        return
+
+    push_to_users([instance.patient_id, instance.doctor_id], 'appointment.status_changed', {
+        'id': str(instance.id),
+        'status': instance.status,
+        'previous_status': previous_status,
+        'appointment_time': instance.appointment_time.isoformat() if instance.appointment_time else None,
+        'patient_id': instance.patient_id,
+        'doctor_id': instance.doctor_id,
+    })
+
+@receiver(post_delete, sender=Appointment)
+def invalidate_care_relationship_on_appointment_delete(sender, instance, **kwargs):
+    """Signal to re-check the care relationship when an appointment is deleted"""
+    invalidate_care_relationship(instance.patient_id, instance.doctor_id)
+    invalidate_chat_partners(instance.patient_id, instance.doctor_id)
+
+@receiver(post_save, sender=Message)
+def push_new_message(sender, instance, created, **kwargs):
+    """Signal to deliver a new message to the recipient (and the sender's other devices)"""
+    # Fixture loads and archive restores (raw saves) are not new messages
+    if not created or kwargs.get('raw'):
+        return
+
+    push_to_users([instance.recipient_id, instance.sender_id], 'message.created', message_event_payload(instance))
+
+@receiver(records_archived, sender=Message)
+@receiver(records_restored, sender=Message)
+def refresh_conversations_on_retention(sender, objects, **kwargs):
+    """Signal to recompute the conversations whose messages were archived or restored"""
+    Conversation.refresh_for_keys({message.conversation_key for message in objects})
@@ -1,3 +1,256 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core import serializers
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.accounts.authentication import CookieJWTWebSocketMiddleware
+from apps.accounts.models import CustomUser, UserRoles
+from apps.appointment.models import Appointment, AppointmentStatus
+from .models import Conversation, Message
+from .routing import websocket_urlpatterns
 
-# Create your tests here.
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+def cookie_header(user):
+    return (b'cookie', f'access_token={AccessToken.for_user(user)}'.encode())
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class NotificationSocketTests(TransactionTestCase):
+    """
+    WebSocket authentication and server push over the in-memory channel layer
+
+    TransactionTestCase, because pushes are sent when the transaction commits
+    and Channels closes database connections between its ORM calls.
+    """
+
+    def setUp(self):
+        self.patient = CustomUser.objects.create_user('patient@example.com', role=UserRoles.PATIENT, is_verified=True)
+        self.doctor = CustomUser.objects.create_user('doctor@example.com', role=UserRoles.DOCTOR, is_verified=True)
+
+    def communicator(self, path='/ws/notifications/', headers=()):
+        application = CookieJWTWebSocketMiddleware(URLRouter(websocket_urlpatterns))
+        return WebsocketCommunicator(application, path, headers=list(headers))
+
+    async def connect_as(self, user):
+        communicator = self.communicator(headers=[cookie_header(user)])
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_rejects_connection_without_token(self):
+        communicator = self.communicator()
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_rejects_invalid_token(self):
+        communicator = self.communicator(headers=[(b'cookie', b'access_token=not-a-jwt')])
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+    async def test_ignores_token_in_query_string(self):
+        token = AccessToken.for_user(self.patient)
+        communicator = self.communicator(path=f'/ws/notifications/?token={token}')
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+    async def test_new_message_is_pushed_to_recipient_and_sender(self):
+        recipient = await self.connect_as(self.doctor)
+        sender = await self.connect_as(self.patient)
+
+        message = await database_sync_to_async(Message.objects.create)(
+            sender=self.patient, recipient=self.doctor, content='Hello'
+        )
+
+        for communicator in (recipient, sender):
+            event = await communicator.receive_json_from()
+            self.assertEqual(event['event'], 'message.created')
+            self.assertEqual(event['data']['id'], message.id)
+            self.assertEqual(event['data']['content'], 'Hello')
+            await communicator.disconnect()
+
+    async def test_restored_message_is_not_pushed(self):
+        def archive_and_restore():
+            message = Message.objects.create(sender=self.patient, recipient=self.doctor, content='Old')
+            archived = serializers.serialize('python', [message])
+            message.delete()
+            for deserialized in serializers.deserialize('python', archived):
+                deserialized.save()
+
+        recipient = await self.connect_as(self.doctor)
+        await database_sync_to_async(archive_and_restore)()
+
+        event = await recipient.receive_json_from()
+        self.assertEqual(event['data']['content'], 'Old')  # The live create, not the restore
+        self.assertTrue(await recipient.receive_nothing())
+        await recipient.disconnect()
+
+    async def test_broadcast_is_pushed_to_recipient_and_sender(self):
+        start = timezone.now() - timedelta(days=1)
+        await database_sync_to_async(Appointment.objects.create)(
+            doctor=self.doctor, patient=self.patient, status=AppointmentStatus.COMPLETED,
+            appointment_time=start, end_time=start + timedelta(minutes=30),
+        )
+        patient = await self.connect_as(self.patient)
+        doctor = await self.connect_as(self.doctor)
+
+        def broadcast():
+            client = APIClient()
+            client.force_authenticate(self.doctor)
+            return client.post('/communication/broadcast_message/', {'content': 'Clinic closed'}, format='json')
+        response = await database_sync_to_async(broadcast)()
+        self.assertEqual(response.status_code, 201)
+
+        for communicator in (patient, doctor):
+            event = await communicator.receive_json_from()
+            self.assertEqual(event['event'], 'message.created')
+            self.assertEqual(event['data']['content'], 'Clinic closed')
+            await communicator.disconnect()
+
+    async def test_appointment_status_change_is_pushed(self):
+        start = timezone.now() + timedelta(days=1)
+        appointment = await database_sync_to_async(Appointment.objects.create)(
+            doctor=self.doctor, patient=self.patient,
+            appointment_time=start, end_time=start + timedelta(minutes=30),
+        )
+        patient = await self.connect_as(self.patient)
+
+        def confirm():
+            loaded = Appointment.objects.get(pk=appointment.pk)
+            loaded.status = AppointmentStatus.CONFIRMED
+            loaded.save()
+        await database_sync_to_async(confirm)()
+
+        event = await patient.receive_json_from()
+        self.assertEqual(event['event'], 'appointment.status_changed')
+        self.assertEqual(event['data']['status'], AppointmentStatus.CONFIRMED)
+        self.assertEqual(event['data']['previous_status'], AppointmentStatus.PENDING)
+        await patient.disconnect()
+
+    async def test_unchanged_status_is_not_pushed(self):
+        start = timezone.now() + timedelta(days=1)
+        appointment = await database_sync_to_async(Appointment.objects.create)(
+            doctor=self.doctor, patient=self.patient,
+            appointment_time=start, end_time=start + timedelta(minutes=30),
+        )
+        patient = await self.connect_as(self.patient)
+
+        def edit_notes():
+            loaded = Appointment.objects.get(pk=appointment.pk)
+            loaded.notes = 'Bring previous reports'
+            loaded.save()
+        await database_sync_to_async(edit_notes)()
+
+        self.assertTrue(await patient.receive_nothing())
+        await patient.disconnect()
+
+
+class BroadcastMessageTests(TestCase):
+    """Doctor broadcasts to patients with a completed appointment"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = CustomUser.objects.create_user('doctor@example.com', role=UserRoles.DOCTOR, is_verified=True)
+        cls.patients = [
+            CustomUser.objects.create_user(f'patient{index}@example.com', role=UserRoles.PATIENT, is_verified=True)
+            for index in range(3)
+        ]
+        start = timezone.now() - timedelta(days=10)
+        for patient in cls.patients:
+            Appointment.objects.create(
+                doctor=cls.doctor, patient=patient, status=AppointmentStatus.COMPLETED,
+                appointment_time=start, end_time=start + timedelta(minutes=30),
+            )
+        # An earlier conversation, so the broadcast updates one and creates two
+        Message.objects.create(sender=cls.patients[0], recipient=cls.doctor, content='Thank you')
+        Conversation.record_message(Message.objects.get())
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.doctor)
+
+    def broadcast(self, **data):
+        return self.client.post('/communication/broadcast_message/', {'content': 'Clinic closed on Friday', **data}, format='json')
+
+    def test_broadcast_updates_and_creates_conversations(self):
+        response = self.broadcast()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['sent'], 3)
+
+        for patient in self.patients:
+            conversation = Conversation.objects.get(key=Message.objects.filter(recipient=patient).get().conversation_key)
+            self.assertEqual(conversation.last_message.content, 'Clinic closed on Friday')
+            self.assertEqual(conversation.unread_count_for(patient), 1)
+
+    def test_days_out_of_range(self):
+        for days in (0, -5, 999999999):
+            with self.subTest(days=days):
+                self.assertEqual(self.broadcast(days=days).status_code, 400)
+        self.assertFalse(Message.objects.filter(content='Clinic closed on Friday').exists())
+
+    def test_invalid_recipient_ids(self):
+        for recipient_ids in ([True], [2.9], ['abc'], 'abc', [[1]]):
+            with self.subTest(recipient_ids=recipient_ids):
+                response = self.broadcast(recipient_ids=recipient_ids)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('recipient_ids', response.json())
+        self.assertFalse(Message.objects.filter(content='Clinic closed on Friday').exists())
+
+    def test_conversation_created_concurrently_is_updated(self):
+        patient = self.patients[1]
+        bulk_create = Conversation.objects.bulk_create
+
+        def create_concurrently(conversations, **kwargs):
+            # The patient's first message lands between the lookup and the insert
+            message = Message.objects.create(sender=patient, recipient=self.doctor, content='Hello')
+            Conversation.record_message(message)
+            return bulk_create(conversations, **kwargs)
+
+        with mock.patch.object(Conversation.objects, 'bulk_create', side_effect=create_concurrently):
+            self.assertEqual(self.broadcast(recipient_ids=[patient.id]).status_code, 201)
+
+        conversation = Conversation.objects.get(key=Message.objects.filter(recipient=patient).get().conversation_key)
+        self.assertEqual(conversation.last_message.content, 'Clinic closed on Friday')
+        self.assertEqual(conversation.unread_count_for(patient), 1)
+        self.assertEqual(conversation.unread_count_for(self.doctor), 1)
+
+
+class GetMessagesTests(TestCase):
+    """Reading a conversation marks it read"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = CustomUser.objects.create_user('patient@example.com', role=UserRoles.PATIENT, is_verified=True)
+        cls.doctor = CustomUser.objects.create_user('doctor@example.com', role=UserRoles.DOCTOR, is_verified=True)
+        start = timezone.now() - timedelta(days=1)
+        Appointment.objects.create(
+            doctor=cls.doctor, patient=cls.patient, status=AppointmentStatus.COMPLETED,
+            appointment_time=start, end_time=start + timedelta(minutes=30),
+        )
+        Conversation.record_message(Message.objects.create(sender=cls.patient, recipient=cls.doctor, content='Hello'))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.doctor)
+
+    def get_messages(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/communication/get_messages/', {'target_user_id': self.patient.id, 'limit': 10})
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+
+    def test_polling_a_read_conversation_does_not_write(self):
+        self.assertEqual(Conversation.objects.get().unread_count_for(self.doctor), 1)
+        self.assertEqual(len(self.get_messages()), 1)
+        self.assertEqual(Conversation.objects.get().unread_count_for(self.doctor), 0)
+
+        self.assertEqual(self.get_messages(), [])
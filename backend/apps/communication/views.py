@@ -1,16 +1,25 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework import status
-from agora_token_builder import RtcTokenBuilder, RtmTokenBuilder
+from rest_framework import status, generics
+from rest_framework.exceptions import ValidationError
 from django.conf import settings
 from django.utils import timezone
-from apps.accounts.models import CustomUser, UserRoles
+from datetime import timedelta
+from apps.accounts.models import CustomUser
+from apps.accounts.permissions import IsDoctor
 from apps.appointment.models import Appointment, AppointmentStatus
+from django.db import transaction
 from django.db.models import Q
-from .models import Message
-from .serializers import MessageSerializer
-import time
+from .models import Message, Conversation, conversation_key_for
+from .serializers import (
+    MessageSerializer, ConversationSerializer, ChatPartnerSerializer, MessageSearchResultSerializer,
+    BroadcastMessageSerializer,
+)
+from .relationships import has_completed_appointment, get_chat_partners
+from .agora_tokens import get_rtm_token, get_rtc_token
+from .events import message_event_payload, push_to_users
+from .search import full_text_search, SearchResultsSetPagination
 import logging
 import json
 
@@ -22,47 +31,39 @@ class GetRTMTokenView(APIView):
 
     def get(self, request):
         try:
-            app_id = settings.AGORA_APP_ID
-            app_certificate = settings.AGORA_APP_CERTIFICATE
-            user_account = str(request.user.id)
-            privilege_expired_ts = int(time.time()) + 3600
-            role = 1
-            logger.debug(f"Generating RTM token: appId={app_id}, userAccount={user_account}, role={role}, privilegeExpiredTs={privilege_expired_ts}")
-            token = RtmTokenBuilder.buildToken(
-                appId=app_id,
-                appCertificate=app_certificate,
-                userAccount=user_account,
-                role=role,
-                privilegeExpiredTs=privilege_expired_ts
-            )
+            token, _ = get_rtm_token(request.user.id)
             return Response({'token': token}, status=status.HTTP_200_OK)
         except Exception as e:
             logger.error(f"Error generating RTM token: {str(e)}", exc_info=True)
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class GetChatPartnersView(APIView):
-    """List users with whom the authenticated user has completed appointments."""
+    """List distinct users with whom the authenticated user has completed appointments, most recent visit first."""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         user = request.user
-        if user.role == UserRoles.PATIENT:
-            completed_appointments = Appointment.objects.filter(
-                patient=user,
-                status=AppointmentStatus.COMPLETED
-            ).select_related('doctor')
-            partners = [appt.doctor for appt in completed_appointments]
-        elif user.role == UserRoles.DOCTOR:
-            completed_appointments = Appointment.objects.filter(
-                doctor=user,
-                status=AppointmentStatus.COMPLETED
-            ).select_related('patient')
-            partners = [appt.patient for appt in completed_appointments]
-        else:
-            partners = []
+        partners = get_chat_partners(user)
+
+        # Last message previews change with every message, so they are not cached
+        keys = {conversation_key_for(user.id, partner.id): partner.id for partner in partners}
+        conversations = {
+            keys[conversation.key]: conversation
+            for conversation in Conversation.objects.filter(key__in=keys).select_related('last_message')
+        } if keys else {}
 
-        from apps.accounts.serializers import CustomUserSerializer
-        serializer = CustomUserSerializer(partners, many=True, context={'request': request})
+        serializer = ChatPartnerSerializer(
+            partners, many=True, context={'request': request, 'conversations': conversations}
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+class GetConversationsView(APIView):
+    """List the authenticated user's conversations with last message and unread count."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        conversations = Conversation.for_user(request.user)
+        serializer = ConversationSerializer(conversations, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 class GetChatChannelView(APIView):
@@ -80,28 +81,13 @@ class GetChatChannelView(APIView):
         except CustomUser.DoesNotExist:
             return Response({'error': 'Target user not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        if not self._has_completed_appointment(user, target_user):
+        if not has_completed_appointment(user, target_user):
             return Response({'error': 'No completed appointment with this user'}, status=status.HTTP_403_FORBIDDEN)
         
         min_id, max_id = min(user.id, target_user.id), max(user.id, target_user.id)
         channel_name = f'chat_{min_id}_{max_id}'
         return Response({'channel_name': channel_name}, status=status.HTTP_200_OK)
 
-    def _has_completed_appointment(self, user, target_user):
-        if user.role == UserRoles.PATIENT and target_user.role == UserRoles.DOCTOR:
-            return Appointment.objects.filter(
-                patient=user,
-                doctor=target_user,
-                status=AppointmentStatus.COMPLETED
-            ).exists()
-        elif user.role == UserRoles.DOCTOR and target_user.role == UserRoles.PATIENT:
-            return Appointment.objects.filter(
-                doctor=user,
-                patient=target_user,
-                status=AppointmentStatus.COMPLETED
-            ).exists()
-        return False
-
 class StartVideoCallView(APIView):
     """Start a video call by generating an Agora RTC token and channel name."""
     permission_classes = [IsAuthenticated]
@@ -117,7 +103,7 @@ class StartVideoCallView(APIView):
         except CustomUser.DoesNotExist:
             return Response({'error': 'Target user not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        if not self._has_completed_appointment(user, target_user):
+        if not has_completed_appointment(user, target_user):
             return Response({'error': 'No completed appointment with this user'}, status=status.HTTP_403_FORBIDDEN)
         
         # Generate a simpler channel name without timestamp for better compatibility
@@ -128,33 +114,13 @@ class StartVideoCallView(APIView):
         app_certificate = settings.AGORA_APP_CERTIFICATE
         
         # Log the values being used
-        logger.debug(f"AGORA CONFIG - App ID: {app_id[:5]}*** Certificate: {app_certificate[:5]}***")
-        
-        # Add longer expiration time
-        privilege_expired_ts = int(time.time()) + 86400  # 24 hours
+        logger.debug("AGORA CONFIG - App ID: %s*** Certificate: %s***", app_id[:5], app_certificate[:5])
         
         try:
-            # Generate a token with uid=0 (special value allowing any user to join)
+            # Token with uid=0 (special value allowing any user to join), valid for 24 hours
+            # by default; reused from the cache on repeated joins and retries
             uid = 0
-            
-            # Log token generation parameters
-            logger.debug(f"Generating RTC token with parameters: appId length={len(app_id)}, "
-                         f"appCertificate length={len(app_certificate)}, "
-                         f"channelName={channel_name}, uid={uid}, role=1, "
-                         f"privilegeExpiredTs={privilege_expired_ts}")
-            
-            token = RtcTokenBuilder.buildTokenWithUid(
-                appId=app_id,
-                appCertificate=app_certificate,
-                channelName=channel_name,
-                uid=uid,  # Use 0 which allows any uid to join with this token
-                role=1,  # Publisher role
-                privilegeExpiredTs=privilege_expired_ts
-            )
-            
-            # Log token details for debugging
-            token_preview = token[:10] + "..." + token[-5:] if len(token) > 15 else token
-            logger.debug(f"Token generated successfully: {token_preview} (length: {len(token)})")
+            token, privilege_expired_ts = get_rtc_token(user.id, channel_name, uid=uid)
             
             # Create response
             response_data = {
@@ -165,8 +131,11 @@ class StartVideoCallView(APIView):
                 'expires_at': privilege_expired_ts
             }
             
-            # Log the full response for debugging
-            logger.debug(f"Response data: {json.dumps(response_data, default=str)}")
+            # Log the token and full response for debugging (only serialized when enabled)
+            if logger.isEnabledFor(logging.DEBUG):
+                token_preview = token[:10] + "..." + token[-5:] if len(token) > 15 else token
+                logger.debug("Token ready: %s (length: %s)", token_preview, len(token))
+                logger.debug("Response data: %s", json.dumps(response_data, default=str))
             
             return Response(response_data, status=status.HTTP_200_OK)
         except Exception as e:
@@ -177,24 +146,19 @@ class StartVideoCallView(APIView):
                 'cert_length': len(app_certificate) if app_certificate else 0
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _has_completed_appointment(self, user, target_user):
-        if user.role == UserRoles.PATIENT and target_user.role == UserRoles.DOCTOR:
-            return Appointment.objects.filter(
-                patient=user,
-                doctor=target_user,
-                status=AppointmentStatus.COMPLETED
-            ).exists()
-        elif user.role == UserRoles.DOCTOR and target_user.role == UserRoles.PATIENT:
-            return Appointment.objects.filter(
-                doctor=user,
-                patient=target_user,
-                status=AppointmentStatus.COMPLETED
-            ).exists()
-        return False
-
 class GetMessagesView(APIView):
-    """Retrieve chat history between the authenticated user and a target user."""
+    """
+    Retrieve chat history between the authenticated user and a target user.
+
+    Without cursor parameters the full history is returned as a list. With
+    ``after=<id>`` only newer messages are returned (for polling deltas), with
+    ``before=<id>`` the page of messages preceding that id (for scrolling back),
+    and ``limit`` alone returns the latest messages. Cursor responses are
+    ``{"results": [...], "has_more": bool}`` with results oldest first.
+    """
     permission_classes = [IsAuthenticated]
+    default_limit = 50
+    max_limit = 200
 
     def get(self, request):
         target_user_id = request.query_params.get('target_user_id')
@@ -207,29 +171,53 @@ class GetMessagesView(APIView):
         except CustomUser.DoesNotExist:
             return Response({'error': 'Target user not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        if not self._has_completed_appointment(user, target_user):
+        if not has_completed_appointment(user, target_user):
             return Response({'error': 'No completed appointment with this user'}, status=status.HTTP_403_FORBIDDEN)
         
+        try:
+            after = self._int_param(request, 'after')
+            before = self._int_param(request, 'before')
+            limit = self._int_param(request, 'limit')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
         messages = Message.objects.filter(
-            (Q(sender=user) & Q(recipient=target_user)) | (Q(sender=target_user) & Q(recipient=user))
-        ).order_by('timestamp')
-        serializer = MessageSerializer(messages, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            conversation_key=conversation_key_for(user.id, target_user.id)
+        ).select_related('sender', 'recipient')
+        Conversation.mark_read(user, target_user)
+        
+        if after is None and before is None and limit is None:
+            serializer = MessageSerializer(messages.order_by('id'), many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        
+        limit = min(limit or self.default_limit, self.max_limit)
+        if after is not None:
+            # Newer messages, oldest first
+            page = list(messages.filter(id__gt=after).order_by('id')[:limit + 1])
+            has_more = len(page) > limit
+            page = page[:limit]
+        else:
+            # Latest messages (before the cursor, if given), fetched newest first
+            if before is not None:
+                messages = messages.filter(id__lt=before)
+            page = list(messages.order_by('-id')[:limit + 1])
+            has_more = len(page) > limit
+            page = page[:limit][::-1]
+        
+        serializer = MessageSerializer(page, many=True)
+        return Response({'results': serializer.data, 'has_more': has_more}, status=status.HTTP_200_OK)
 
-    def _has_completed_appointment(self, user, target_user):
-        if user.role == UserRoles.PATIENT and target_user.role == UserRoles.DOCTOR:
-            return Appointment.objects.filter(
-                patient=user,
-                doctor=target_user,
-                status=AppointmentStatus.COMPLETED
-            ).exists()
-        elif user.role == UserRoles.DOCTOR and target_user.role == UserRoles.PATIENT:
-            return Appointment.objects.filter(
-                doctor=user,
-                patient=target_user,
-                status=AppointmentStatus.COMPLETED
-            ).exists()
-        return False
+    def _int_param(self, request, name):
+        value = request.query_params.get(name)
+        if value in (None, ''):
+            return None
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{name} must be an integer')
+        if value < (1 if name == 'limit' else 0):
+            raise ValueError(f'{name} must be a positive integer')
+        return value
 
 class SendMessageView(APIView):
     """Send a chat message to a target user and store it in the database."""
@@ -247,24 +235,112 @@ class SendMessageView(APIView):
         except CustomUser.DoesNotExist:
             return Response({'error': 'Recipient not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        if not self._has_completed_appointment(user, recipient):
+        if not has_completed_appointment(user, recipient):
             return Response({'error': 'No completed appointment with this user'}, status=status.HTTP_403_FORBIDDEN)
         
-        message = Message.objects.create(sender=user, recipient=recipient, content=content)
+        with transaction.atomic():
+            message = Message.objects.create(sender=user, recipient=recipient, content=content)
+            Conversation.record_message(message)
         serializer = MessageSerializer(message)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-    def _has_completed_appointment(self, user, recipient):
-        if user.role == UserRoles.PATIENT and recipient.role == UserRoles.DOCTOR:
-            return Appointment.objects.filter(
-                patient=user,
-                doctor=recipient,
-                status=AppointmentStatus.COMPLETED
-            ).exists()
-        elif user.role == UserRoles.DOCTOR and recipient.role == UserRoles.PATIENT:
-            return Appointment.objects.filter(
-                doctor=user,
-                patient=recipient,
-                status=AppointmentStatus.COMPLETED
-            ).exists()
-        return False
\ No newline at end of file
+class BroadcastMessageView(APIView):
+    """
+    Send the same message from a doctor to many patients, e.g. a clinic announcement.
+
+    Recipients are either the given ``recipient_ids`` or, by default, every patient
+    with a completed appointment in the last ``days`` days (90 by default, at
+    most 3650). Only
+    patients with a completed appointment with the doctor are eligible; the rest
+    are reported as not eligible. Messages are inserted with bulk_create in batches.
+    """
+    permission_classes = [IsAuthenticated, IsDoctor]
+    batch_size = 500
+
+    def post(self, request):
+        serializer = BroadcastMessageSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        content = serializer.validated_data['content']
+        days = serializer.validated_data['days']
+        recipient_ids = serializer.validated_data.get('recipient_ids')
+        if recipient_ids is not None:
+            recipient_ids = list(dict.fromkeys(recipient_ids))
+        
+        user = request.user
+        
+        # Resolve eligible recipients with one query
+        eligible = Appointment.objects.filter(
+            doctor=user,
+            status=AppointmentStatus.COMPLETED,
+            patient__isnull=False,
+            patient__is_active=True
+        )
+        if recipient_ids is not None:
+            eligible = eligible.filter(patient_id__in=recipient_ids)
+        else:
+            eligible = eligible.filter(appointment_time__gte=timezone.now() - timedelta(days=days))
+        eligible_ids = set(eligible.order_by().values_list('patient_id', flat=True).distinct())
+        
+        if recipient_ids is None:
+            recipient_ids = sorted(eligible_ids)
+        
+        messages = [
+            Message(
+                sender=user,
+                recipient_id=recipient_id,
+                content=content,
+                conversation_key=conversation_key_for(user.id, recipient_id)
+            )
+            for recipient_id in recipient_ids if recipient_id in eligible_ids
+        ]
+        
+        with transaction.atomic():
+            # bulk_create skips Message.save() and post_save, so conversations and pushes are handled here
+            messages = Message.objects.bulk_create(messages, batch_size=self.batch_size)
+            Conversation.record_messages(messages)
+            for message in messages:
+                push_to_users([message.recipient_id, user.id], 'message.created', message_event_payload(message))
+        
+        logger.info("Doctor %s broadcast a message to %s of %s recipients", user.id, len(messages), len(recipient_ids))
+        
+        message_ids = {message.recipient_id: message.id for message in messages}
+        results = [
+            {'recipient_id': recipient_id, 'status': 'sent', 'message_id': message_ids[recipient_id]}
+            if recipient_id in message_ids else
+            {'recipient_id': recipient_id, 'status': 'not_eligible', 'error': 'No completed appointment with this user'}
+            for recipient_id in recipient_ids
+        ]
+        return Response({
+            'sent': len(messages),
+            'failed': len(recipient_ids) - len(messages),
+            'results': results
+        }, status=status.HTTP_201_CREATED if messages else status.HTTP_200_OK)
+
+class SearchMessagesView(generics.ListAPIView):
+    """
+    Full-text search over the authenticated user's messages, best matches first.
+
+    Query parameters: ``q`` (required), ``target_user_id`` to search a single
+    conversation, and ``page`` / ``page_size`` for pagination.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = MessageSearchResultSerializer
+    pagination_class = SearchResultsSetPagination
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'A search query is required'})
+        
+        user = self.request.user
+        target_user_id = self.request.query_params.get('target_user_id')
+        if target_user_id:
+            try:
+                messages = Message.objects.filter(conversation_key=conversation_key_for(user.id, target_user_id))
+            except ValueError:
+                raise ValidationError({'target_user_id': 'Must be a user ID'})
+        else:
+            messages = Message.objects.filter(Q(sender=user) | Q(recipient=user))
+        
+        return full_text_search(messages, query).select_related('sender', 'recipient')
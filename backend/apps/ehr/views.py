@@ -24,6 +24,8 @@ from .serializers import (
 from apps.appointment.models import Appointment, AppointmentStatus
 from apps.accounts.models import UserRoles
 from apps.accounts.permissions import IsAdminOrSuperuser, IsVerified, IsStaff
+from apps.monitoring.metrics import time_pdf_render
+from apps.replicas.mixins import ReplicaReadMixin
 
 logger = logging.getLogger(__name__)
 
@@ -285,7 +287,8 @@ class MedicalRecordViewSet(viewsets.ModelViewSet):
             elements.append(Paragraph(medical_record.notes, content_style))
         
         # Build PDF
-        doc.build(elements)
+        with time_pdf_render('medical_record'):
+            doc.build(elements)
         
         # Get PDF value from the BytesIO buffer
         pdf = buffer.getvalue()
@@ -429,7 +432,7 @@ class MedicalAttachmentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class MedicalRecordAuditViewSet(viewsets.ReadOnlyModelViewSet):
+class MedicalRecordAuditViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for viewing medical record audit logs"""
     serializer_class = MedicalAuditSerializer
     permission_classes = [permissions.IsAuthenticated, IsVerified, IsAdminOrSuperuser]
@@ -0,0 +1,44 @@
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from .metrics import observe_cache_lookups
+
+_MISSING = object()
+
+
+class InstrumentedCacheMixin:
+    """
+    Cache backend mixin that counts hits and misses in the Prometheus metrics
+
+    The metrics label is the cache's METRICS_NAME (or its LOCATION), set in CACHES.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(location, params)
+        self.metrics_name = params.get('METRICS_NAME') or str(location) or 'default'
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if value is _MISSING:
+            observe_cache_lookups(self.metrics_name, 0, 1)
+            return default
+        observe_cache_lookups(self.metrics_name, 1, 0)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = super().get_many(keys, version=version)
+        observe_cache_lookups(self.metrics_name, len(values), len(keys) - len(values))
+        return values
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    pass
+
+
+class InstrumentedFileBasedCache(InstrumentedCacheMixin, FileBasedCache):
+    pass
@@ -0,0 +1,114 @@
+import re
+import time
+import threading
+from collections import Counter
+
+# SQL literals and parameter lists that vary between otherwise identical queries
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*(?:\?|%s)\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint_sql(sql):
+    """
+    Normalize a SQL statement so that queries differing only in their parameters
+    share a fingerprint (an N+1 pattern shows up as one fingerprint run many times)
+
+    Args:
+        sql: SQL text, with or without parameters interpolated
+
+    Returns:
+        The normalized statement
+    """
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    return _WHITESPACE_RE.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper (see connection.execute_wrapper) that counts and
+    times the queries run while it is installed, keeping their fingerprints
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint_sql(sql)] += 1
+
+
+class RouteStats:
+    """
+    In-process aggregate of request metrics per route (thread-safe)
+
+    Each worker process keeps its own totals; they reset when the process restarts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, duration, db_duration, query_count, response_size):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    'requests': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'db_ms': 0.0,
+                    'queries': 0,
+                    'max_queries': 0,
+                    'response_bytes': 0,
+                }
+            duration_ms = duration * 1000
+            stats['requests'] += 1
+            stats['total_ms'] += duration_ms
+            stats['max_ms'] = max(stats['max_ms'], duration_ms)
+            stats['db_ms'] += db_duration * 1000
+            stats['queries'] += query_count
+            stats['max_queries'] = max(stats['max_queries'], query_count)
+            stats['response_bytes'] += response_size
+
+    def snapshot(self):
+        """
+        Return per-route totals and averages, slowest total time first
+
+        Returns:
+            List of dicts with route, request count, average/max latency,
+            average DB time, average/max query count and average response size
+        """
+        with self._lock:
+            routes = [(route, dict(stats)) for route, stats in self._routes.items()]
+        results = []
+        for route, stats in sorted(routes, key=lambda item: item[1]['total_ms'], reverse=True):
+            requests = stats['requests']
+            results.append({
+                'route': route,
+                'requests': requests,
+                'avg_ms': round(stats['total_ms'] / requests, 2),
+                'max_ms': round(stats['max_ms'], 2),
+                'avg_db_ms': round(stats['db_ms'] / requests, 2),
+                'avg_queries': round(stats['queries'] / requests, 2),
+                'max_queries': stats['max_queries'],
+                'avg_response_bytes': stats['response_bytes'] // requests,
+            })
+        return results
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_stats = RouteStats()
@@ -0,0 +1,162 @@
+"""
+Prometheus metrics for the backend
+
+Metrics are recorded with prometheus_client. When PROMETHEUS_MULTIPROC_DIR is set
+(it must be set before the first import of prometheus_client, which settings.py
+takes care of), every worker process writes its values to memory-mapped files in
+that directory and the metrics endpoint aggregates them, so all gunicorn workers
+are reported together. The directory should be emptied before the server starts,
+and gunicorn's child_exit hook should call `mark_worker_dead(worker.pid)`.
+"""
+import os
+import time
+import logging
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+from django.db.models import Count, F
+from django.utils import timezone
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+REQUEST_COUNT = Counter(
+    'sajilocms_http_requests_total', 'HTTP requests', ['view', 'method', 'status'],
+)
+REQUEST_LATENCY = Histogram(
+    'sajilocms_http_request_duration_seconds', 'HTTP request latency', ['view', 'method'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    'sajilocms_http_request_db_queries', 'Database queries per HTTP request', ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200),
+)
+CACHE_REQUESTS = Counter(
+    'sajilocms_cache_requests_total', 'Cache lookups by result', ['cache', 'result'],
+)
+LLM_LATENCY = Histogram(
+    'sajilocms_chatbot_llm_duration_seconds', 'Chatbot LLM call latency', ['backend', 'operation'],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30),
+)
+LLM_ERRORS = Counter(
+    'sajilocms_chatbot_llm_errors_total', 'Chatbot LLM call failures', ['backend', 'operation'],
+)
+PDF_RENDER_LATENCY = Histogram(
+    'sajilocms_pdf_render_duration_seconds', 'PDF render time', ['document'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+)
+
+
+def observe_request(view, method, status_code, duration, query_count):
+    """Record a finished HTTP request"""
+    REQUEST_COUNT.labels(view, method, str(status_code)).inc()
+    REQUEST_LATENCY.labels(view, method).observe(duration)
+    REQUEST_QUERIES.labels(view).observe(query_count)
+
+
+def observe_cache_lookups(cache_name, hits, misses):
+    """Record cache lookups for hit-ratio reporting"""
+    if hits:
+        CACHE_REQUESTS.labels(cache_name, 'hit').inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache_name, 'miss').inc(misses)
+
+
+@contextmanager
+def time_llm_call(backend, operation):
+    """Time a chatbot LLM call, counting it as an error if it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        LLM_ERRORS.labels(backend, operation).inc()
+        raise
+    finally:
+        LLM_LATENCY.labels(backend, operation).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def time_pdf_render(document):
+    """Time rendering a PDF document"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PDF_RENDER_LATENCY.labels(document).observe(time.perf_counter() - start)
+
+
+class DomainCollector:
+    """
+    Gauges computed from the database when metrics are scraped: pending time-off
+    approvals, medicines at or below their low-stock threshold, and today's
+    appointments by status
+    """
+
+    def collect(self):
+        from apps.appointment.models import Appointment, TimeOff
+        from apps.pharmacy.models import Medicine
+
+        try:
+            pending_time_off = TimeOff.objects.filter(is_approved=False, end_time__gte=timezone.now()).count()
+            low_stock = Medicine.objects.filter(stock_quantity__lte=F('low_stock_threshold')).count()
+
+            start_of_day = timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.min))
+            appointments_today = list(
+                Appointment.objects
+                .filter(appointment_time__gte=start_of_day, appointment_time__lt=start_of_day + timedelta(days=1))
+                .values_list('status')
+                .order_by()
+                .annotate(count=Count('id'))
+            )
+        except Exception as e:
+            logger.error(f"Failed to collect domain metrics: {str(e)}")
+            return
+
+        yield GaugeMetricFamily(
+            'sajilocms_time_off_pending_approval', 'Upcoming time-off requests awaiting approval', value=pending_time_off,
+        )
+        yield GaugeMetricFamily(
+            'sajilocms_medicine_low_stock', 'Medicines at or below their low-stock threshold', value=low_stock,
+        )
+        today = GaugeMetricFamily(
+            'sajilocms_appointments_today', "Today's appointments by status", labels=['status'],
+        )
+        for status, count in appointments_today:
+            today.add_metric([status], count)
+        yield today
+
+
+def is_multiprocess():
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def render_metrics():
+    """
+    Render all metrics in the Prometheus text exposition format
+
+    Returns:
+        Tuple of (body bytes, content type)
+    """
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = CollectorRegistry()
+        registry.register(_ProcessRegistryCollector())
+    registry.register(DomainCollector())
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class _ProcessRegistryCollector:
+    """Expose the default (single-process) registry inside another registry"""
+
+    def collect(self):
+        return REGISTRY.collect()
+
+
+def mark_worker_dead(pid):
+    """Clean up a dead worker's live gauge files (call from gunicorn's child_exit hook)"""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
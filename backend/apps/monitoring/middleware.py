@@ -0,0 +1,80 @@
+import time
+import logging
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+from .instrumentation import QueryRecorder, route_stats
+from .metrics import observe_request
+
+logger = logging.getLogger(__name__)
+
+
+def get_route_pattern(request):
+    """
+    Label a request by its URL pattern (not the concrete path, so IDs in URLs
+    don't create a route per object)
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return "<unresolved>"
+    return f"/{match.route}"
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Measure each request's query count, DB time, Python time and response size
+
+    The numbers are aggregated per route in `route_stats` and, with
+    SERVER_TIMING_HEADER (on by default only with DEBUG), added to the response
+    as a Server-Timing header (visible in browser dev tools). Requests over
+    SLOW_REQUEST_THRESHOLD_MS or SLOW_REQUEST_QUERY_THRESHOLD queries are logged
+    with their most repeated query fingerprints. Each request is also recorded in
+    the Prometheus metrics (apps.monitoring.metrics).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_INSTRUMENTATION_ENABLED', True)
+        self.slow_ms = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', 500)
+        self.slow_queries = getattr(settings, 'SLOW_REQUEST_QUERY_THRESHOLD', 50)
+        self.server_timing = getattr(settings, 'SERVER_TIMING_HEADER', settings.DEBUG)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        python_duration = max(duration - recorder.duration, 0.0)
+        response_size = 0 if response.streaming else len(response.content)
+        pattern = get_route_pattern(request)
+        route = f"{request.method} {pattern}"
+
+        if self.server_timing:
+            response['Server-Timing'] = ", ".join([
+                f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"',
+                f"app;dur={python_duration * 1000:.1f}",
+                f"total;dur={duration * 1000:.1f}",
+            ])
+
+        route_stats.record(route, duration, recorder.duration, recorder.count, response_size)
+        observe_request(pattern, request.method, response.status_code, duration, recorder.count)
+
+        if duration * 1000 >= self.slow_ms or recorder.count >= self.slow_queries:
+            repeated = "; ".join(
+                f"{count}x {fingerprint[:200]}"
+                for fingerprint, count in recorder.fingerprints.most_common(5)
+            )
+            logger.warning(
+                "Slow request %s %s (%s): %.1f ms, %s queries in %.1f ms, %s bytes. Top queries: %s",
+                request.method, request.path, route, duration * 1000,
+                recorder.count, recorder.duration * 1000, response_size, repeated,
+            )
+
+        return response
@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+app_name = 'monitoring'
+
+urlpatterns = [
+    # Per-route request metrics (admin only)
+    path('routes/', views.RouteMetricsView.as_view(), name='route-metrics'),
+    
+    # Prometheus scrape endpoint
+    path('metrics/', views.metrics_view, name='metrics'),
+]
@@ -0,0 +1,43 @@
+import hmac
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from apps.accounts.permissions import IsAdminOrSuperuser
+from .instrumentation import route_stats
+from .metrics import render_metrics
+
+
+class RouteMetricsView(APIView):
+    """Per-route request metrics aggregated by RequestInstrumentationMiddleware in this worker process"""
+    permission_classes = [IsAdminOrSuperuser]
+
+    def get(self, request):
+        return Response(route_stats.snapshot())
+
+    def delete(self, request):
+        """Reset the aggregated metrics"""
+        route_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint
+
+    A plain Django view (no DRF authentication or rendering), protected by the
+    bearer token in METRICS_AUTH_TOKEN. Without a token it is only served with
+    DEBUG on: the metrics include clinic data (appointments by status, pending
+    time off, low stock) and each scrape runs database queries.
+    """
+    token = getattr(settings, 'METRICS_AUTH_TOKEN', '')
+    if token:
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        if not hmac.compare_digest(header.encode(), f"Bearer {token}".encode()):
+            return HttpResponse("Unauthorized", status=401, content_type='text/plain')
+    elif not settings.DEBUG:
+        return HttpResponse("Set METRICS_AUTH_TOKEN to enable metrics", status=403, content_type='text/plain')
+
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PharmacyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.pharmacy'
+
+    def ready(self):
+        # Register cache invalidation rules
+        import apps.pharmacy.cache_keys
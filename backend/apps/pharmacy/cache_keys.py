@@ -0,0 +1,17 @@
+from apps.caching.keys import versioned_key
+from apps.caching.registry import invalidates
+from .models import Medicine, Order, OrderMedicine
+
+REPORTS_CACHE = 'reports'
+REPORTS_NAMESPACE = 'pharmacy'
+
+
+def report_cache_key(report, *parts):
+    """Cache key for a pharmacy report (parts for reports that depend on e.g. the date)"""
+    return versioned_key(REPORTS_CACHE, REPORTS_NAMESPACE, report, *parts)
+
+
+@invalidates(Medicine, Order, OrderMedicine, alias=REPORTS_CACHE, namespaces=True)
+def pharmacy_reports(instance):
+    """Stock, expiry and usage reports are built from medicines and orders"""
+    return [REPORTS_NAMESPACE]
@@ -1,3 +1,54 @@
-from django.test import TestCase
+import gzip
+from datetime import date, timedelta
+from decimal import Decimal
+import brotli
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.accounts.models import CustomUser, UserRoles
+from .models import Medicine, Order, OrderMedicine
 
-# Create your tests here.
+ORDERS_URL = '/api/pharmacy/orders/'
+BILLINGS_URL = '/api/pharmacy/billings/'
+
+
+class OrderConditionalGetTests(TestCase):
+    """ETags of order and billing responses, and their compression"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.pharmacist = CustomUser.objects.create_user('pharmacist@example.com', role=UserRoles.PHARMACIST, is_verified=True)
+        patient = CustomUser.objects.create_user('patient@example.com', role=UserRoles.PATIENT, is_verified=True)
+        today = date.today()
+        cls.medicine = Medicine.objects.create(
+            name='Paracetamol', manufacturer='Test', price=Decimal('2.50'),
+            manufacture_date=today - timedelta(days=30), expiration_date=today + timedelta(days=365),
+        )
+        cls.order = Order.objects.create(patient=patient)
+        OrderMedicine.objects.create(order=cls.order, medicine=cls.medicine, quantity=2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.pharmacist)
+
+    def test_added_line_item_changes_etags(self):
+        urls = (ORDERS_URL, f'{ORDERS_URL}{self.order.id}/', BILLINGS_URL, f'{BILLINGS_URL}{self.order.billing.id}/')
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+        for url, etag in etags.items():
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # A line item is added without touching any timestamp in the ETag
+        OrderMedicine.objects.create(order=self.order, medicine=self.medicine, quantity=1)
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_settings(COMPRESSION_MIN_SIZE=0)
+    def test_compressed_bodies_are_padded(self):
+        plain = self.client.get(ORDERS_URL).content
+        for encoding, decompress in (('br', brotli.decompress), ('gzip', gzip.decompress)):
+            with self.subTest(encoding=encoding):
+                responses = [self.client.get(ORDERS_URL, HTTP_ACCEPT_ENCODING=encoding) for _ in range(10)]
+                for response in responses:
+                    self.assertEqual(response['Content-Encoding'], encoding)
+                    self.assertEqual(decompress(response.content), plain)
+                self.assertGreater(len({len(response.content) for response in responses}), 1)
@@ -12,6 +12,10 @@ from .serializers import (
 )
 from apps.accounts.permissions import IsPharmacist, IsPatient, IsAdminOrSuperuser
 from apps.accounts.models import UserRoles  # Add this import
+from apps.caching.conditional import ConditionalGetMixin
+from apps.caching.keys import get_or_compute
+from apps.replicas.mixins import ReplicaReadMixin
+from .cache_keys import REPORTS_CACHE, report_cache_key
 from rest_framework import serializers
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -19,7 +23,24 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class MedicineListCreateView(generics.ListCreateAPIView):
+class MedicineConditionalGetMixin(ConditionalGetMixin):
+    """Conditional GET for medicines, whose serialized is_expired depends on the date"""
+    etag_time_bucket = 86400
+
+class OrderConditionalGetMixin(MedicineConditionalGetMixin):
+    """
+    Conditional GET for orders with their nested medicines; line items have no
+    timestamp, so their count catches added and removed items
+    """
+    etag_timestamp_fields = ('updated_at', 'ordermedicine__medicine__updated_at')
+    etag_count_fields = ('ordermedicine',)
+
+class BillingConditionalGetMixin(MedicineConditionalGetMixin):
+    """Conditional GET for billings, which nest their order and its medicines"""
+    etag_timestamp_fields = ('updated_at', 'order__updated_at', 'order__ordermedicine__medicine__updated_at')
+    etag_count_fields = ('order__ordermedicine',)
+
+class MedicineListCreateView(MedicineConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = MedicineSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
@@ -68,7 +89,7 @@ class MedicineListCreateView(generics.ListCreateAPIView):
         except Exception as e:
             raise serializers.ValidationError(str(e))
 
-class MedicineDetailView(generics.RetrieveUpdateDestroyAPIView):
+class MedicineDetailView(MedicineConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Medicine.objects.all()
     serializer_class = MedicineSerializer
     permission_classes = [IsPharmacist]
@@ -97,7 +118,7 @@ class MedicineDetailView(generics.RetrieveUpdateDestroyAPIView):
         )
         instance.delete()
 
-class OrderListCreateView(generics.ListCreateAPIView):
+class OrderListCreateView(OrderConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
@@ -125,7 +146,7 @@ class OrderListCreateView(generics.ListCreateAPIView):
             user_agent=self.request.META.get('HTTP_USER_AGENT')
         )
 
-class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
+class OrderDetailView(OrderConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Order.objects.all().select_related('patient')
     serializer_class = OrderSerializer
     permission_classes = [IsPharmacist]
@@ -167,7 +188,7 @@ class FulfillOrderView(APIView):
         except ValueError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-class BillingListView(generics.ListAPIView):
+class BillingListView(BillingConditionalGetMixin, generics.ListAPIView):
     queryset = Billing.objects.all().select_related('order__patient')
     serializer_class = BillingSerializer
     permission_classes = [IsPharmacist]
@@ -175,7 +196,7 @@ class BillingListView(generics.ListAPIView):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['payment_status']
 
-class BillingDetailView(generics.RetrieveUpdateAPIView):
+class BillingDetailView(BillingConditionalGetMixin, generics.RetrieveUpdateAPIView):
     queryset = Billing.objects.all().select_related('order__patient')
     serializer_class = BillingSerializer
     permission_classes = [IsPharmacist]
@@ -235,39 +256,45 @@ class AddStockView(APIView):
         except ValueError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-class StockReportView(APIView):
+class StockReportView(ReplicaReadMixin, APIView):
     permission_classes = [IsAdminOrSuperuser]
 
     def get(self, request):
-        medicines = Medicine.objects.all().values(
-            'id', 'name', 'stock_quantity', 'low_stock_threshold',
-            'manufacture_date', 'expiration_date'
-        )
+        def build():
+            return list(Medicine.objects.all().values(
+                'id', 'name', 'stock_quantity', 'low_stock_threshold',
+                'manufacture_date', 'expiration_date'
+            ))
+        medicines = get_or_compute(REPORTS_CACHE, report_cache_key('stock'), build)
         return Response(medicines, status=status.HTTP_200_OK)
 
-class ExpiredMedicinesView(APIView):
+class ExpiredMedicinesView(ReplicaReadMixin, APIView):
     permission_classes = [IsAdminOrSuperuser]
 
     def get(self, request):
-        expired_medicines = Medicine.objects.filter(
-            expiration_date__lt=timezone.now().date()
-        )
-        serializer = MedicineSerializer(expired_medicines, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        today = timezone.now().date()
+
+        def build():
+            expired_medicines = Medicine.objects.filter(expiration_date__lt=today)
+            return MedicineSerializer(expired_medicines, many=True).data
+        data = get_or_compute(REPORTS_CACHE, report_cache_key('expired', today.isoformat()), build)
+        return Response(data, status=status.HTTP_200_OK)
 
-class MostUsedMedicinesView(APIView):
+class MostUsedMedicinesView(ReplicaReadMixin, APIView):
     permission_classes = [IsAdminOrSuperuser]
 
     def get(self, request):
-        most_used = Medicine.objects.filter(
-            ordermedicine__order__status='FULFILLED'
-        ).annotate(
-            usage_count=Count('ordermedicine')
-        ).order_by('-usage_count')[:10]
-        serializer = MedicineSerializer(most_used, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
-class AuditLogListView(generics.ListAPIView):
+        def build():
+            most_used = Medicine.objects.filter(
+                ordermedicine__order__status='FULFILLED'
+            ).annotate(
+                usage_count=Count('ordermedicine')
+            ).order_by('-usage_count')[:10]
+            return MedicineSerializer(most_used, many=True).data
+        data = get_or_compute(REPORTS_CACHE, report_cache_key('most_used'), build)
+        return Response(data, status=status.HTTP_200_OK)
+
+class AuditLogListView(ReplicaReadMixin, generics.ListAPIView):
     queryset = AuditLog.objects.all().select_related('performed_by')
     serializer_class = AuditLogSerializer
     permission_classes = [IsAdminOrSuperuser]
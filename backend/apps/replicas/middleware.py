@@ -0,0 +1,44 @@
+import logging
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from .routing import get_replica_alias, pin_to_primary, reset_pin
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Read-your-writes for replica reads
+
+    A successful write request (any method other than GET, HEAD or OPTIONS)
+    sets a short-lived cookie; while a client has it, all of its reads go to
+    the primary. REPLICA_STICKY_SECONDS should exceed the replica's usual lag.
+    Does nothing when no replica is configured.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.cookie_name = getattr(settings, 'REPLICA_STICKY_COOKIE', 'db_primary')
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+
+    def __call__(self, request):
+        if get_replica_alias() is None:
+            return self.get_response(request)
+
+        token = pin_to_primary(self.cookie_name in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_pin(token)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=self.sticky_seconds,
+                path='/',
+                domain=getattr(settings, 'COOKIE_DOMAIN', None),
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite=settings.CSRF_COOKIE_SAMESITE or 'Lax',
+            )
+        return response
@@ -0,0 +1,18 @@
+from rest_framework.permissions import SAFE_METHODS
+from .routing import read_from_replica
+
+
+class ReplicaReadMixin:
+    """
+    View mixin serving read-only requests (GET, HEAD, OPTIONS) from the replica
+
+    Writes, and reads by clients that wrote recently, still use the primary (see
+    apps.replicas.routing). Use it for reports and lists that tolerate a few
+    seconds of replication lag.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            with read_from_replica():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
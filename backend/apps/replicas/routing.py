@@ -0,0 +1,97 @@
+"""
+Read-replica routing
+
+Reads go to the primary database unless code opts in, with `read_from_replica()`,
+the `use_replica` decorator or apps.replicas.mixins.ReplicaReadMixin. Even then
+they stay on the primary when:
+- no replica is configured (settings.REPLICA_DATABASE_ALIAS not in DATABASES)
+- the client wrote recently (ReplicaStickinessMiddleware pins it to the primary
+  for REPLICA_STICKY_SECONDS, so users see their own writes despite replica lag)
+- the current request or block already wrote, or a transaction is open
+
+The state lives in context variables, so it is per request under WSGI and ASGI.
+"""
+import functools
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+_wrote = ContextVar('wrote_to_primary', default=False)
+
+
+def get_replica_alias():
+    """Return the replica's DATABASES alias, or None if no replica is configured"""
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def pin_to_primary(pinned=True):
+    """Send this context's reads to the primary (used for read-your-writes stickiness)"""
+    return _pinned_to_primary.set(pinned)
+
+
+def reset_pin(token):
+    _pinned_to_primary.reset(token)
+
+
+def has_written():
+    """Whether anything was written to the primary in this context"""
+    return _wrote.get()
+
+
+@contextmanager
+def read_from_replica():
+    """Route reads inside the block to the replica (where allowed)"""
+    token = _replica_reads.set(True)
+    wrote_token = _wrote.set(False)
+    try:
+        yield
+    finally:
+        _wrote.reset(wrote_token)
+        _replica_reads.reset(token)
+
+
+def use_replica(func):
+    """Decorator routing the reads of a view or function to the replica (where allowed)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with read_from_replica():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def replica_for_read():
+    """The alias reads should use right now: the replica, or None for the primary"""
+    if not _replica_reads.get() or _pinned_to_primary.get() or _wrote.get():
+        return None
+    replica = get_replica_alias()
+    if replica is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return None
+    return replica
+
+
+class ReplicaRouter:
+    """
+    Database router sending opted-in reads to the replica and everything else,
+    including all writes and migrations, to the primary
+    """
+
+    def db_for_read(self, model, **hints):
+        return replica_for_read() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if _replica_reads.get() and not _wrote.get():
+            # Later reads in this block must see the write
+            _wrote.set(True)
+            logger.debug("Write to %s; reads stay on the primary", model._meta.label)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
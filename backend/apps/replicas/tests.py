@@ -0,0 +1,128 @@
+import shutil
+import tempfile
+import warnings
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from apps.caching.keys import get_or_compute
+from apps.pharmacy.models import Medicine
+from .middleware import ReplicaStickinessMiddleware
+from .routing import pin_to_primary, read_from_replica, reset_pin
+
+REPLICA = 'test_replica'
+
+
+def make_medicine(name, using=DEFAULT_DB_ALIAS):
+    today = date.today()
+    return Medicine.objects.using(using).create(
+        name=name,
+        manufacturer='Test',
+        manufacture_date=today - timedelta(days=30),
+        expiration_date=today + timedelta(days=365),
+        price=Decimal('1.00'),
+    )
+
+
+def medicine_names():
+    return list(Medicine.objects.values_list('name', flat=True))
+
+
+@override_settings(
+    REPLICA_DATABASE_ALIAS=REPLICA,
+    DATABASE_ROUTERS=['apps.replicas.routing.ReplicaRouter'],
+)
+class ReplicaRouterTests(TransactionTestCase):
+    """
+    Routing between the test database and a second SQLite database acting as
+    the replica; each holds a different row, so a read shows where it went
+    """
+    databases = {DEFAULT_DB_ALIAS}
+
+    def setUp(self):
+        self.replica_dir = tempfile.mkdtemp()
+        replica_settings = connections.configure_settings({
+            DEFAULT_DB_ALIAS: {},
+            REPLICA: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': f'{self.replica_dir}/replica.sqlite3'},
+        })[REPLICA]
+        connections.settings[REPLICA] = replica_settings
+        # get_replica_alias() looks the alias up in settings.DATABASES
+        databases = override_settings(DATABASES={**connections.settings})
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            databases.enable()
+        self.addCleanup(databases.disable)
+        self.addCleanup(self._remove_replica)
+
+        # Connect explicitly: the test case only lets aliases known when it was
+        # set up connect on demand
+        connections[REPLICA].connect()
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(Medicine)
+        make_medicine('On primary')
+        make_medicine('On replica', using=REPLICA)
+
+    def _remove_replica(self):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        shutil.rmtree(self.replica_dir, ignore_errors=True)
+
+    def test_reads_use_primary_unless_opted_in(self):
+        self.assertEqual(medicine_names(), ['On primary'])
+        with read_from_replica():
+            self.assertEqual(medicine_names(), ['On replica'])
+        self.assertEqual(medicine_names(), ['On primary'])
+
+    def test_writes_go_to_primary(self):
+        with read_from_replica():
+            self.assertEqual(router.db_for_write(Medicine), DEFAULT_DB_ALIAS)
+
+    def test_reads_after_a_write_stay_on_primary(self):
+        with read_from_replica():
+            make_medicine('Written')
+            self.assertEqual(sorted(medicine_names()), ['On primary', 'Written'])
+        self.assertEqual(Medicine.objects.using(REPLICA).filter(name='Written').count(), 0)
+
+    def test_reads_in_a_transaction_stay_on_primary(self):
+        with read_from_replica(), transaction.atomic():
+            self.assertEqual(medicine_names(), ['On primary'])
+
+    def test_pinned_client_reads_primary(self):
+        token = pin_to_primary()
+        try:
+            with read_from_replica():
+                self.assertEqual(medicine_names(), ['On primary'])
+        finally:
+            reset_pin(token)
+
+    def test_stickiness_middleware(self):
+        def view(request):
+            with read_from_replica():
+                return HttpResponse(','.join(medicine_names()))
+
+        middleware = ReplicaStickinessMiddleware(view)
+        factory = RequestFactory()
+
+        self.assertEqual(middleware(factory.get('/')).content, b'On replica')
+
+        response = middleware(factory.post('/'))
+        self.assertIn('db_primary', response.cookies)
+
+        request = factory.get('/')
+        request.COOKIES['db_primary'] = '1'
+        self.assertEqual(middleware(request).content, b'On primary')
+
+    def test_replica_results_are_not_cached(self):
+        cache = caches['reports']
+        cache.delete('replica-test')
+        self.addCleanup(cache.delete, 'replica-test')
+
+        with read_from_replica():
+            self.assertEqual(get_or_compute('reports', 'replica-test', medicine_names), ['On replica'])
+        self.assertIsNone(cache.get('replica-test'))
+
+        self.assertEqual(get_or_compute('reports', 'replica-test', medicine_names), ['On primary'])
+        self.assertEqual(cache.get('replica-test'), ['On primary'])
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import ArchivedRecord
+
+@admin.register(ArchivedRecord)
+class ArchivedRecordAdmin(admin.ModelAdmin):
+    list_display = ('model_label', 'object_pk', 'record_date', 'archived_at')
+    list_filter = ('model_label',)
+    search_fields = ('object_pk',)
+    exclude = ('payload',)
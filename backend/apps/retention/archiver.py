@@ -0,0 +1,290 @@
+import gzip
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from .models import ArchivedRecord
+from .signals import records_archived, records_restored
+
+logger = logging.getLogger(__name__)
+
+
+class RestoreError(Exception):
+    """Raised when an archive file can't be restored past a given line"""
+    restored = 0
+
+# Default retention policies, overridable with the RETENTION_POLICIES setting.
+# Each policy archives rows whose `date_field` is older than `days`; `related`
+# names reverse relations whose rows are archived (and restored) with each row,
+# since deleting the row would cascade to them.
+DEFAULT_RETENTION_POLICIES = {
+    'communication.Message': {'days': 365, 'date_field': 'timestamp'},
+    'chatbot.ChatSession': {'days': 180, 'date_field': 'updated_at', 'related': ['messages']},
+}
+
+
+def get_retention_policies():
+    """Return the configured retention policies keyed by model label"""
+    return getattr(settings, 'RETENTION_POLICIES', DEFAULT_RETENTION_POLICIES)
+
+
+def get_archive_backend():
+    """Return where archived rows go: "table" (ArchivedRecord) or "jsonl" (gzipped files)"""
+    return getattr(settings, 'RETENTION_ARCHIVE_BACKEND', 'table')
+
+
+def get_archive_dir():
+    return Path(getattr(settings, 'RETENTION_ARCHIVE_DIR', Path(settings.BASE_DIR) / 'archive'))
+
+
+def _serialize(obj, related):
+    """Serialize a row and the given reverse relations, parent first"""
+    objects = [obj]
+    for name in related:
+        objects.extend(getattr(obj, name).all())
+    return serializers.serialize('python', objects)
+
+
+def _jsonl_path(model_label, run_stamp, batch_number):
+    return get_archive_dir() / f"{model_label.replace('.', '_')}_{run_stamp}_{batch_number:05d}.jsonl.gz"
+
+
+def _write_jsonl(path, lines):
+    """
+    Write a gzipped JSONL archive file that is either complete or absent
+
+    The file is written under a temporary name, synced to disk once the gzip
+    stream is closed, and only then renamed into place.
+    """
+    temp_path = path.with_name(path.name + '.part')
+    with open(temp_path, 'wb') as raw_file:
+        with gzip.GzipFile(fileobj=raw_file, mode='wb') as gzip_file:
+            for line in lines:
+                gzip_file.write(line.encode('utf-8'))
+        raw_file.flush()
+        os.fsync(raw_file.fileno())
+    os.replace(temp_path, path)
+    if hasattr(os, 'O_DIRECTORY'):
+        # Make the rename itself durable
+        directory = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+def archive_model(model_label, policy, batch_size=500, dry_run=False, now=None):
+    """
+    Archive the rows of one model that are older than its retention policy
+
+    Works in batches: each batch is serialized, written to the archive and deleted
+    from the working table in one transaction, so rows are never lost. With the
+    JSONL backend each batch goes to its own file, which is complete on disk
+    before the batch's rows are deleted; a crash between the two can only
+    duplicate rows in the archive, and restoring duplicates is harmless.
+
+    Args:
+        model_label: "app_label.ModelName"
+        policy: Dict with 'days', 'date_field' and optional 'related'
+        batch_size: Rows per batch
+        dry_run: Only count the rows that would be archived
+
+    Returns:
+        Number of rows (not counting related rows) archived
+    """
+    model = apps.get_model(model_label)
+    date_field = policy['date_field']
+    related = policy.get('related', [])
+    cutoff = (now or timezone.now()) - timedelta(days=policy['days'])
+    expired = model.objects.filter(**{f"{date_field}__lt": cutoff}).order_by('pk')
+
+    if dry_run:
+        return expired.count()
+
+    use_jsonl = get_archive_backend() == 'jsonl'
+    if use_jsonl:
+        get_archive_dir().mkdir(parents=True, exist_ok=True)
+        run_stamp = timezone.now().strftime('%Y%m%d%H%M%S%f')
+
+    archived = 0
+    batch_number = 0
+    while True:
+        with transaction.atomic():
+            batch = list(expired.prefetch_related(*related)[:batch_size])
+            if not batch:
+                break
+
+            records = [
+                (obj, getattr(obj, date_field), _serialize(obj, related))
+                for obj in batch
+            ]
+            if use_jsonl:
+                batch_number += 1
+                _write_jsonl(_jsonl_path(model_label, run_stamp, batch_number), (
+                    json.dumps({
+                        'model': model_label,
+                        'pk': str(obj.pk),
+                        'record_date': record_date,
+                        'objects': objects,
+                    }, cls=DjangoJSONEncoder) + '\n'
+                    for obj, record_date, objects in records
+                ))
+            else:
+                ArchivedRecord.objects.bulk_create([
+                    ArchivedRecord(
+                        model_label=model_label,
+                        object_pk=str(obj.pk),
+                        record_date=record_date,
+                        payload=ArchivedRecord.compress(objects),
+                    )
+                    for obj, record_date, objects in records
+                ])
+
+            model.objects.filter(pk__in=[obj.pk for obj in batch]).delete()
+            records_archived.send(sender=model, objects=batch)
+            archived += len(batch)
+            logger.info(f"Archived {archived} {model_label} rows older than {cutoff:%Y-%m-%d}")
+
+    return archived
+
+
+def run_retention(model_labels=None, batch_size=500, dry_run=False):
+    """
+    Apply the retention policies
+
+    Args:
+        model_labels: Restrict to these models (default: every configured policy)
+
+    Returns:
+        Dict of model label to number of rows archived (or to archive, on a dry run)
+    """
+    policies = get_retention_policies()
+    results = {}
+    for model_label, policy in policies.items():
+        if model_labels and model_label not in model_labels:
+            continue
+        results[model_label] = archive_model(model_label, policy, batch_size=batch_size, dry_run=dry_run)
+    return results
+
+
+def _restore_objects(objects, restored_by_model):
+    """Save serialized objects (parent first) back with their original keys"""
+    for deserialized in serializers.deserialize('python', objects):
+        deserialized.save()
+        restored_by_model[type(deserialized.object)].append(deserialized.object)
+
+
+def _send_restored(restored_by_model):
+    for model, objects in restored_by_model.items():
+        records_restored.send(sender=model, objects=objects)
+
+
+def restore_from_table(model_label, since=None, until=None, batch_size=500):
+    """
+    Restore archived rows of a model from the ArchivedRecord table, removing them from the archive
+
+    Args:
+        since / until: Optional bounds on the rows' archived date field
+
+    Returns:
+        Number of rows restored
+    """
+    records = ArchivedRecord.objects.filter(model_label=model_label).order_by('pk')
+    if since:
+        records = records.filter(record_date__gte=since)
+    if until:
+        records = records.filter(record_date__lt=until)
+
+    restored = 0
+    while True:
+        with transaction.atomic():
+            batch = list(records[:batch_size])
+            if not batch:
+                break
+            restored_by_model = defaultdict(list)
+            for record in batch:
+                _restore_objects(record.get_objects(), restored_by_model)
+            ArchivedRecord.objects.filter(pk__in=[record.pk for record in batch]).delete()
+            _send_restored(restored_by_model)
+            restored += len(batch)
+    return restored
+
+
+def _read_jsonl(path):
+    """Yield (line number, record) for each record of a gzipped JSONL archive file"""
+    line_number = 0
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as archive_file:
+            for line_number, line in enumerate(archive_file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise RestoreError(f"{path}: line {line_number} can't be read: {e}") from e
+                yield line_number, record
+    except (OSError, EOFError, UnicodeDecodeError) as e:
+        # A truncated gzip stream fails while reading the line after the last complete one
+        raise RestoreError(f"{path}: line {line_number + 1} can't be read: {e}") from e
+
+
+def _restore_batch(path, batch):
+    """Restore (line number, record) pairs in one transaction"""
+    restored_by_model = defaultdict(list)
+    with transaction.atomic():
+        for line_number, record in batch:
+            try:
+                _restore_objects(record['objects'], restored_by_model)
+            except Exception as e:
+                raise RestoreError(f"{path}: line {line_number} can't be restored: {e}") from e
+        _send_restored(restored_by_model)
+    return len(batch)
+
+
+def restore_from_file(path, model_label=None, batch_size=500):
+    """
+    Restore rows from a gzipped JSONL archive file (the file is left in place)
+
+    Each batch of lines is committed on its own. If a line can't be read or
+    restored, the rows before it (or before its batch) stay restored and the
+    RestoreError names the line, with the number of rows restored in its
+    `restored` attribute; restoring the file again is safe, since rows keep
+    their original keys.
+
+    Returns:
+        Number of rows restored
+    """
+    restored = 0
+    batch = []
+    records = _read_jsonl(path)
+    try:
+        while True:
+            try:
+                line_number, record = next(records)
+            except StopIteration:
+                break
+            except RestoreError:
+                # Keep the rows read before the unreadable line
+                if batch:
+                    restored += _restore_batch(path, batch)
+                raise
+            if model_label and record['model'] != model_label:
+                continue
+            batch.append((line_number, record))
+            if len(batch) >= batch_size:
+                restored += _restore_batch(path, batch)
+                batch = []
+        if batch:
+            restored += _restore_batch(path, batch)
+    except RestoreError as e:
+        e.restored = restored
+        raise
+    return restored
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.retention.archiver import get_retention_policies, get_archive_backend, run_retention
+
+
+class Command(BaseCommand):
+    help = "Move rows older than their retention policy (RETENTION_POLICIES) out of the working tables into the archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='models', help="Model label to archive, e.g. communication.Message (repeatable)")
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows archived per transaction")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many rows would be archived")
+
+    def handle(self, *args, **options):
+        models = options['models']
+        policies = get_retention_policies()
+        unknown = [label for label in models or [] if label not in policies]
+        if unknown:
+            raise CommandError(f"No retention policy for: {', '.join(unknown)}")
+
+        results = run_retention(model_labels=models, batch_size=options['batch_size'], dry_run=options['dry_run'])
+
+        verb = "Would archive" if options['dry_run'] else f"Archived ({get_archive_backend()})"
+        for model_label, count in results.items():
+            policy = policies[model_label]
+            self.stdout.write(f"{verb} {count} {model_label} rows older than {policy['days']} days")
+        self.stdout.write(self.style.SUCCESS("Retention run complete"))
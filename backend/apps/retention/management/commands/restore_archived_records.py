@@ -0,0 +1,44 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.retention.archiver import RestoreError, restore_from_table, restore_from_file
+
+
+class Command(BaseCommand):
+    help = "Restore archived rows into their working tables, from the archive table or a JSONL archive file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', help="Model label to restore, e.g. communication.Message")
+        parser.add_argument(
+            '--file', action='append', dest='files',
+            help="Gzipped JSONL archive file to restore from, instead of the archive table (repeatable)",
+        )
+        parser.add_argument('--since', help="Only restore rows dated on or after this date (YYYY-MM-DD)")
+        parser.add_argument('--until', help="Only restore rows dated before this date (YYYY-MM-DD)")
+
+    def _parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return timezone.make_aware(datetime.strptime(value, '%Y-%m-%d'))
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        if options['files']:
+            restored = 0
+            for path in options['files']:
+                try:
+                    restored += restore_from_file(path, model_label=options['model'])
+                except RestoreError as e:
+                    raise CommandError(f"{e} (restored {restored + e.restored} rows before it)")
+        elif options['model']:
+            restored = restore_from_table(
+                options['model'],
+                since=self._parse_date(options['since']),
+                until=self._parse_date(options['until']),
+            )
+        else:
+            raise CommandError("Pass --model to restore from the archive table, or --file")
+
+        self.stdout.write(self.style.SUCCESS(f"Restored {restored} rows"))
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-19 02:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_pk', models.CharField(max_length=64)),
+                ('record_date', models.DateTimeField(help_text="Value of the policy's date field when archived")),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.BinaryField()),
+            ],
+            options={
+                'ordering': ['model_label', 'record_date'],
+                'indexes': [models.Index(fields=['model_label', 'record_date'], name='retention_a_model_l_ac443d_idx')],
+            },
+        ),
+    ]
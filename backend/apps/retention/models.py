@@ -0,0 +1,35 @@
+import json
+import zlib
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class ArchivedRecord(models.Model):
+    """
+    A row (with the related rows archived along with it) moved out of a working
+    table by the retention job. The serialized objects are stored as
+    zlib-compressed JSON so they can be restored with their original keys.
+    """
+    model_label = models.CharField(max_length=100)
+    object_pk = models.CharField(max_length=64)
+    record_date = models.DateTimeField(help_text="Value of the policy's date field when archived")
+    archived_at = models.DateTimeField(auto_now_add=True)
+    payload = models.BinaryField()
+
+    class Meta:
+        ordering = ['model_label', 'record_date']
+        indexes = [
+            models.Index(fields=['model_label', 'record_date']),
+        ]
+
+    def __str__(self):
+        return f"Archived {self.model_label} {self.object_pk}"
+
+    @staticmethod
+    def compress(objects):
+        """Compress a list of serialized objects"""
+        return zlib.compress(json.dumps(objects, cls=DjangoJSONEncoder).encode('utf-8'))
+
+    def get_objects(self):
+        """Return the archived objects, parent first, in Django's "python" serialization format"""
+        return json.loads(zlib.decompress(bytes(self.payload)).decode('utf-8'))
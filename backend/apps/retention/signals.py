@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+# Sent with sender=<model class> and objects=<list of instances> after each batch
+# of rows is moved to the archive (the instances are no longer in the database)
+# or restored from it, within the batch's transaction. Receivers update data
+# derived from the rows, which the bulk delete and raw restore saves bypass.
+records_archived = Signal()
+records_restored = Signal()
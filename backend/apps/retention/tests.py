@@ -0,0 +1,137 @@
+import gzip
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.accounts.models import CustomUser, UserRoles
+from apps.communication.models import Conversation, Message
+from .archiver import RestoreError, archive_model, restore_from_file, restore_from_table
+from .models import ArchivedRecord
+
+MESSAGE_POLICY = {'days': 365, 'date_field': 'timestamp'}
+
+
+class MessageRetentionTests(TestCase):
+    """Archive and restore round trips of messages and their conversations"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = CustomUser.objects.create_user('patient@example.com', role=UserRoles.PATIENT, is_verified=True)
+        cls.doctor = CustomUser.objects.create_user('doctor@example.com', role=UserRoles.DOCTOR, is_verified=True)
+
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+
+    def send(self, content, days_ago, sender=None):
+        sender = sender or self.patient
+        recipient = self.doctor if sender == self.patient else self.patient
+        message = Message.objects.create(sender=sender, recipient=recipient, content=content)
+        Message.objects.filter(pk=message.pk).update(timestamp=timezone.now() - timedelta(days=days_ago))
+        message.refresh_from_db()
+        Conversation.record_message(message)
+        return message
+
+    def conversation(self):
+        return Conversation.objects.select_related('last_message').get()
+
+    def jsonl_settings(self):
+        return override_settings(RETENTION_ARCHIVE_BACKEND='jsonl', RETENTION_ARCHIVE_DIR=self.archive_dir)
+
+    def archive_files(self):
+        return sorted(Path(self.archive_dir).iterdir())
+
+    def test_archive_keeps_conversation_on_latest_remaining_message(self):
+        for index in range(3):
+            self.send(f"Old {index}", days_ago=400)
+        recent = self.send("Recent", days_ago=1)
+        self.assertEqual(self.conversation().unread_count_for(self.doctor), 4)
+
+        self.assertEqual(archive_model('communication.Message', MESSAGE_POLICY), 3)
+
+        self.assertEqual(list(Message.objects.values_list('content', flat=True)), ["Recent"])
+        conversation = self.conversation()
+        self.assertEqual(conversation.last_message, recent)
+        self.assertEqual(conversation.last_message_at, recent.timestamp)
+        self.assertEqual(conversation.unread_count_for(self.doctor), 1)
+
+    def test_table_round_trip(self):
+        self.send("Question", days_ago=400)
+        answer = self.send("Answer", days_ago=399, sender=self.doctor)
+
+        self.assertEqual(archive_model('communication.Message', MESSAGE_POLICY, batch_size=1), 2)
+        self.assertFalse(Message.objects.exists())
+        self.assertEqual(ArchivedRecord.objects.count(), 2)
+        conversation = self.conversation()
+        self.assertIsNone(conversation.last_message)
+        self.assertIsNone(conversation.last_message_at)
+        self.assertEqual(conversation.unread_count_for(self.patient), 0)
+
+        self.assertEqual(restore_from_table('communication.Message'), 2)
+        self.assertFalse(ArchivedRecord.objects.exists())
+        self.assertEqual(Message.objects.count(), 2)
+        conversation = self.conversation()
+        self.assertEqual(conversation.last_message, answer)
+        # The archive stores timestamps to the millisecond
+        self.assertEqual(conversation.last_message_at, conversation.last_message.timestamp)
+
+    def test_jsonl_round_trip(self):
+        messages = [self.send(f"Old {index}", days_ago=400) for index in range(3)]
+
+        with self.jsonl_settings():
+            self.assertEqual(archive_model('communication.Message', MESSAGE_POLICY, batch_size=2), 3)
+        files = self.archive_files()
+        self.assertEqual(len(files), 2)
+        self.assertTrue(all(path.name.endswith('.jsonl.gz') for path in files))
+        self.assertFalse(Message.objects.exists())
+
+        # Restoring recreates a conversation that is gone
+        Conversation.objects.all().delete()
+        self.assertEqual(sum(restore_from_file(path) for path in files), 3)
+        self.assertEqual(list(Message.objects.order_by('pk')), messages)
+        conversation = self.conversation()
+        self.assertEqual(conversation.last_message, messages[-1])
+        self.assertEqual(conversation.unread_count_for(self.doctor), 0)
+
+    def test_rows_are_kept_when_the_archive_file_fails(self):
+        self.send("Old", days_ago=400)
+
+        with self.jsonl_settings(), mock.patch('apps.retention.archiver.os.replace', side_effect=OSError("Disk full")):
+            with self.assertRaises(OSError):
+                archive_model('communication.Message', MESSAGE_POLICY)
+
+        self.assertEqual(Message.objects.count(), 1)
+        self.assertIsNotNone(self.conversation().last_message)
+        self.assertFalse(any(path.name.endswith('.jsonl.gz') for path in self.archive_files()))
+
+    def test_restore_reports_the_failing_line_and_keeps_earlier_batches(self):
+        for index in range(3):
+            self.send(f"Old {index}", days_ago=400)
+        with self.jsonl_settings():
+            archive_model('communication.Message', MESSAGE_POLICY)
+        path = self.archive_files()[0]
+
+        with gzip.open(path, 'rt', encoding='utf-8') as archive_file:
+            lines = archive_file.readlines()
+        lines[1] = lines[1][:20] + '\n'
+        with gzip.open(path, 'wt', encoding='utf-8') as archive_file:
+            archive_file.writelines(lines)
+
+        with self.assertRaisesRegex(RestoreError, 'line 2') as raised:
+            restore_from_file(path, batch_size=1)
+        self.assertEqual(raised.exception.restored, 1)
+        self.assertEqual(list(Message.objects.values_list('content', flat=True)), ["Old 0"])
+        self.assertEqual(self.conversation().last_message.content, "Old 0")
+
+    def test_truncated_file_raises_restore_error(self):
+        self.send("Old", days_ago=400)
+        with self.jsonl_settings():
+            archive_model('communication.Message', MESSAGE_POLICY)
+        path = self.archive_files()[0]
+        path.write_bytes(path.read_bytes()[:-12])
+
+        with self.assertRaisesRegex(RestoreError, "can't be read"):
+            restore_from_file(path)
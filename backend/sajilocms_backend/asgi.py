@@ -2,6 +2,7 @@
 ASGI config for sajilocms_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests go to Django; WebSocket connections are routed by Channels.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -13,4 +14,17 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sajilocms_backend.settings')
 
-application = get_asgi_application()
+# Initialize Django before importing code that uses models
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.security.websocket import AllowedHostsOriginValidator
+from apps.accounts.authentication import CookieJWTWebSocketMiddleware
+from apps.communication.routing import websocket_urlpatterns
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': AllowedHostsOriginValidator(
+        CookieJWTWebSocketMiddleware(URLRouter(websocket_urlpatterns))
+    ),
+})
@@ -0,0 +1,113 @@
+"""
+Response compression middleware (brotli when the package is installed, else gzip)
+"""
+import secrets
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+re_accepts_gzip = _lazy_re_compile(r"\bgzip\b")
+re_accepts_br = _lazy_re_compile(r"\bbr\b")
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def brotli_compress_string(s, quality, max_random_bytes):
+    """
+    Brotli counterpart of django.utils.text.compress_string's BREACH padding
+
+    Brotli has no header field to hide random bytes in, so they go into a
+    metadata block, which decoders skip. The stream is flushed first so the
+    block starts on a meta-block and byte boundary.
+
+    Args:
+        s: Bytes to compress
+        quality: Brotli quality (0-11)
+        max_random_bytes: Upper bound of the random padding (at most 256)
+
+    Returns:
+        The compressed bytes
+    """
+    compressor = brotli.Compressor(quality=quality)
+    compressed = compressor.process(s) + compressor.flush()
+    padding_length = secrets.randbelow(max_random_bytes) + 1
+    # ISLAST=0, MNIBBLES=0 (metadata), one MSKIPLEN byte holding the length - 1
+    skip_length = padding_length - 1
+    header = bytes((0x16 | (skip_length & 0x03) << 6, skip_length >> 2))
+    return compressed + header + secrets.token_bytes(padding_length) + compressor.finish()
+
+
+def is_compressible(content_type):
+    """Whether a content type is text-like (images, PDFs and archives are already compressed)"""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_CONTENT_TYPES
+        or media_type.endswith("+json")
+    )
+
+
+class CompressionMiddleware:
+    """
+    Compress text responses of at least COMPRESSION_MIN_SIZE bytes with brotli or
+    gzip, whichever the client accepts (brotli preferred)
+
+    Streaming responses (file downloads) are left alone. As with Django's
+    GZipMiddleware, the output of either encoding is padded with random bytes
+    against BREACH, and strong ETags become weak since the compressed body differs byte-for-byte
+    (If-None-Match still matches them, see apps.caching.conditional).
+    """
+
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+        self.brotli_quality = getattr(settings, "COMPRESSION_BROTLI_QUALITY", 5)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if not is_compressible(response.get("Content-Type", "")):
+            return response
+
+        # The representation depends on Accept-Encoding whether or not this one is compressed
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if len(response.content) < self.min_size:
+            return response
+
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if brotli is not None and re_accepts_br.search(accept_encoding):
+            encoding = "br"
+            compressed_content = brotli_compress_string(
+                response.content, quality=self.brotli_quality, max_random_bytes=self.max_random_bytes
+            )
+        elif re_accepts_gzip.search(accept_encoding):
+            encoding = "gzip"
+            compressed_content = compress_string(response.content, max_random_bytes=self.max_random_bytes)
+        else:
+            return response
+
+        if len(compressed_content) >= len(response.content):
+            return response
+
+        response.content = compressed_content
+        response.headers["Content-Length"] = str(len(compressed_content))
+        response.headers["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        return response
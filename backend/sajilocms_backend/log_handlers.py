@@ -0,0 +1,126 @@
+"""
+Non-blocking logging handlers and formatters used by settings.LOGGING
+
+Request threads only put records on an in-memory queue; a QueueListener thread
+in each process does the formatting and disk writes.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueListener, WatchedFileHandler
+
+# Attributes every LogRecord has; anything else was passed with `extra=`
+RESERVED_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including any `extra` fields"""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        for key, value in vars(record).items():
+            if key not in RESERVED_RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class QueuedFileHandler(logging.Handler):
+    """
+    File handler whose writes happen on a background thread
+
+    Records are put on an unbounded queue and written by a QueueListener to a
+    WatchedFileHandler. This is a plain Handler rather than a QueueHandler
+    subclass: from Python 3.12, dictConfig configures QueueHandler subclasses
+    itself and rejects one without a `handlers` list. The configured formatter is applied by the listener,
+    so request threads never format or touch the disk; they only resolve the
+    message (so mutable arguments are captured as they were when logged).
+
+    Every worker process appends to the same file, so rotation is left to an
+    external tool such as logrotate: WatchedFileHandler reopens the file once
+    it has been moved. The queue and listener thread are created on the first
+    record logged in each process, since threads don't survive a fork (e.g.
+    gunicorn --preload). The listener is stopped, flushing pending records,
+    at interpreter exit.
+
+    Args:
+        filename: Log file path
+        encoding: File encoding
+    """
+
+    def __init__(self, filename, encoding="utf-8"):
+        super().__init__()
+        self.queue = None
+        self.filename = filename
+        self.encoding = encoding
+        self.target_formatter = None
+        self.target = None
+        self.listener = None
+        self._pid = None
+        atexit.register(self.stop)
+
+    def setFormatter(self, fmt):
+        # The listener's handler formats; the queue handler itself passes records through
+        self.target_formatter = fmt
+        if self.target is not None:
+            self.target.setFormatter(fmt)
+
+    def _start_listener(self):
+        """Create this process's queue, file handler and listener thread"""
+        self.queue = queue.SimpleQueue()
+        self.target = WatchedFileHandler(self.filename, encoding=self.encoding, delay=True)
+        self.target.setFormatter(self.target_formatter)
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+        self._pid = os.getpid()
+
+    def enqueue(self, record):
+        # Called from emit(), which holds the handler lock
+        if self._pid != os.getpid():
+            self._start_listener()
+        self.queue.put_nowait(record)
+
+    def emit(self, record):
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks reference frames that may change once the caller moves on
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def stop(self):
+        """Flush queued records and stop this process's listener thread"""
+        if self.listener is None or self._pid != os.getpid():
+            return
+        self.listener.stop()
+        self.target.close()
+        self.listener = None
+        self._pid = None
+
+    def close(self):
+        self.stop()
+        super().close()
@@ -0,0 +1,16 @@
+"""
+orjson-backed JSON parser for DRF
+"""
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class ORJSONParser(JSONParser):
+    """Drop-in replacement for DRF's JSONParser using orjson (UTF-8 bodies, as JSON requires)"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,46 @@
+"""
+orjson-backed JSON renderer for DRF
+
+Output matches rest_framework.renderers.JSONRenderer: anything orjson doesn't
+encode natively the way DRF does (datetimes, Decimals, lazy strings, querysets,
+generators, ...) goes through DRF's own JSONEncoder. Serializer output is
+already made of strings, numbers, lists and dicts, so in practice only the
+structure walk and string escaping move to orjson, which is where the time goes.
+"""
+from decimal import Decimal
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_drf_encoder = JSONEncoder()
+
+# Datetimes are passed through so they get DRF's format (millisecond precision, "Z" for UTC)
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def orjson_default(obj):
+    """Encode what orjson can't (or, for datetimes, shouldn't) the way DRF does"""
+    if isinstance(obj, Decimal):
+        # DRF's encoder (COERCE_DECIMAL_TO_STRING only applies to serializer fields)
+        return float(obj)
+    return _drf_encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Drop-in replacement for DRF's JSONRenderer using orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = ORJSON_OPTIONS
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            # orjson only supports two-space indentation
+            options |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=orjson_default, option=options)
+        # Like DRF, escape the line separators that are valid JSON but not valid JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
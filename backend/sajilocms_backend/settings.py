@@ -30,10 +30,109 @@ ALLOWED_HOSTS = env.list("ALLOWED_HOSTS", default=["127.0.0.1", "localhost"])
 # Google AI Studio Gemini API settings
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
 MOCK_CHATBOT = False # Set to True for mock responses during development
+# LLM backend used by the chatbot: "gemini", "fake" (local, for development and
+# load testing) or a dotted path to an apps.chatbot.llm_backends.BaseLLMBackend subclass
+CHATBOT_LLM_BACKEND = env("CHATBOT_LLM_BACKEND", default="gemini")
+CHATBOT_LLM_BACKEND_OPTIONS = {}  # e.g. {"latency_ms": 200, "error_rate": 0.01} for the fake backend
+
+# Shared cache for answers to general (non-personalized) chatbot questions (the
+# "chatbot" cache alias; the entry limit applies to the locmem and file backends)
+CHATBOT_RESPONSE_CACHE_MAX_ENTRIES = env.int("CHATBOT_RESPONSE_CACHE_MAX_ENTRIES", default=512)
+CHATBOT_RESPONSE_CACHE_TTL = env.int("CHATBOT_RESPONSE_CACHE_TTL", default=3600)  # seconds
+# Upper bound on how stale the per-process chatbot doctor directory can get
+CHATBOT_DOCTOR_DIRECTORY_TTL = env.int("CHATBOT_DOCTOR_DIRECTORY_TTL", default=300)  # seconds
+# Number of most recent messages loaded as conversation history per chatbot message
+CHATBOT_HISTORY_LIMIT = env.int("CHATBOT_HISTORY_LIMIT", default=20)
+
+# How long "has a completed appointment" checks for messaging and calls are cached
+# (in the "auth" cache). Appointment changes invalidate the cached answer only in
+# the cache they run against, so in production "auth" must be a shared backend
+# (CACHE_BACKEND or CACHE_AUTH_BACKEND "redis", or "file" on a single host);
+# with "locmem" other workers keep their answer for up to these TTLs.
+CARE_RELATIONSHIP_CACHE_TTL = env.int("CARE_RELATIONSHIP_CACHE_TTL", default=3600)  # seconds
+CARE_RELATIONSHIP_NEGATIVE_CACHE_TTL = env.int("CARE_RELATIONSHIP_NEGATIVE_CACHE_TTL", default=300)  # seconds
+# Per-user cache of chat partner ids and last visits (profiles are loaded per request)
+CHAT_PARTNERS_CACHE_TTL = env.int("CHAT_PARTNERS_CACHE_TTL", default=300)  # seconds
+
+# Retention: rows older than these policies are moved out of the working tables by
+# the archive_old_records command (see apps.retention.archiver), either into the
+# compressed ArchivedRecord table ("table") or into gzipped JSONL files ("jsonl",
+# one file per batch in RETENTION_ARCHIVE_DIR)
+RETENTION_POLICIES = {
+    "communication.Message": {"days": env.int("MESSAGE_RETENTION_DAYS", default=365), "date_field": "timestamp"},
+    "chatbot.ChatSession": {
+        "days": env.int("CHAT_SESSION_RETENTION_DAYS", default=180),
+        "date_field": "updated_at",
+        "related": ["messages"],
+    },
+}
+RETENTION_ARCHIVE_BACKEND = env("RETENTION_ARCHIVE_BACKEND", default="table")
+RETENTION_ARCHIVE_DIR = env("RETENTION_ARCHIVE_DIR", default=str(BASE_DIR / "archive"))
+
+# Request instrumentation (apps.monitoring): Server-Timing headers, per-route metrics,
+# and a warning with query fingerprints for requests over either threshold. The
+# Server-Timing header shows every client query counts and timings, so it is only
+# sent with DEBUG on unless SERVER_TIMING_HEADER enables it.
+REQUEST_INSTRUMENTATION_ENABLED = env.bool("REQUEST_INSTRUMENTATION_ENABLED", default=True)
+SERVER_TIMING_HEADER = env.bool("SERVER_TIMING_HEADER", default=DEBUG)
+SLOW_REQUEST_THRESHOLD_MS = env.int("SLOW_REQUEST_THRESHOLD_MS", default=500)
+SLOW_REQUEST_QUERY_THRESHOLD = env.int("SLOW_REQUEST_QUERY_THRESHOLD", default=50)
+
+# Prometheus metrics (apps.monitoring.metrics), scraped from /monitoring/metrics/.
+# With several worker processes (gunicorn), set PROMETHEUS_MULTIPROC_DIR to a
+# directory emptied at startup; workers share their values through files there.
+PROMETHEUS_MULTIPROC_DIR = env("PROMETHEUS_MULTIPROC_DIR", default="")
+if PROMETHEUS_MULTIPROC_DIR:
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", PROMETHEUS_MULTIPROC_DIR)
+METRICS_AUTH_TOKEN = env("METRICS_AUTH_TOKEN", default="")  # Bearer token required to scrape (no token: DEBUG only)
+
+# Caches: one alias per domain, each with its own key prefix, default timeout and
+# metrics label (lookups are counted in the metrics as hits/misses per cache).
+# CACHE_BACKEND picks the storage for all aliases: "locmem" (per process, for
+# development), "file" (shared by the workers of one host) or "redis" (shared by
+# all hosts); CACHE_<ALIAS>_BACKEND overrides it for one alias. Bump CACHE_VERSION
+# to drop every cached entry after an incompatible change.
+CACHE_BACKEND = env("CACHE_BACKEND", default="locmem")
+CACHE_REDIS_URL = env("CACHE_REDIS_URL", default="redis://127.0.0.1:6379/1")
+CACHE_FILE_DIR = env("CACHE_FILE_DIR", default=str(BASE_DIR / "cache"))
+CACHE_VERSION = env.int("CACHE_VERSION", default=1)
+CACHE_ALIASES = {
+    # alias: default timeout (seconds)
+    "default": 300,
+    "auth": 3600,         # care relationship checks, Agora tokens
+    "directory": 900,     # doctor directory, specialties, chat partners
+    "availability": 120,  # bookable appointment slots
+    "reports": 600,       # pharmacy reports
+    "chatbot": CHATBOT_RESPONSE_CACHE_TTL,  # answers to general questions
+}
+CACHE_BACKENDS = {
+    "locmem": "apps.monitoring.cache.InstrumentedLocMemCache",
+    "file": "apps.monitoring.cache.InstrumentedFileBasedCache",
+    "redis": "apps.monitoring.cache.InstrumentedRedisCache",
+}
+CACHES = {}
+for _alias, _timeout in CACHE_ALIASES.items():
+    _backend = env(f"CACHE_{_alias.upper()}_BACKEND", default=CACHE_BACKEND)
+    CACHES[_alias] = {
+        "BACKEND": CACHE_BACKENDS[_backend],
+        "LOCATION": {
+            "locmem": _alias,
+            "file": os.path.join(CACHE_FILE_DIR, _alias),
+            "redis": CACHE_REDIS_URL,
+        }[_backend],
+        "KEY_PREFIX": _alias,
+        "TIMEOUT": _timeout,
+        "VERSION": CACHE_VERSION,
+        "METRICS_NAME": _alias,
+    }
+if CACHES["chatbot"]["BACKEND"] != CACHE_BACKENDS["redis"]:
+    CACHES["chatbot"]["OPTIONS"] = {"MAX_ENTRIES": CHATBOT_RESPONSE_CACHE_MAX_ENTRIES}
 
 # Application definition
 
 INSTALLED_APPS = [
+    'daphne',  # ASGI runserver (HTTP + WebSocket); must come before staticfiles
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -49,6 +148,7 @@ INSTALLED_APPS = [
     'social_django',
     'corsheaders',
     'django_filters',
+    'channels',
 
     # Local Apps
     "apps.accounts",
@@ -57,6 +157,11 @@ INSTALLED_APPS = [
     "apps.communication",
     "apps.chatbot",
     "apps.pharmacy",
+    "apps.retention",
+    "apps.monitoring",
+    "apps.benchmarks",
+    "apps.caching",
+    "apps.replicas",
   
 
 ]
@@ -68,6 +173,9 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 MIDDLEWARE = [
+    'apps.monitoring.middleware.RequestInstrumentationMiddleware', # Query count / latency instrumentation
+    'sajilocms_backend.compression.CompressionMiddleware', # brotli / gzip for JSON and text responses
+    'apps.replicas.middleware.ReplicaStickinessMiddleware', # Read-your-writes for replica reads
     'corsheaders.middleware.CorsMiddleware', # CORS Middleware
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -78,6 +186,12 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Response compression: bodies smaller than COMPRESSION_MIN_SIZE bytes aren't worth
+# it. Brotli (used when the brotli package is installed and the client accepts it)
+# quality 0-11; 4-6 compresses JSON better than gzip at similar CPU cost.
+COMPRESSION_MIN_SIZE = env.int("COMPRESSION_MIN_SIZE", default=1024)
+COMPRESSION_BROTLI_QUALITY = env.int("COMPRESSION_BROTLI_QUALITY", default=5)
+
 ROOT_URLCONF = 'sajilocms_backend.urls'
 
 TEMPLATES = [
@@ -97,6 +211,23 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'sajilocms_backend.wsgi.application'
+ASGI_APPLICATION = 'sajilocms_backend.asgi.application'
+
+# Channel layer for WebSocket push (apps.communication.events). Redis is required
+# in production so events reach connections served by other processes; without
+# REDIS_URL the in-memory layer is used, which only works within one process.
+REDIS_URL = env("REDIS_URL", default="")
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {"hosts": [REDIS_URL]},
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"},
+    }
 
 
 # Database
@@ -106,6 +237,58 @@ WSGI_APPLICATION = 'sajilocms_backend.wsgi.application'
 DATABASES = {
     "default": env.db(),
 }
+
+# Database connections (sizing for gunicorn/daphne workers: see docs/database-connections.md).
+# With DB_POOL_ENABLED (PostgreSQL only) every worker process keeps a psycopg pool of
+# DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE connections; this is the recommended setup under
+# ASGI (daphne, the default server since the WebSocket layer). Otherwise connections
+# are closed after every request, unless DB_CONN_MAX_AGE is set: each worker thread
+# then keeps its connection open that many seconds. Only set it for WSGI servers
+# (gunicorn); under ASGI persistent connections leak, as Django's docs warn.
+# Health checks make sure a persistent or pooled connection still works before a
+# request uses it.
+DB_CONN_MAX_AGE = env.int("DB_CONN_MAX_AGE", default=0)
+DB_CONN_HEALTH_CHECKS = env.bool("DB_CONN_HEALTH_CHECKS", default=True)
+DB_POOL_ENABLED = env.bool("DB_POOL_ENABLED", default=False)
+DB_POOL_MIN_SIZE = env.int("DB_POOL_MIN_SIZE", default=2)
+DB_POOL_MAX_SIZE = env.int("DB_POOL_MAX_SIZE", default=10)
+DB_POOL_TIMEOUT = env.int("DB_POOL_TIMEOUT", default=10)  # seconds to wait for a free connection
+DB_POOL_MAX_IDLE = env.int("DB_POOL_MAX_IDLE", default=300)  # seconds before idle extra connections close
+DB_POOL_MAX_LIFETIME = env.int("DB_POOL_MAX_LIFETIME", default=1800)  # seconds before a connection is replaced
+
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = DB_CONN_HEALTH_CHECKS
+if DB_POOL_ENABLED and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    # Pooled connections are returned to the pool after each request; Django
+    # rejects CONN_MAX_AGE together with a pool
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": DB_POOL_MIN_SIZE,
+        "max_size": DB_POOL_MAX_SIZE,
+        "timeout": DB_POOL_TIMEOUT,
+        "max_idle": DB_POOL_MAX_IDLE,
+        "max_lifetime": DB_POOL_MAX_LIFETIME,
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = DB_CONN_MAX_AGE
+
+# Read replica (apps.replicas): views using ReplicaReadMixin or @use_replica read
+# from DATABASE_REPLICA_URL when it is set. After a client's own write, its reads
+# stay on the primary for REPLICA_STICKY_SECONDS (keep this above the usual lag).
+# For local testing, point it at a copy of the primary (e.g. a second SQLite file).
+REPLICA_DATABASE_ALIAS = "replica"
+REPLICA_STICKY_SECONDS = env.int("REPLICA_STICKY_SECONDS", default=10)
+REPLICA_STICKY_COOKIE = "db_primary"
+DATABASE_ROUTERS = []
+if env("DATABASE_REPLICA_URL", default=""):
+    DATABASES[REPLICA_DATABASE_ALIAS] = env.db("DATABASE_REPLICA_URL")
+    DATABASES[REPLICA_DATABASE_ALIAS].update({
+        "CONN_MAX_AGE": DATABASES["default"]["CONN_MAX_AGE"],
+        "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+        "TEST": {"MIRROR": "default"},  # Tests read the data they just wrote
+    })
+    if "pool" in DATABASES["default"].get("OPTIONS", {}):
+        DATABASES[REPLICA_DATABASE_ALIAS].setdefault("OPTIONS", {})["pool"] = DATABASES["default"]["OPTIONS"]["pool"]
+    DATABASE_ROUTERS = ["apps.replicas.routing.ReplicaRouter"]
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -142,6 +325,17 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    # orjson encodes and decodes JSON several times faster than the json module
+    # (same output as DRF's JSONRenderer)
+    "DEFAULT_RENDERER_CLASSES": [
+        "sajilocms_backend.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "sajilocms_backend.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 # ✅ JWT Authentication Settings (Secure & Optimized)
@@ -208,37 +402,65 @@ LOGGING_DIR = os.path.join(BASE_DIR, "logs")
 if not os.path.exists(LOGGING_DIR):  # ✅ Prevents errors
     os.makedirs(LOGGING_DIR, exist_ok=True)
 
+# Logging goes through a queue to logs/app.log, written on a background thread
+# (see sajilocms_backend.log_handlers), so request threads never block on disk.
+# All worker processes append to the same file; rotate it with logrotate (the
+# handler reopens the file after it is moved, so copytruncate isn't needed).
+# LOG_FORMAT is "text" or "json"; LOG_LEVELS overrides levels per logger, e.g.
+# LOG_LEVELS=apps.chatbot=DEBUG,django.db.backends=DEBUG (SQL logging is off by default)
+LOG_FORMAT = env("LOG_FORMAT", default="text")
+LOG_LEVEL = env("LOG_LEVEL", default="INFO")
+LOG_LEVELS = env.dict("LOG_LEVELS", default={})
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
         "verbose": {
-            "format": "{levelname} {asctime} {module} {message}",
+            "format": "{levelname} {asctime} {name} {message}",
             "style": "{",
         },
+        "json": {
+            "()": "sajilocms_backend.log_handlers.JSONFormatter",
+        },
     },
     "handlers": {
         "file": {
             "level": "DEBUG",
-            "class": "logging.FileHandler",
-            "filename": os.path.join(LOGGING_DIR, "debug.log"),
-            "formatter": "verbose",
+            "class": "sajilocms_backend.log_handlers.QueuedFileHandler",
+            "filename": os.path.join(LOGGING_DIR, "app.log"),
+            "formatter": "json" if LOG_FORMAT == "json" else "verbose",
         },
     },
     "loggers": {
         "django": {
             "handlers": ["file"],
-            "level": "DEBUG",
+            "level": LOG_LEVEL,
             "propagate": True,
         },
+        "django.db.backends": {
+            "level": "WARNING",
+        },
+        "apps": {
+            "handlers": ["file"],
+            "level": LOG_LEVEL,
+            "propagate": False,
+        },
     },
 }
+for _logger_name, _level in LOG_LEVELS.items():
+    LOGGING["loggers"].setdefault(_logger_name, {})["level"] = _level.upper()
 
 # ✅ Custom User Model
 AUTH_USER_MODEL = "accounts.CustomUser"
 
 
 # Agora Setup
+# Generated tokens are cached per (user, channel, role) and reused until
+# AGORA_TOKEN_REFRESH_MARGIN seconds before they expire
+AGORA_RTM_TOKEN_LIFETIME = env.int("AGORA_RTM_TOKEN_LIFETIME", default=3600)  # seconds
+AGORA_RTC_TOKEN_LIFETIME = env.int("AGORA_RTC_TOKEN_LIFETIME", default=86400)  # seconds
+AGORA_TOKEN_REFRESH_MARGIN = env.int("AGORA_TOKEN_REFRESH_MARGIN", default=300)  # seconds
 AGORA_APP_ID = env("AGORA_APP_ID")
 <<<<<<< HEAD
 AGORA_APP_CERTIFICATE = env("AGORA_APP_CERTIFICATE")
@@ -0,0 +1,30 @@
+import copy
+import logging
+import logging.config
+import os
+import shutil
+import tempfile
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+class LoggingConfigTests(SimpleTestCase):
+    """settings.LOGGING must load with dictConfig on every supported Python version"""
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.log_dir, ignore_errors=True)
+        self.addCleanup(logging.config.dictConfig, settings.LOGGING)
+
+    def test_queued_file_handler_writes_records(self):
+        config = copy.deepcopy(settings.LOGGING)
+        path = os.path.join(self.log_dir, 'app.log')
+        config['handlers']['file']['filename'] = path
+        logging.config.dictConfig(config)
+
+        logging.getLogger('apps.logging_test').warning("Queued %s", 'record')
+        # Closing stops the listener thread once the queue is drained
+        next(handler for handler in logging.getLogger('apps').handlers if handler.get_name() == 'file').close()
+
+        with open(path, encoding='utf-8') as log_file:
+            self.assertIn("Queued record", log_file.read())
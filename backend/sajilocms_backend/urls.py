@@ -25,4 +25,5 @@ urlpatterns = [
     path('communication/', include('apps.communication.urls')),
     path('chatbot/', include('apps.chatbot.urls')),
     path('api/pharmacy/', include('apps.pharmacy.urls', namespace='pharmacy')),
+    path('monitoring/', include('apps.monitoring.urls')),
 ]
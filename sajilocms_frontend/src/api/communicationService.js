@@ -28,9 +28,13 @@ export const startVideoCall = (targetUserId) => {
   });
 };
 
-// Get chat history between the current user and a target user
-export const getMessages = (targetUserId) => {
-  return rootAxiosInstance.get(`${COMM_URL}get_messages/?target_user_id=${targetUserId}`);
+// Get chat history between the current user and a target user.
+// Pass { after: lastMessageId } to poll for new messages only, or
+// { before: firstMessageId, limit } to load older ones.
+export const getMessages = (targetUserId, cursor = {}) => {
+  return rootAxiosInstance.get(`${COMM_URL}get_messages/`, {
+    params: { target_user_id: targetUserId, ...cursor },
+  });
 };
 
 // Send a message to another user
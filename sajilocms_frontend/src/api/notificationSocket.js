@@ -0,0 +1,42 @@
+// src/api/notificationSocket.js
+// Server push over WebSocket: "message.created" and "appointment.status_changed"
+// events. Authenticates with the access_token cookie, like the REST API.
+
+const WS_URL = "ws://localhost:8000/ws/notifications/";
+const RECONNECT_DELAY_MS = 3000;
+
+// Connect and call onEvent(event, data) for every pushed event.
+// Returns a function that closes the connection.
+export const subscribeToNotifications = (onEvent) => {
+  let socket = null;
+  let reconnectTimer = null;
+  let closed = false;
+
+  const connect = () => {
+    socket = new WebSocket(WS_URL);
+
+    socket.onmessage = (message) => {
+      try {
+        const { event, data } = JSON.parse(message.data);
+        onEvent(event, data);
+      } catch (err) {
+        console.error("Invalid notification:", err);
+      }
+    };
+
+    socket.onclose = (closeEvent) => {
+      // 4401: not authenticated, retrying will not help
+      if (!closed && closeEvent.code !== 4401) {
+        reconnectTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+      }
+    };
+  };
+
+  connect();
+
+  return () => {
+    closed = true;
+    clearTimeout(reconnectTimer);
+    if (socket) socket.close();
+  };
+};
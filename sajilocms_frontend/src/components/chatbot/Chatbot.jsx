@@ -302,8 +302,12 @@ const Chatbot = ({ embedded = false }) => {
                       className="block w-full text-left px-4 py-3 hover:bg-gray-50 transition-colors"
                     >
                       <p className="font-medium text-gray-900 truncate">{session.title}</p>
+                      {session.last_message_preview && (
+                        <p className="text-sm text-gray-600 truncate">{session.last_message_preview}</p>
+                      )}
                       <p className="text-sm text-gray-500">
                         {new Date(session.created_at).toLocaleDateString()}
+                        {session.message_count > 0 && ` · ${session.message_count} messages`}
                       </p>
                     </button>
                   ))
@@ -5,6 +5,7 @@ import { rootAxiosInstance } from "../../api/axiosInstance";
 import AgoraRTC from "agora-rtc-sdk-ng";
 import { AuthContext } from "../../context/AuthContext";
 import { fetchAppointments } from "../../api/appointmentService";
+import { subscribeToNotifications } from "../../api/notificationSocket";
 
 // Initialize Agora client
 const ChatRoom = () => {
@@ -205,6 +206,34 @@ const ChatRoom = () => {
     if (user && targetUserId) fetchMessages();
   }, [user, targetUserId, logout]);
 
+  // Receive new messages pushed by the server, fetching only the ones we don't have yet
+  const messagesRef = useRef(messages);
+  messagesRef.current = messages;
+
+  useEffect(() => {
+    if (!user || !targetUserId) return undefined;
+
+    return subscribeToNotifications(async (event, data) => {
+      if (event !== "message.created") return;
+      const partnerId = String(targetUserId);
+      if (String(data.sender_id) !== partnerId && String(data.recipient_id) !== partnerId) return;
+
+      const current = messagesRef.current;
+      const lastId = current.length ? current[current.length - 1].id : 0;
+      try {
+        const response = await rootAxiosInstance.get(`${BASE_URL}get_messages/`, {
+          params: { target_user_id: targetUserId, after: lastId },
+        });
+        setMessages((prev) => {
+          const known = new Set(prev.map((msg) => msg.id));
+          return [...prev, ...response.data.results.filter((msg) => !known.has(msg.id))];
+        });
+      } catch (err) {
+        console.error("Failed to fetch new messages:", err);
+      }
+    });
+  }, [user, targetUserId]);
+
   // Send message
   const handleSendMessage = async (e) => {
     e.preventDefault();
@@ -216,7 +245,9 @@ const ChatRoom = () => {
         recipient_id: targetUserId,
         content: newMessage,
       });
-      setMessages([...messages, response.data]);
+      setMessages((prev) =>
+        prev.some((msg) => msg.id === response.data.id) ? prev : [...prev, response.data]
+      );
       setNewMessage("");
     } catch (err) {
       setError("Failed to send message.");